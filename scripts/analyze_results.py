@@ -33,7 +33,7 @@ def main():
         type=Path,
         required=True,
         dest='csv_file',
-        help='Arquivo CSV com resultados (gerado pelo run_experiments.py)'
+        help='Arquivo CSV ou Parquet com resultados (gerado pelo run_experiments.py)'
     )
     parser.add_argument(
         '--output', '-o',
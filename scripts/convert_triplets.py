@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Conversão entre formatos de armazenamento de triplas.
+
+Formatos:
+- dirs:  diretórios triplet_NNN/ (base, left, right, merged, metadata.json)
+- store: TripletStore endereçado por conteúdo (<triplets-dir>/store)
+- pack:  pacote único com índice (<triplets-dir>/triplets.pack + triplets.idx)
+
+Uso:
+    # Exportar o store e/ou o pacote para o layout de diretórios
+    python3 scripts/convert_triplets.py --to dirs --triplets-dir data/triplets --output data/triplets_dirs
+
+    # Empacotar diretórios triplet_NNN/ (e o store, se houver)
+    python3 scripts/convert_triplets.py --to pack --triplets-dir data/triplets --output data/triplets_pack
+"""
+
+import sys
+import argparse
+import logging
+from pathlib import Path
+
+# Adicionar src/ ao PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.miner.triplet_extractor import TripletExtractor
+from src.miner.triplet_pack import TripletPackReader
+from src.miner.triplet_store import STORE_DIR, TripletStore
+
+
+def to_dirs(triplets_dir: Path, output: Path) -> int:
+    """Exporta store e pacote para diretórios (o store tem precedência)."""
+    store_dir = triplets_dir / STORE_DIR
+    has_store = TripletStore.exists(store_dir)
+    has_pack = TripletPackReader.exists(triplets_dir)
+    if not has_store and not has_pack:
+        print(f"❌ Nenhum store ou pacote encontrado em: {triplets_dir}")
+        return 1
+
+    exported = set()
+    if has_store:
+        store = TripletStore(store_dir)
+        store.export_directory(output)
+        exported.update(store.ids())
+
+    if has_pack:
+        extractor = TripletExtractor(output)
+        with TripletPackReader(triplets_dir) as pack:
+            for triplet_id, triplet in pack:
+                if triplet_id not in exported:
+                    extractor.save_triplet(triplet, triplet_id)
+                    exported.add(triplet_id)
+
+    print(f"✓ {len(exported)} triplas exportadas para {output}")
+    return 0
+
+
+def to_pack(triplets_dir: Path, output: Path, compress: bool) -> int:
+    """Empacota diretórios triplet_NNN/ e o store (diretórios têm precedência)."""
+    extractor = TripletExtractor(output, compress_pack=compress)
+    packed = set()
+    skipped = 0
+
+    try:
+        for triplet_dir in sorted(triplets_dir.glob("triplet_*")):
+            suffix = triplet_dir.name.split('_', 1)[1]
+            if not suffix.isdigit():
+                continue
+            triplet = TripletExtractor.load_saved_triplet(triplet_dir)
+            if triplet is None:
+                logging.warning(f"{triplet_dir.name}: arquivos incompletos, ignorada")
+                skipped += 1
+                continue
+            extractor.save_triplet_packed(triplet, int(suffix))
+            packed.add(int(suffix))
+
+        store_dir = triplets_dir / STORE_DIR
+        if TripletStore.exists(store_dir):
+            for triplet_id, triplet in TripletStore(store_dir):
+                if triplet_id not in packed:
+                    extractor.save_triplet_packed(triplet, triplet_id)
+                    packed.add(triplet_id)
+    finally:
+        extractor.close()
+
+    if not packed:
+        print(f"❌ Nenhuma tripla encontrada em: {triplets_dir}")
+        return 1
+
+    print(f"✓ {len(packed)} triplas empacotadas em {output} ({skipped} ignoradas)")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Converte triplas entre formatos de armazenamento'
+    )
+    parser.add_argument(
+        '--to',
+        choices=['dirs', 'pack'],
+        required=True,
+        help='Formato de destino'
+    )
+    parser.add_argument(
+        '--triplets-dir',
+        type=Path,
+        default=Path('data/triplets'),
+        help='Diretório das triplas de origem (padrão: data/triplets)'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        type=Path,
+        required=True,
+        help='Diretório de destino'
+    )
+    parser.add_argument(
+        '--no-compress',
+        action='store_true',
+        help='Não comprime os registros do pacote (--to pack)'
+    )
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+
+    if args.to == 'dirs':
+        return to_dirs(args.triplets_dir, args.output)
+    return to_pack(args.triplets_dir, args.output, compress=not args.no_compress)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Migra triplas antigas (metadata.txt) para metadados estruturados (metadata.json).
+
+Para cada diretório triplet_NNN/ sem metadata.json, os campos de origem são
+lidos do metadata.txt e tamanhos, linhas e SHAs dos blobs são calculados
+dos arquivos. O metadata.txt é mantido. Triplas já migradas são puladas,
+então o script pode ser executado de novo com segurança.
+
+Uso:
+    python3 scripts/migrate_metadata.py --triplets-dir data/triplets
+"""
+
+import sys
+import argparse
+import logging
+from pathlib import Path
+
+# Adicionar src/ ao PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.miner.triplet_metadata import migrate_triplet_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Gera metadata.json para triplas com apenas metadata.txt'
+    )
+    parser.add_argument(
+        '--triplets-dir',
+        type=Path,
+        default=Path('data/triplets'),
+        help='Diretório das triplas (padrão: data/triplets)'
+    )
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+
+    if not args.triplets_dir.exists():
+        print(f"❌ Diretório não encontrado: {args.triplets_dir}")
+        return 1
+
+    migrated = skipped = failed = 0
+    for triplet_dir in sorted(args.triplets_dir.glob("triplet_*")):
+        try:
+            if migrate_triplet_dir(triplet_dir):
+                migrated += 1
+            else:
+                skipped += 1
+        except Exception as e:
+            logging.error(f"Erro ao migrar {triplet_dir.name}: {e}")
+            failed += 1
+
+    print(f"✓ {migrated} triplas migradas, {skipped} puladas, {failed} com erro")
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
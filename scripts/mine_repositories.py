@@ -6,6 +6,9 @@ Carrega configuração do YAML e executa mineração completa.
 Uso:
     python3 scripts/mine_repositories.py --language typescript --max-triplets 100
     python3 scripts/mine_repositories.py --all --max-triplets 500
+    python3 scripts/mine_repositories.py --all --max-triplets 500 --workers 4
+    python3 scripts/mine_repositories.py --all --max-triplets 500 --incremental
+    python3 scripts/mine_repositories.py --all --max-triplets 500 --storage store
 """
 
 import sys
@@ -76,6 +79,29 @@ def main():
         default=Path('data/triplets'),
         help='Diretório para salvar triplas'
     )
+    parser.add_argument(
+        '--workers', '-j',
+        type=int,
+        default=1,
+        help='Repositórios minerados em paralelo (padrão: 1 = sequencial)'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Minera apenas merges novos desde a última execução (diário em <output-dir>/.ledger)'
+    )
+    parser.add_argument(
+        '--storage',
+        choices=['dirs', 'store', 'pack'],
+        default='dirs',
+        help='Formato das triplas: diretórios triplet_NNN/, store endereçado por conteúdo '
+             'ou pacote único com índice (padrão: dirs)'
+    )
+    parser.add_argument(
+        '--no-index',
+        action='store_true',
+        help='Não indexa as características das triplas (<output-dir>/index.sqlite3)'
+    )
     parser.add_argument(
         '--verbose', '-v',
         action='store_true',
@@ -117,7 +143,11 @@ def main():
     miner = GitHubMiner(
         repos_dir=args.repos_dir,
         triplets_dir=args.output_dir,
-        target_triplets=args.max_triplets
+        target_triplets=args.max_triplets,
+        workers=args.workers,
+        incremental=args.incremental,
+        storage=args.storage,
+        build_index=not args.no_index
         #target_triplets=10 # Para forçar a olhar outros repositórios durante testes --max-repos: 5 --max-triplets: 50
     )
 
@@ -55,6 +55,66 @@ def main():
         default=60,
         help='Timeout por execução em segundos (padrão: 60)'
     )
+    parser.add_argument(
+        '--cache-dir',
+        type=Path,
+        default=None,
+        help='Reutiliza merges do CSDiff-Web de execuções anteriores, guardados neste '
+             'diretório (p.ex. data/cache). Acertos ficam fora das médias de tempo '
+             '(padrão: cache só em memória)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Ignora --cache-dir (cache só em memória)'
+    )
+    parser.add_argument(
+        '--persist-block-cache',
+        action='store_true',
+        help='Com --cache-dir, guarda também o memo de blocos do CSDiff-Web em disco '
+             '(triplas com blocos reaproveitados ficam fora das médias de tempo)'
+    )
+    parser.add_argument(
+        '--workers', '-j',
+        type=int,
+        default=1,
+        help='Processos executando triplas em paralelo (padrão: 1)'
+    )
+    parser.add_argument(
+        '--format',
+        choices=['csv', 'parquet'],
+        default='csv',
+        dest='results_format',
+        help='Formato da tabela de resultados; parquet guarda as saídas em results-dir/blobs (padrão: csv)'
+    )
+    parser.add_argument(
+        '--read-ahead',
+        type=int,
+        default=16,
+        help='Triplas carregadas à frente do processamento (padrão: 16; 0 = sem leitura antecipada)'
+    )
+    parser.add_argument(
+        '--where',
+        default=None,
+        help="Filtro sobre o índice de características (triplets-dir/index.sqlite3): "
+             "comparações entre colunas e valores com AND/OR/NOT, "
+             "p.ex. \"extension = '.tsx' AND diff3_conflicts >= 3\""
+    )
+    parser.add_argument(
+        '--update-index',
+        action='store_true',
+        help='Só atualiza o índice de características (triplas ainda não indexadas) e sai'
+    )
+    parser.add_argument(
+        '--rebuild-index',
+        action='store_true',
+        help='Com --update-index, reindexa todas as triplas'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Retoma a partir do checkpoint em results-dir, pulando triplas já executadas'
+    )
     parser.add_argument(
         '--verbose', '-v',
         action='store_true',
@@ -70,27 +130,50 @@ def main():
         logger.error(f"Diretório de triplas não encontrado: {args.triplets_dir}")
         return 1
 
-    triplet_count = len(list(args.triplets_dir.glob("triplet_*")))
-    
     logger.info("Inicializando runner...")
-    runner = ExperimentRunner(
-        triplets_dir=args.triplets_dir,
-        results_dir=args.results_dir,
-        timeout=args.timeout
-    )
+    try:
+        runner = ExperimentRunner(
+            triplets_dir=args.triplets_dir,
+            results_dir=args.results_dir,
+            timeout=args.timeout,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            persist_block_cache=args.persist_block_cache,
+            workers=args.workers,
+            results_format=args.results_format,
+            read_ahead=args.read_ahead,
+            where=args.where
+        )
+    except ValueError as e:
+        logger.error(f"--where inválido: {e}")
+        return 1
+
+    if args.update_index:
+        count = runner.update_index(rebuild=args.rebuild_index)
+        print(f"✓ {count} triplas indexadas em {args.triplets_dir}")
+        return 0
 
     try:
+        # Contagem pela listagem do runner: vale para diretórios, store e pacote
+        triplet_count = runner.count_triplets(args.max_triplets)
+
         print("\n" + "=" * 60)
         print("EXECUTANDO EXPERIMENTOS")
         print("=" * 60)
         print(f"Triplas:     {triplet_count}")
         print(f"Ferramentas: CSDiff-Web, Mergiraf, Slow-diff3")
+        print(f"Processos:   {args.workers}")
+        if args.where:
+            print(f"Filtro:      {args.where}")
         print("=" * 60 + "\n")
 
         results = runner.run_experiments(
-            max_triplets=args.max_triplets
+            max_triplets=args.max_triplets,
+            resume=args.resume
         )
 
+        if results.get('triplets_resumed'):
+            print(f"\nTriplas retomadas do checkpoint: {results['triplets_resumed']}")
+
         print("\n" + "=" * 60)
         print("MÉTRICAS RESUMIDAS")
         print("=" * 60)
@@ -100,6 +183,13 @@ def main():
                 print(f"\n{tool.upper()}:")
                 print(f"  Sucesso: {metrics['success_rate']:.1f}%")
                 print(f"  Média de Conflitos: {metrics['avg_conflicts']:.2f}")
+
+        cache_stats = runner.merge_cache.get_statistics()
+        print(f"\nCache de merges: {cache_stats['memory_hits'] + cache_stats['disk_hits']} acertos, "
+              f"{cache_stats['misses']} faltas ({cache_stats['hit_rate']:.1f}%)")
+        block_stats = runner.block_cache.get_statistics()
+        print(f"Cache de blocos: {block_stats['memory_hits'] + block_stats['disk_hits']} acertos, "
+              f"{block_stats['misses']} faltas ({block_stats['hit_rate']:.1f}%)")
         
         return 0
 
@@ -0,0 +1,79 @@
+import { getFileLines } from './files.js'
+import { match } from './matching.js'
+import { merge } from './merge.js'
+
+// Long-lived merge worker: reads framed requests from stdin and writes
+// framed responses to stdout. Each frame is a 4-byte big-endian length
+// followed by that many bytes of UTF-8 JSON.
+//
+// Requests:
+//   { "id": 1, "type": "ping" }
+//   { "id": 2, "type": "merge", "left": path, "base": path, "right": path }
+//
+// Responses:
+//   { "id": 1, "ok": true, "type": "pong" }
+//   { "id": 2, "ok": true, "result": "..." }
+//   { "id": 2, "ok": false, "error": "..." }
+//
+// "result" is exactly what `node src/index.js left base right -m` prints.
+
+const HEADER_SIZE = 4
+
+const mergeFiles = (left, base, right) => {
+  const [leftLines, baseLines, rightLines] = [left, base, right].map(getFileLines)
+
+  const Ma = match(baseLines, leftLines)
+  const Mb = match(baseLines, rightLines)
+
+  // console.log appends a newline to the CLI output
+  return merge(Ma, Mb, leftLines, baseLines, rightLines) + '\n'
+}
+
+const handle = request => {
+  switch (request.type) {
+    case 'ping':
+      return { type: 'pong' }
+    case 'merge':
+      return { result: mergeFiles(request.left, request.base, request.right) }
+    default:
+      throw new Error(`Unknown request type: ${request.type}`)
+  }
+}
+
+const send = message => {
+  const body = Buffer.from(JSON.stringify(message), 'utf-8')
+  const header = Buffer.alloc(HEADER_SIZE)
+  header.writeUInt32BE(body.length)
+  process.stdout.write(Buffer.concat([header, body]))
+}
+
+const respond = frame => {
+  let request
+  try {
+    request = JSON.parse(frame.toString('utf-8'))
+    send({ id: request.id, ok: true, ...handle(request) })
+  } catch (error) {
+    send({ id: request?.id ?? null, ok: false, error: String(error?.stack ?? error) })
+  }
+}
+
+const run = () => {
+  let buffered = Buffer.alloc(0)
+
+  process.stdin.on('data', chunk => {
+    buffered = Buffer.concat([buffered, chunk])
+
+    while (buffered.length >= HEADER_SIZE) {
+      const size = buffered.readUInt32BE(0)
+      if (buffered.length < HEADER_SIZE + size) break
+
+      respond(buffered.subarray(HEADER_SIZE, HEADER_SIZE + size))
+      buffered = buffered.subarray(HEADER_SIZE + size)
+    }
+  })
+
+  // Parent closed the pipe: nothing else to do
+  process.stdin.on('end', () => process.exit(0))
+}
+
+run()
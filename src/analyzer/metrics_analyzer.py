@@ -13,6 +13,11 @@ METODOLOGIA:
 2. Comparação Par a Par (Relativa):
    - Compara ferramentas duas a duas (F1 vs F2).
    - Identifica Falsos Positivos/Negativos Adicionais.
+
+Aceita o CSV do Runner ou a tabela Parquet (`--format parquet`). No Parquet
+só as colunas usadas são lidas; as saídas ficam no BlobStore. A igualdade
+com o gabarito usa os digests normalizados (`*_norm_sha`) gravados pelo
+coletor; os textos só são carregados para resultados antigos, sem digests.
 """
 
 import pandas as pd
@@ -20,7 +25,7 @@ from pathlib import Path
 from typing import Dict, List, Tuple
 import logging
 
-from .comparison_classifier import ComparisonClassifier
+from src.core.blob_store import BlobStore
 
 logger = logging.getLogger(__name__)
 
@@ -32,24 +37,87 @@ class MetricsAnalyzer:
 
     def __init__(self, csv_path: Path):
         """
-        Inicializa analisador com resultados CSV.
+        Inicializa analisador com resultados CSV ou Parquet.
 
         Args:
-            csv_path: Path do CSV gerado pelo Runner
+            csv_path: Path do CSV (ou .parquet) gerado pelo Runner
         """
         self.csv_path = Path(csv_path)
         self.df = None
+        self.blobs = None
         
         # Ferramentas a serem analisadas (nomes das colunas no CSV usam underscore)
         self.tools = ['csdiff_web', 'mergiraf', 'slow_diff3']
 
-        # Carregar CSV
-        self._load_csv()
+        # Carregar tabela
+        if self.csv_path.suffix == '.parquet':
+            self._load_parquet()
+        else:
+            self._load_csv()
+
+    def _load_parquet(self):
+        """Carrega só as colunas usadas da tabela Parquet."""
+        import pyarrow.parquet as pq
+
+        columns = ['triplet_id', 'repo_merged_content_sha', 'repo_merged_content_norm_sha']
+        for tool in self.tools:
+            columns.extend(
+                f'{tool}_{field}'
+                for field in ('success', 'has_conflict', 'num_conflicts', 'time', 'cached',
+                              'block_hits', 'error', 'output_sha', 'output_norm_sha')
+            )
+        # Tabelas antigas não têm os digests normalizados
+        available = set(pq.read_schema(self.csv_path).names)
+        columns = [column for column in columns if column in available]
+
+        self.df = pd.read_parquet(self.csv_path, columns=columns)
+        # Booleanos com nulos como no read_csv (object com NaN), para que as
+        # classificações deem o mesmo resultado nos dois formatos
+        for tool in self.tools:
+            for column in (f'{tool}_success', f'{tool}_has_conflict'):
+                if self.df[column].isna().any():
+                    self.df[column] = self.df[column].astype(object).where(self.df[column].notna(), float('nan'))
+        self.blobs = BlobStore(self.csv_path.parent / 'blobs')
+        logger.info(f"Parquet carregado: {len(self.df)} linhas")
+
+    def _text_columns(self) -> List[str]:
+        return ['repo_merged_content'] + [f'{tool}_output' for tool in self.tools]
+
+    def _ensure_text_columns(self):
+        """
+        Carrega `*_output` e `repo_merged_content` sob demanda.
+
+        No Parquet os textos vêm do BlobStore (hashes repetidos compartilham
+        o mesmo texto); no CSV as colunas são lidas numa segunda passada,
+        se foram puladas em _load_csv.
+        """
+        if 'repo_merged_content' in self.df.columns:
+            return
+
+        if self.blobs is not None:
+            for column in self._text_columns():
+                sha_column = f'{column}_sha'
+                if sha_column in self.df.columns:
+                    self.df[column] = self.df[sha_column].map(self.blobs.get, na_action='ignore')
+            return
+
+        header = pd.read_csv(self.csv_path, nrows=0).columns
+        columns = [column for column in self._text_columns() if column in header]
+        texts = pd.read_csv(self.csv_path, usecols=columns)
+        for column in columns:
+            self.df[column] = texts[column].values
 
     def _load_csv(self):
-        """Carrega e valida CSV."""
+        """Carrega e valida CSV (sem os textos, se houver digests)."""
         try:
-            self.df = pd.read_csv(self.csv_path)
+            header = pd.read_csv(self.csv_path, nrows=0).columns
+            usecols = None
+            if 'repo_merged_content_norm_sha' in header:
+                # Comparações usam os digests: textos só sob demanda
+                text_columns = set(self._text_columns())
+                usecols = [column for column in header if column not in text_columns]
+
+            self.df = pd.read_csv(self.csv_path, usecols=usecols)
             logger.info(f"CSV carregado: {len(self.df)} linhas")
 
             # Validar colunas necessárias para as 3 ferramentas
@@ -64,7 +132,7 @@ class MetricsAnalyzer:
             # Adicionar coluna do gabarito
             required_cols.append('repo_merged_content')
 
-            missing = [col for col in required_cols if col not in self.df.columns]
+            missing = [col for col in required_cols if col not in header]
             if missing:
                 logger.warning(f"Colunas faltando no CSV: {missing}")
 
@@ -114,11 +182,45 @@ class MetricsAnalyzer:
                 results[tool_name] = dist
         return results
 
+    def _text_column(self, column: str) -> pd.Series:
+        """Coluna de texto normalizada como no classificador (NaN -> "", strip)."""
+        values = self.df[column]
+        return values.where(values.notna(), "").astype(str).str.strip()
+
+    def _output_matches_repo(self) -> Dict[str, pd.Series]:
+        """
+        Igualdade saída normalizada == gabarito normalizado, uma vez por ferramenta.
+
+        Compara os digests `*_norm_sha` quando existem; senão, os textos.
+
+        Returns:
+            Dict ferramenta -> Series booleana (só ferramentas com coluna de saída)
+        """
+        matches = {}
+        repo_digest = self.df.get('repo_merged_content_norm_sha')
+        repo_text = None
+        for tool in self.tools:
+            digest = self.df.get(f'{tool}_output_norm_sha')
+            if repo_digest is not None and digest is not None:
+                matches[tool] = digest == repo_digest
+                continue
+
+            self._ensure_text_columns()
+            if f'{tool}_output' not in self.df.columns:
+                continue
+            if repo_text is None:
+                repo_text = self._text_column('repo_merged_content')
+            matches[tool] = self._text_column(f'{tool}_output') == repo_text
+        return matches
+
     def analyze_individual_performance(self) -> Dict[str, Dict]:
         """
         Calcula a performance individual de cada ferramenta em relação ao gabarito.
         Baseado no diagrama de avaliação do TCC.
 
+        Mesma classificação de ComparisonClassifier.classify_tool_result,
+        calculada com operações de coluna: falha > conflito > saída == gabarito.
+
         Returns:
             Dict com estatísticas por ferramenta:
             {
@@ -126,90 +228,98 @@ class MetricsAnalyzer:
                 'mergiraf': ...
             }
         """
-        classifier = ComparisonClassifier()
-        repo_col = 'repo_merged_content'
+        results = {}
+        if self.df.empty:
+            return results
 
-        # Iterar sobre cada ferramenta
-        for tool in self.tools:
-            output_col = f'{tool}_output'
+        for tool, matches in self._output_matches_repo().items():
             conflict_col = f'{tool}_has_conflict'
             error_col = f'{tool}_error'
+            success_col = f'{tool}_success'
+
+            # Falha: mensagem de erro não vazia ou success == False
+            failed = pd.Series(False, index=self.df.index)
+            if error_col in self.df.columns:
+                errors = self.df[error_col]
+                failed |= errors.notna() & (errors.astype(str) != "")
+            if success_col in self.df.columns:
+                success = self.df[success_col]
+                failed |= success.notna() & (success == False)  # noqa: E712
+
+            conflicts = self.df[conflict_col]
+            has_conflict = conflicts.where(conflicts.notna(), False).astype(bool)
+
+            conflict = ~failed & has_conflict
+            clean = ~failed & ~has_conflict
+
+            results[tool.replace('_', '-')] = {
+                'clean_correct': int((clean & matches).sum()),
+                'clean_incorrect': int((clean & ~matches).sum()),
+                'conflict': int(conflict.sum()),
+                'failure': int(failed.sum()),
+                'total': len(self.df)
+            }
 
-            if output_col not in self.df.columns:
-                continue
-
-            # Iterar sobre as linhas do dataframe
-            for idx, row in self.df.iterrows():
-                # Tratar valores NaN/None
-                output = str(row[output_col]) if pd.notna(row[output_col]) else ""
-                has_conflict = bool(row[conflict_col]) if pd.notna(row[conflict_col]) else False
-                repo_content = str(row[repo_col]) if pd.notna(row[repo_col]) else ""
-                
-                # Verificar erro de execução
-                error_msg = str(row[error_col]) if error_col in self.df.columns and pd.notna(row[error_col]) else None
-                if row.get(f'{tool}_success') is False:
-                    error_msg = error_msg or "Execution Failed"
-
-                # Classificar usando o classificador centralizado
-                classifier.classify_tool_result(
-                    tool_name=tool.replace('_', '-'), # Usar hifen para display
-                    output=output,
-                    has_conflict=has_conflict,
-                    repo_expected=repo_content,
-                    error=error_msg
-                )
-
-        return classifier.get_tool_statistics()
+        return results
 
     def compare_all_pairs(self) -> Dict[str, Dict]:
         """
         Compara todos os pares ordenados de ferramentas (Análise Relativa).
+
+        Mesma classificação de ComparisonClassifier.classify_pair_result,
+        com as igualdades ao gabarito calculadas uma vez por ferramenta
+        (comparando digests, sem tocar nos textos).
         """
         results = {}
-        classifier = ComparisonClassifier()
-        repo_col = 'repo_merged_content'
+        matches = self._output_matches_repo()
+        # Como no classificador: bool() do valor cru (NaN conta como conflito)
+        conflicts = {tool: self.df[f'{tool}_has_conflict'].astype(bool) for tool in matches}
 
         # Gerar todos os pares ordenados (F1, F2) onde F1 != F2
         for f1 in self.tools:
             for f2 in self.tools:
                 if f1 == f2: continue
 
-                pair_key = f"{f1.replace('_', '-')}_vs_{f2.replace('_', '-')}"
-                
-                # Colunas
-                f1_out = f'{f1}_output'
-                f2_out = f'{f2}_output'
-                f1_conf = f'{f1}_has_conflict'
-                f2_conf = f'{f2}_has_conflict'
-
-                if f1_out not in self.df.columns or f2_out not in self.df.columns:
+                if f1 not in matches or f2 not in matches:
                     continue
 
-                # Resetar stats do classificador para este par
-                classifier.reset_statistics()
-
-                for idx, row in self.df.iterrows():
-                    classifier.classify_pair_result(
-                        f1_output=str(row[f1_out]) if pd.notna(row[f1_out]) else "",
-                        f2_output=str(row[f2_out]) if pd.notna(row[f2_out]) else "",
-                        repo_expected=str(row[repo_col]) if pd.notna(row[repo_col]) else "",
-                        f1_has_conflict=bool(row[f1_conf]),
-                        f2_has_conflict=bool(row[f2_conf])
-                    )
-                
-                # Salvar estatísticas do par (usando a propriedade interna do classificador que foi populada)
-                pair_stats = classifier.pair_stats.copy()
-                results[pair_key] = pair_stats
+                pair_key = f"{f1.replace('_', '-')}_vs_{f2.replace('_', '-')}"
+                c1, c2 = conflicts[f1], conflicts[f2]
+                m1, m2 = matches[f1], matches[f2]
+
+                fp = int((c1 & ~c2 & m2).sum())
+                fn = int((~c1 & ~m1 & c2).sum())
+                correct = int((~c1 & m1 & ~c2 & m2).sum())
+                total = len(self.df)
+
+                results[pair_key] = {
+                    'total_comparisons': total,
+                    'fp_adicional': fp,
+                    'fn_adicional': fn,
+                    'corretos': correct,
+                    'indefinidos': total - fp - fn - correct
+                }
 
         return results
 
+    def _cached_rows(self, tool: str) -> pd.Series:
+        """Linhas cujo resultado da ferramenta (ou algum bloco) veio do cache."""
+        cached = pd.Series(False, index=self.df.index)
+        column = f'{tool}_cached'
+        if column in self.df.columns:
+            cached |= self.df[column].astype(str).str.lower() == 'true'
+        column = f'{tool}_block_hits'
+        if column in self.df.columns:
+            cached |= pd.to_numeric(self.df[column], errors='coerce').fillna(0) > 0
+        return cached
+
     def analyze_execution_time(self) -> Dict:
-        """Analisa tempo de execução."""
+        """Analisa tempo de execução (resultados lidos do cache ficam de fora)."""
         results = {}
         for tool in self.tools:
             time_col = f'{tool}_time'
             if time_col in self.df.columns:
-                times = self.df[time_col].dropna()
+                times = self.df.loc[~self._cached_rows(tool), time_col].dropna()
                 if len(times) > 0:
                     tool_name = tool.replace('_', '-')
                     results[tool_name] = {
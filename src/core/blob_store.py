@@ -0,0 +1,101 @@
+"""
+Armazenamento de conteúdos endereçado por hash.
+
+As saídas das ferramentas e o gabarito ficam fora da tabela de resultados:
+cada texto é gravado uma vez em `root/ab/cdef...` (SHA-256 do conteúdo,
+dividido em subdiretórios pelos dois primeiros caracteres) e a tabela
+guarda só o hash. Textos repetidos (saídas idênticas entre ferramentas,
+gabarito igual à saída) ocupam espaço uma única vez.
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 (hexadecimal) do texto em UTF-8."""
+    return hashlib.sha256(text.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+def normalized_hash(text: Optional[str]) -> str:
+    """
+    Digest do texto normalizado como no ComparisonClassifier (None -> "", strip).
+
+    Dois textos têm o mesmo digest se e somente se são iguais após a
+    normalização, então a comparação com o gabarito dispensa o texto.
+    """
+    return content_hash((text or "").strip())
+
+
+class BlobStore:
+    """
+    Diretório de blobs de texto endereçados por SHA-256.
+    """
+
+    def __init__(self, root: Path):
+        """
+        Inicializa store.
+
+        Args:
+            root: Diretório dos blobs (criado se necessário)
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Textos já lidos nesta instância (hashes repetem muito entre linhas)
+        self._read_cache: Dict[str, str] = {}
+
+    def digest(self, text: str) -> str:
+        """Chave de um texto no store (SHA-256 do conteúdo)."""
+        return content_hash(text)
+
+    def path(self, digest: str) -> Path:
+        """Arquivo onde o blob de `digest` é (ou seria) gravado."""
+        return self.root / digest[:2] / digest[2:]
+
+    def put(self, text: Optional[str], digest: Optional[str] = None) -> Optional[str]:
+        """
+        Armazena um texto.
+
+        Args:
+            text: Conteúdo
+            digest: Chave já conhecida do conteúdo (None = calculada)
+
+        Returns:
+            Hash do conteúdo, ou None se text for None
+        """
+        if text is None:
+            return None
+
+        if digest is None:
+            digest = self.digest(text)
+        path = self.path(digest)
+        if path.exists():
+            return digest
+
+        path.parent.mkdir(exist_ok=True)
+        # Escrita atômica: workers podem gravar o mesmo blob ao mesmo tempo
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(text.encode('utf-8', 'surrogatepass'))
+        os.replace(tmp, path)
+        return digest
+
+    def get(self, digest: Optional[str]) -> Optional[str]:
+        """
+        Lê um texto pelo hash.
+
+        Returns:
+            Conteúdo, ou None se digest for None/vazio
+        """
+        if not digest:
+            return None
+        if digest not in self._read_cache:
+            data = self.path(digest).read_bytes()
+            self._read_cache[digest] = data.decode('utf-8', 'surrogatepass')
+        return self._read_cache[digest]
+
+    def __contains__(self, digest: str) -> bool:
+        return self.path(digest).exists()
@@ -1,14 +1,13 @@
-import subprocess
-import tempfile
-import os
-from pathlib import Path
-from typing import Tuple, List
+from typing import Optional, Tuple, List, Union
 import logging
 
 from .preprocessor import Preprocessor
 from .postprocessor import Postprocessor
 from .diff3_parser import Diff3Parser, ConflictBlock, NormalBlock
 from .filters import FileFilter # Mantido para adaptação JS
+from .separators import DEFAULT_EXPLODE_MODE
+from .merge_backends import MergeBackend, get_backend
+from .merge_cache import MergeCache, get_block_cache, make_key
 
 logger = logging.getLogger(__name__)
 
@@ -19,17 +18,57 @@ class CSDiffWeb:
     2. Se houver conflito, recorta o bloco e aplica CSDiff (Explode -> Diff3 -> Implode) localmente.
     """
 
-    def __init__(self, extension: str, skip_filter: bool = False):
+    def __init__(
+        self,
+        extension: str,
+        skip_filter: bool = False,
+        backend: Union[str, MergeBackend, None] = None,
+        batch_blocks: bool = True,
+        explode_mode: str = DEFAULT_EXPLODE_MODE,
+        cache: Optional[MergeCache] = None,
+        memoize_blocks: bool = True,
+        block_cache: Optional[MergeCache] = None
+    ):
         self.extension = extension
-        self.preprocessor = Preprocessor(extension)
+        # "cascade" reproduz a explosão do SepMerge; "single" não reexplode "=>", "</", ...
+        self.preprocessor = Preprocessor(extension, mode=explode_mode)
         self.postprocessor = Postprocessor()
         self.filter = FileFilter()
         self.skip_filter = skip_filter
+        # Backend do diff3: "auto" (padrão), "python" (em processo) ou "git" (subprocess)
+        self.backend = get_backend(backend)
+        # Segundo passo de todos os blocos numa única chamada ao backend
+        self.batch_blocks = batch_blocks
+        # Cache opcional de resultados, endereçado por conteúdo (merge_cache.py)
+        self.cache = cache
+        # Memo do segundo passo por bloco; sem instância explícita usa o do processo
+        if memoize_blocks:
+            self.block_cache = block_cache if block_cache is not None else get_block_cache()
+        else:
+            self.block_cache = None
+        # Blocos resolvidos pelo memo (não recalculados) desde a criação
+        self.block_hits = 0
 
     def merge(self, base: str, left: str, right: str, filename: str = "") -> Tuple[str, bool, int]:
-        
+
         # Filtro de minificados (Adaptação para JS)
-        if not self.skip_filter and self.filter.should_skip(base, filename):
+        skipped = not self.skip_filter and self.filter.should_skip(base, filename)
+
+        if self.cache is None:
+            return self._merge(base, left, right, skipped)
+
+        # O nome do arquivo só influencia a saída via filtro, que entra na chave;
+        # backend e modo do segundo passo também (podem divergir em casos limite)
+        kind = "raw" if skipped else "csdiff:" + ("batch" if self.batch_blocks else "blocks")
+        key = self._cache_key(base, left, right, f"{kind}:{self.backend.name}")
+        result = self.cache.get(key)
+        if result is None:
+            result = self._merge(base, left, right, skipped)
+            self.cache.put(key, result)
+        return result
+
+    def _merge(self, base: str, left: str, right: str, skipped: bool) -> Tuple[str, bool, int]:
+        if skipped:
             return self._run_raw_diff3(base, left, right)
 
         # PASSO 1: Diff3 Global (Rápido)
@@ -43,18 +82,18 @@ class CSDiffWeb:
         blocks = Diff3Parser.parse(merged_raw.splitlines(keepends=True))
 
         # PASSO 3: Resolver Conflitos Localmente
+        conflict_blocks = [b for b in blocks if isinstance(b, ConflictBlock)]
+        if self.batch_blocks:
+            resolved = self._run_csdiff_on_blocks(conflict_blocks)
+        else:
+            # Aplica o algoritmo CSDiff APENAS em cada bloco, um diff3 por bloco
+            resolved = [self._run_csdiff_on_block(*self._block_texts(b)) for b in conflict_blocks]
+        resolved_chunks = iter(resolved)
+
         final_content_parts = []
-        
         for block in blocks:
             if isinstance(block, ConflictBlock):
-                # Extrai o texto cru de cada parte do conflito
-                l_txt = "".join(block.left_lines)
-                b_txt = "".join(block.base_lines)
-                r_txt = "".join(block.right_lines)
-                
-                # Aplica o algoritmo CSDiff APENAS neste bloco
-                resolved_chunk = self._run_csdiff_on_block(b_txt, l_txt, r_txt)
-                final_content_parts.append(resolved_chunk)
+                final_content_parts.append(next(resolved_chunks))
             else:
                 # Mantém bloco normal
                 final_content_parts.append("".join(block.lines))
@@ -64,10 +103,36 @@ class CSDiffWeb:
         
         return final_result, final_conflicts > 0, final_conflicts
 
+    def _cache_key(self, base: str, left: str, right: str, kind: str) -> str:
+        """Chave de cache: entradas, extensão, separadores e modo de explosão."""
+        return make_key(
+            base, left, right, self.extension,
+            "\0".join(self.preprocessor.separators),
+            self.preprocessor.tokenizer.mode,
+            kind
+        )
+
+    def _block_key(self, base: str, left: str, right: str) -> str:
+        # O backend entra na chave: "git" e "python" podem divergir em casos limite
+        return self._cache_key(base, left, right, "block:" + self.backend.name)
+
     def _run_csdiff_on_block(self, base: str, left: str, right: str) -> str:
         """
         Executa a lógica 'Explode -> Diff3 -> Clean' em um pedaço de texto.
         """
+        if self.block_cache is None:
+            return self._csdiff_block(base, left, right)
+
+        key = self._block_key(base, left, right)
+        cached = self.block_cache.get(key)
+        if cached is not None:
+            self.block_hits += 1
+            return cached[0]
+        result = self._csdiff_block(base, left, right)
+        self.block_cache.put(key, (result,))
+        return result
+
+    def _csdiff_block(self, base: str, left: str, right: str) -> str:
         # 1. Explode
         base_exp = self.preprocessor.explode(base)
         left_exp = self.preprocessor.explode(left)
@@ -80,41 +145,64 @@ class CSDiffWeb:
         # Nota: O SepMerge Java chama removeMarkers aqui
         return self.postprocessor.reconstruct(merged_exp, self.extension)
 
-    # Em src/core/csdiff_web.py
+    def _run_csdiff_on_blocks(self, blocks: List[ConflictBlock]) -> List[str]:
+        """
+        Versão em lote de `_run_csdiff_on_block`: explode todos os blocos e
+        faz um único `merge_batch` no backend (um só fork no backend git).
+        Blocos já vistos saem do memo; só os demais entram no lote.
+        """
+        resolved: List[Optional[str]] = [None] * len(blocks)
+        pending = {}  # chave -> índices dos blocos (repetidos no mesmo arquivo)
+        exploded = []
+        for i, block in enumerate(blocks):
+            base, left, right = self._block_texts(block)
+            key = None
+            if self.block_cache is not None:
+                key = self._block_key(base, left, right)
+                if key in pending:
+                    pending[key].append(i)
+                    continue
+                cached = self.block_cache.get(key)
+                if cached is not None:
+                    resolved[i] = cached[0]
+                    self.block_hits += 1
+                    continue
+            pending[key if key is not None else i] = [i]
+            exploded.append((
+                self.preprocessor.explode(base),
+                self.preprocessor.explode(left),
+                self.preprocessor.explode(right)
+            ))
+
+        results = self.backend.merge_batch(exploded) if exploded else []
+        for (key, indices), (merged_exp, _) in zip(pending.items(), results):
+            text = self.postprocessor.reconstruct(merged_exp, self.extension)
+            for i in indices:
+                resolved[i] = text
+            if self.block_cache is not None:
+                self.block_cache.put(key, (text,))
+        return resolved
+
+    @staticmethod
+    def _block_texts(block: ConflictBlock) -> Tuple[str, str, str]:
+        """Extrai o texto cru (base, left, right) de um bloco de conflito."""
+        return (
+            "".join(block.base_lines),
+            "".join(block.left_lines),
+            "".join(block.right_lines)
+        )
 
     def _run_raw_diff3(self, base: str, left: str, right: str) -> Tuple[str, bool]:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            base_path = Path(tmpdir) / "base"
-            left_path = Path(tmpdir) / "left"
-            right_path = Path(tmpdir) / "right"
-
-            base_path.write_text(base, encoding="utf-8")
-            left_path.write_text(left, encoding="utf-8")
-            right_path.write_text(right, encoding="utf-8")
-
-            # Usamos git merge-file com --diff3 para garantir que o bloco ||||||| (base) apareça.
-            # O flag -p imprime no stdout (capture_output pega isso).
-            cmd = [
-                "git", "merge-file", 
-                "-p", 
-                "--diff3", 
-                str(left_path), 
-                str(base_path), 
-                str(right_path)
-            ]
-
-            result = subprocess.run(cmd, capture_output=True, text=True, encoding="utf-8")
-            
-            # git merge-file retorna:
-            # 0: sem conflito
-            # positivo: com conflito
-            # negativo: erro
-            has_conflict = result.returncode > 0
-            
-            return result.stdout, has_conflict
+        # Equivalente a `git merge-file -p --diff3`; o backend decide se
+        # roda em processo ou via subprocess.
+        merged, num_conflicts = self.backend.merge(base, left, right)
+        return merged, num_conflicts > 0
 
     def get_statistics(self, base: str, left: str, right: str) -> dict:
-        return {
+        stats = {
             'base_lines': len(base.splitlines()),
             'extension': self.extension
-        }
\ No newline at end of file
+        }
+        if self.block_cache is not None:
+            stats['block_cache'] = self.block_cache.get_statistics()
+        return stats
\ No newline at end of file
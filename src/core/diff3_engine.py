@@ -0,0 +1,630 @@
+"""
+Motor diff3 em Python puro (sem subprocess).
+
+Porta fiel do libxdiff usado pelo `git merge-file -p --diff3`:
+- xprepare.c: classificação de linhas, trim de prefixo/sufixo comuns e
+  descarte de linhas sem par (xdl_cleanup_records)
+- xdiffi.c: Myers com heurísticas de corte (xdl_split / xdl_recs_cmp),
+  compactação de grupos (xdl_change_compact) e script de edição
+- xmerge.c: merge de três vias no nível XDL_MERGE_EAGER (o git limita o
+  estilo diff3 a esse nível) e escrita dos marcadores de conflito
+
+A saída é byte a byte idêntica à do git para os mesmos rótulos, o que
+permite trocar o processo externo por uma chamada de função.
+"""
+
+import sys
+from typing import List, Sequence, Tuple
+
+# Constantes de xdiff/xdiffi.h e xdiff/xprepare.c
+XDL_MAX_COST_MIN = 256
+XDL_HEUR_MIN_COST = 256
+XDL_LINE_MAX = sys.maxsize
+XDL_SNAKE_CNT = 20
+XDL_K_HEUR = 4
+XDL_MAX_EQLIMIT = 1024
+XDL_SIMSCAN_WINDOW = 100
+XDL_KPDIS_RUN = 4
+
+DEFAULT_MARKER_SIZE = 7
+DEFAULT_LABELS = ("left", "base", "right")
+
+
+def split_records(text: str) -> List[str]:
+    """
+    Quebra o texto em registros como o xdiff: apenas '\\n' termina linha
+    e a última linha pode não ter terminador.
+    """
+    if not text:
+        return []
+    lines = text.split("\n")
+    records = [line + "\n" for line in lines[:-1]]
+    if lines[-1]:
+        records.append(lines[-1])
+    return records
+
+
+def _bogosqrt(n: int) -> int:
+    i = 1
+    while n > 0:
+        i <<= 1
+        n >>= 2
+    return i
+
+
+class _XdFile:
+    """
+    Equivalente ao xdfile_t. `rchg` tem um elemento extra no fim que é
+    sempre 0: serve de sentinela tanto para rchg[nrec] quanto para
+    rchg[-1] (indexação negativa do Python).
+    """
+
+    __slots__ = ("recs", "ha", "nrec", "rchg", "rindex", "eha", "dstart", "dend")
+
+    def __init__(self, recs: List[str], ha: List[int]):
+        self.recs = recs
+        self.ha = ha
+        self.nrec = len(recs)
+        self.rchg = [0] * (self.nrec + 1)
+        self.rindex: List[int] = []
+        self.eha: List[int] = []
+        self.dstart = 0
+        self.dend = self.nrec - 1
+
+
+def _clean_mmatch(dis: List[int], i: int, s: int, e: int) -> bool:
+    if i - s > XDL_SIMSCAN_WINDOW:
+        s = i - XDL_SIMSCAN_WINDOW
+    if e - i > XDL_SIMSCAN_WINDOW:
+        e = i + XDL_SIMSCAN_WINDOW
+
+    r, rdis0, rpdis0 = 1, 0, 1
+    while i - r >= s:
+        d = dis[i - r]
+        if not d:
+            rdis0 += 1
+        elif d == 2:
+            rpdis0 += 1
+        else:
+            break
+        r += 1
+    if rdis0 == 0:
+        return False
+
+    r, rdis1, rpdis1 = 1, 0, 1
+    while i + r <= e:
+        d = dis[i + r]
+        if not d:
+            rdis1 += 1
+        elif d == 2:
+            rpdis1 += 1
+        else:
+            break
+        r += 1
+    if rdis1 == 0:
+        return False
+
+    rdis1 += rdis0
+    rpdis1 += rpdis0
+    return rpdis1 * XDL_KPDIS_RUN < rpdis1 + rdis1
+
+
+def _prepare_env(recs1: List[str], recs2: List[str]) -> Tuple[_XdFile, _XdFile]:
+    """Classifica registros, apara as pontas e descarta linhas sem par."""
+    classes = {}
+    len1: List[int] = []
+    len2: List[int] = []
+
+    ha1 = []
+    for rec in recs1:
+        idx = classes.get(rec)
+        if idx is None:
+            idx = classes[rec] = len(len1)
+            len1.append(0)
+            len2.append(0)
+        len1[idx] += 1
+        ha1.append(idx)
+
+    ha2 = []
+    for rec in recs2:
+        idx = classes.get(rec)
+        if idx is None:
+            idx = classes[rec] = len(len1)
+            len1.append(0)
+            len2.append(0)
+        len2[idx] += 1
+        ha2.append(idx)
+
+    xdf1 = _XdFile(recs1, ha1)
+    xdf2 = _XdFile(recs2, ha2)
+
+    # xdl_trim_ends
+    lim = min(xdf1.nrec, xdf2.nrec)
+    i = 0
+    while i < lim and ha1[i] == ha2[i]:
+        i += 1
+    xdf1.dstart = xdf2.dstart = i
+    lim -= i
+    j = 0
+    while j < lim and ha1[xdf1.nrec - 1 - j] == ha2[xdf2.nrec - 1 - j]:
+        j += 1
+    xdf1.dend = xdf1.nrec - j - 1
+    xdf2.dend = xdf2.nrec - j - 1
+
+    # xdl_cleanup_records
+    for xdf, counts in ((xdf1, len2), (xdf2, len1)):
+        mlim = min(_bogosqrt(xdf.nrec), XDL_MAX_EQLIMIT)
+        dis = [0] * (xdf.nrec + 1)
+        ha = xdf.ha
+        for k in range(xdf.dstart, xdf.dend + 1):
+            nm = counts[ha[k]]
+            dis[k] = 0 if nm == 0 else (2 if nm >= mlim else 1)
+
+        rindex, eha, rchg = xdf.rindex, xdf.eha, xdf.rchg
+        for k in range(xdf.dstart, xdf.dend + 1):
+            d = dis[k]
+            if d == 1 or (d == 2 and not _clean_mmatch(dis, k, xdf.dstart, xdf.dend)):
+                rindex.append(k)
+                eha.append(ha[k])
+            else:
+                rchg[k] = 1
+
+    return xdf1, xdf2
+
+
+def _split(ha1, off1, lim1, ha2, off2, lim2, kvdf, kvdb, koff, need_min, mxcost):
+    """xdl_split: encontra o ponto médio do caminho de edição."""
+    dmin, dmax = off1 - lim2, lim1 - off2
+    fmid, bmid = off1 - off2, lim1 - lim2
+    odd = (fmid - bmid) & 1
+    fmin = fmax = fmid
+    bmin = bmax = bmid
+
+    kvdf[fmid + koff] = off1
+    kvdb[bmid + koff] = lim1
+
+    ec = 0
+    while True:
+        ec += 1
+        got_snake = False
+
+        if fmin > dmin:
+            fmin -= 1
+            kvdf[fmin - 1 + koff] = -1
+        else:
+            fmin += 1
+        if fmax < dmax:
+            fmax += 1
+            kvdf[fmax + 1 + koff] = -1
+        else:
+            fmax -= 1
+
+        # Os índices k já incluem o deslocamento koff (k = d + koff)
+        for k in range(fmax + koff, fmin + koff - 1, -2):
+            lo, hi = kvdf[k - 1], kvdf[k + 1]
+            i1 = lo + 1 if lo >= hi else hi
+            i2 = i1 - k + koff
+            if i1 < lim1 and i2 < lim2 and ha1[i1] == ha2[i2]:
+                prev1 = i1
+                i1 += 1
+                i2 += 1
+                while i1 < lim1 and i2 < lim2 and ha1[i1] == ha2[i2]:
+                    i1 += 1
+                    i2 += 1
+                if i1 - prev1 > XDL_SNAKE_CNT:
+                    got_snake = True
+            kvdf[k] = i1
+            if odd and bmin + koff <= k <= bmax + koff and kvdb[k] <= i1:
+                return i1, i2, True, True
+
+        if bmin > dmin:
+            bmin -= 1
+            kvdb[bmin - 1 + koff] = XDL_LINE_MAX
+        else:
+            bmin += 1
+        if bmax < dmax:
+            bmax += 1
+            kvdb[bmax + 1 + koff] = XDL_LINE_MAX
+        else:
+            bmax -= 1
+
+        for k in range(bmax + koff, bmin + koff - 1, -2):
+            lo, hi = kvdb[k - 1], kvdb[k + 1]
+            i1 = lo if lo < hi else hi - 1
+            i2 = i1 - k + koff
+            if i1 > off1 and i2 > off2 and ha1[i1 - 1] == ha2[i2 - 1]:
+                prev1 = i1
+                i1 -= 1
+                i2 -= 1
+                while i1 > off1 and i2 > off2 and ha1[i1 - 1] == ha2[i2 - 1]:
+                    i1 -= 1
+                    i2 -= 1
+                if prev1 - i1 > XDL_SNAKE_CNT:
+                    got_snake = True
+            kvdb[k] = i1
+            if not odd and fmin + koff <= k <= fmax + koff and i1 <= kvdf[k]:
+                return i1, i2, True, True
+
+        if need_min:
+            continue
+
+        if got_snake and ec > XDL_HEUR_MIN_COST:
+            best = 0
+            for d in range(fmax, fmin - 1, -2):
+                dd = d - fmid if d > fmid else fmid - d
+                i1 = kvdf[d + koff]
+                i2 = i1 - d
+                v = (i1 - off1) + (i2 - off2) - dd
+                if (v > XDL_K_HEUR * ec and v > best
+                        and off1 + XDL_SNAKE_CNT <= i1 < lim1
+                        and off2 + XDL_SNAKE_CNT <= i2 < lim2):
+                    k = 1
+                    while ha1[i1 - k] == ha2[i2 - k]:
+                        if k == XDL_SNAKE_CNT:
+                            best = v
+                            spl = (i1, i2)
+                            break
+                        k += 1
+            if best > 0:
+                return spl[0], spl[1], True, False
+
+            best = 0
+            for d in range(bmax, bmin - 1, -2):
+                dd = d - bmid if d > bmid else bmid - d
+                i1 = kvdb[d + koff]
+                i2 = i1 - d
+                v = (lim1 - i1) + (lim2 - i2) - dd
+                if (v > XDL_K_HEUR * ec and v > best
+                        and off1 < i1 <= lim1 - XDL_SNAKE_CNT
+                        and off2 < i2 <= lim2 - XDL_SNAKE_CNT):
+                    k = 0
+                    while ha1[i1 + k] == ha2[i2 + k]:
+                        if k == XDL_SNAKE_CNT - 1:
+                            best = v
+                            spl = (i1, i2)
+                            break
+                        k += 1
+            if best > 0:
+                return spl[0], spl[1], False, True
+
+        if ec >= mxcost:
+            fbest = fbest1 = -1
+            for d in range(fmax, fmin - 1, -2):
+                i1 = min(kvdf[d + koff], lim1)
+                i2 = i1 - d
+                if lim2 < i2:
+                    i1 = lim2 + d
+                    i2 = lim2
+                if fbest < i1 + i2:
+                    fbest = i1 + i2
+                    fbest1 = i1
+
+            bbest = bbest1 = XDL_LINE_MAX
+            for d in range(bmax, bmin - 1, -2):
+                i1 = max(off1, kvdb[d + koff])
+                i2 = i1 - d
+                if i2 < off2:
+                    i1 = off2 + d
+                    i2 = off2
+                if i1 + i2 < bbest:
+                    bbest = i1 + i2
+                    bbest1 = i1
+
+            if (lim1 + lim2) - bbest < fbest - (off1 + off2):
+                return fbest1, fbest - fbest1, True, False
+            return bbest1, bbest - bbest1, False, True
+
+
+def _do_diff(recs1: List[str], recs2: List[str]) -> Tuple[_XdFile, _XdFile]:
+    """xdl_do_diff (Myers) seguido de xdl_change_compact nos dois lados."""
+    xdf1, xdf2 = _prepare_env(recs1, recs2)
+    ha1, ha2 = xdf1.eha, xdf2.eha
+    nreff1, nreff2 = len(ha1), len(ha2)
+
+    ndiags = nreff1 + nreff2 + 3
+    mxcost = max(_bogosqrt(ndiags), XDL_MAX_COST_MIN)
+    koff = nreff2 + 1
+    kvdf = [0] * (ndiags + 2)
+    kvdb = [0] * (ndiags + 2)
+
+    rchg1, rchg2 = xdf1.rchg, xdf2.rchg
+    rindex1, rindex2 = xdf1.rindex, xdf2.rindex
+
+    # xdl_recs_cmp sem recursão (a ordem de visita é a mesma do C)
+    stack = [(0, nreff1, 0, nreff2, False)]
+    while stack:
+        off1, lim1, off2, lim2, need_min = stack.pop()
+
+        while off1 < lim1 and off2 < lim2 and ha1[off1] == ha2[off2]:
+            off1 += 1
+            off2 += 1
+        while off1 < lim1 and off2 < lim2 and ha1[lim1 - 1] == ha2[lim2 - 1]:
+            lim1 -= 1
+            lim2 -= 1
+
+        if off1 == lim1:
+            for k in range(off2, lim2):
+                rchg2[rindex2[k]] = 1
+        elif off2 == lim2:
+            for k in range(off1, lim1):
+                rchg1[rindex1[k]] = 1
+        else:
+            s1, s2, min_lo, min_hi = _split(
+                ha1, off1, lim1, ha2, off2, lim2, kvdf, kvdb, koff, need_min, mxcost
+            )
+            stack.append((s1, lim1, s2, lim2, min_hi))
+            stack.append((off1, s1, off2, s2, min_lo))
+
+    _change_compact(xdf1, xdf2)
+    _change_compact(xdf2, xdf1)
+    return xdf1, xdf2
+
+
+def _change_compact(xdf: _XdFile, xdfo: _XdFile):
+    """xdl_change_compact sem a heurística de indentação (flags = 0)."""
+    rchg, ha, nrec = xdf.rchg, xdf.ha, xdf.nrec
+    orchg, onrec = xdfo.rchg, xdfo.nrec
+
+    def slide_down(g):
+        if g[1] < nrec and ha[g[0]] == ha[g[1]]:
+            rchg[g[0]] = 0
+            g[0] += 1
+            rchg[g[1]] = 1
+            g[1] += 1
+            while rchg[g[1]]:
+                g[1] += 1
+            return True
+        return False
+
+    def slide_up(g):
+        if g[0] > 0 and ha[g[0] - 1] == ha[g[1] - 1]:
+            g[0] -= 1
+            rchg[g[0]] = 1
+            g[1] -= 1
+            rchg[g[1]] = 0
+            while rchg[g[0] - 1]:
+                g[0] -= 1
+            return True
+        return False
+
+    def group_next(flags, n, g):
+        if g[1] == n:
+            return False
+        g[0] = g[1] + 1
+        g[1] = g[0]
+        while flags[g[1]]:
+            g[1] += 1
+        return True
+
+    def group_previous(flags, g):
+        if g[0] == 0:
+            return False
+        g[1] = g[0] - 1
+        g[0] = g[1]
+        while flags[g[0] - 1]:
+            g[0] -= 1
+        return True
+
+    g = [0, 0]
+    while rchg[g[1]]:
+        g[1] += 1
+    go = [0, 0]
+    while orchg[go[1]]:
+        go[1] += 1
+
+    while True:
+        if g[1] != g[0]:
+            while True:
+                groupsize = g[1] - g[0]
+                end_matching_other = -1
+
+                while slide_up(g):
+                    group_previous(orchg, go)
+
+                earliest_end = g[1]
+                if go[1] > go[0]:
+                    end_matching_other = g[1]
+
+                while slide_down(g):
+                    group_next(orchg, onrec, go)
+                    if go[1] > go[0]:
+                        end_matching_other = g[1]
+
+                if groupsize == g[1] - g[0]:
+                    break
+
+            if g[1] != earliest_end and end_matching_other != -1:
+                while go[1] == go[0]:
+                    slide_up(g)
+                    group_previous(orchg, go)
+
+        if not group_next(rchg, nrec, g):
+            break
+        group_next(orchg, onrec, go)
+
+
+def _build_script(xdf1: _XdFile, xdf2: _XdFile) -> List[Tuple[int, int, int, int]]:
+    """xdl_build_script: lista de (i1, i2, chg1, chg2) em ordem crescente."""
+    rchg1, rchg2 = xdf1.rchg, xdf2.rchg
+    script = []
+    i1, i2 = xdf1.nrec, xdf2.nrec
+    while i1 >= 0 or i2 >= 0:
+        if rchg1[i1 - 1] or rchg2[i2 - 1]:
+            l1 = i1
+            while rchg1[i1 - 1]:
+                i1 -= 1
+            l2 = i2
+            while rchg2[i2 - 1]:
+                i2 -= 1
+            script.append((i1, i2, l1 - i1, l2 - i2))
+        i1 -= 1
+        i2 -= 1
+    script.reverse()
+    return script
+
+
+def _append_merge(changes: List[list], mode, i0, chg0, i1, chg1, i2, chg2):
+    if changes:
+        m = changes[-1]
+        if i1 <= m[3] + m[4] or i2 <= m[5] + m[6]:
+            if mode != m[0]:
+                m[0] = 0
+            m[2] = i0 + chg0 - m[1]
+            m[4] = i1 + chg1 - m[3]
+            m[6] = i2 + chg2 - m[5]
+            return
+    changes.append([mode, i0, chg0, i1, chg1, i2, chg2])
+
+
+def _is_eol_crlf(recs: List[str], i: int) -> int:
+    nrec = len(recs)
+    if i < nrec - 1:
+        return int(recs[i].endswith("\r\n"))
+    if not nrec:
+        return -1
+    if recs[i].endswith("\n"):
+        return int(recs[i].endswith("\r\n"))
+    if not i:
+        return -1
+    return int(recs[i - 1].endswith("\r\n"))
+
+
+def _is_cr_needed(base: List[str], left: List[str], right: List[str], m: list) -> bool:
+    needs_cr = _is_eol_crlf(left, m[3] - 1 if m[3] else 0)
+    if needs_cr:
+        needs_cr = _is_eol_crlf(right, m[5] - 1 if m[5] else 0)
+    if needs_cr:
+        needs_cr = _is_eol_crlf(base, 0)
+    return needs_cr > 0
+
+
+def _copy(out: List[str], recs: List[str], i: int, count: int, needs_cr: bool, add_nl: bool):
+    if count < 1:
+        return
+    out.extend(recs[i:i + count])
+    if add_nl and not recs[i + count - 1].endswith("\n"):
+        out.append("\r\n" if needs_cr else "\n")
+
+
+def merge_records(
+    base: List[str],
+    left: List[str],
+    right: List[str],
+    labels: Sequence[str] = DEFAULT_LABELS,
+    marker_size: int = DEFAULT_MARKER_SIZE
+) -> Tuple[str, int]:
+    """
+    Merge de três vias sobre registros já quebrados (ver split_records).
+
+    Returns:
+        (texto mesclado, número de conflitos) — o mesmo par que o git
+        devolve em stdout e no exit code.
+    """
+    xb1, xl = _do_diff(base, left)
+    script1 = _build_script(xb1, xl)
+    xb2, xr = _do_diff(base, right)
+    script2 = _build_script(xb2, xr)
+
+    if not script1:
+        return "".join(right), 0
+    if not script2:
+        return "".join(left), 0
+
+    nbase, nleft, nright = len(base), len(left), len(right)
+    changes: List[list] = []
+    s1 = s2 = 0
+    while s1 < len(script1) and s2 < len(script2):
+        x1, x2 = script1[s1], script2[s2]
+        if x1[0] + x1[2] < x2[0]:
+            _append_merge(changes, 1, x1[0], x1[2], x1[1], x1[3], x2[1] - x2[0] + x1[0], x1[2])
+            s1 += 1
+            continue
+        if x2[0] + x2[2] < x1[0]:
+            _append_merge(changes, 2, x2[0], x2[2], x1[1] - x1[0] + x2[0], x2[2], x2[1], x2[3])
+            s2 += 1
+            continue
+        if (x1[0] != x2[0] or x1[2] != x2[2] or x1[3] != x2[3]
+                or left[x1[1]:x1[1] + x1[3]] != right[x2[1]:x2[1] + x2[3]]):
+            off = x1[0] - x2[0]
+            ffo = off + x1[2] - x2[2]
+            i0, i1, i2 = x1[0], x1[1], x2[1]
+            if off > 0:
+                i0 -= off
+                i1 -= off
+            else:
+                i2 += off
+            chg0 = x1[0] + x1[2] - i0
+            chg1 = x1[1] + x1[3] - i1
+            chg2 = x2[1] + x2[3] - i2
+            if ffo < 0:
+                chg0 -= ffo
+                chg1 -= ffo
+            else:
+                chg2 += ffo
+            _append_merge(changes, 0, i0, chg0, i1, chg1, i2, chg2)
+
+        end1 = x1[0] + x1[2]
+        end2 = x2[0] + x2[2]
+        if end1 >= end2:
+            s2 += 1
+        if end2 >= end1:
+            s1 += 1
+
+    for x1 in script1[s1:]:
+        _append_merge(changes, 1, x1[0], x1[2], x1[1], x1[3], x1[0] + nright - nbase, x1[2])
+    for x2 in script2[s2:]:
+        _append_merge(changes, 2, x2[0], x2[2], x2[0] + nleft - nbase, x2[2], x2[1], x2[3])
+
+    # xdl_fill_merge_buffer
+    name1, name0, name2 = labels
+    out: List[str] = []
+    conflicts = 0
+    i = 0
+    for m in changes:
+        mode = m[0]
+        _copy(out, left, i, m[3] - i, False, False)
+        if mode == 0:
+            conflicts += 1
+            eol = "\r\n" if _is_cr_needed(base, left, right, m) else "\n"
+            needs_cr = eol == "\r\n"
+            out.append("<" * marker_size + (" " + name1 if name1 else "") + eol)
+            _copy(out, left, m[3], m[4], needs_cr, True)
+            out.append("|" * marker_size + (" " + name0 if name0 else "") + eol)
+            _copy(out, base, m[1], m[2], needs_cr, True)
+            out.append("=" * marker_size + eol)
+            _copy(out, right, m[5], m[6], needs_cr, True)
+            out.append(">" * marker_size + (" " + name2 if name2 else "") + eol)
+        elif mode == 1:
+            _copy(out, left, m[3], m[4], False, False)
+        else:
+            _copy(out, right, m[5], m[6], False, False)
+        i = m[3] + m[4]
+    _copy(out, left, i, nleft - i, False, False)
+
+    return "".join(out), conflicts
+
+
+def merge_file(
+    base: str,
+    left: str,
+    right: str,
+    labels: Sequence[str] = DEFAULT_LABELS,
+    marker_size: int = DEFAULT_MARKER_SIZE
+) -> Tuple[str, int]:
+    """
+    Equivalente a `git merge-file -p --diff3 -L <left> -L <base> -L <right>`.
+
+    Args:
+        base: Conteúdo do ancestral comum
+        left: Conteúdo do lado esquerdo (ours)
+        right: Conteúdo do lado direito (theirs)
+        labels: Rótulos dos marcadores (left, base, right)
+        marker_size: Tamanho dos marcadores de conflito
+
+    Returns:
+        (texto mesclado, número de conflitos)
+    """
+    return merge_records(
+        split_records(base), split_records(left), split_records(right),
+        labels=labels, marker_size=marker_size
+    )
@@ -0,0 +1,304 @@
+"""
+Backends de merge de três vias (diff3).
+
+O CSDiffWeb chama o diff3 uma vez no arquivo inteiro e mais uma vez por
+bloco de conflito. Cada backend expõe a mesma operação
+`merge(base, left, right) -> (texto, num_conflitos)`, equivalente a
+`git merge-file -p --diff3`:
+
+- "python": motor em processo (diff3_engine), sem fork
+- "git":    subprocess `git merge-file` (fallback e referência)
+- "auto":   motor em processo para entradas pequenas (caso típico dos
+            blocos de conflito) e git para arquivos grandes, onde o Myers
+            em Python puro fica mais lento que o custo do fork
+
+`merge_batch` executa vários merges independentes numa única chamada (o
+segundo passo do CSDiff sobre todos os blocos de conflito de um arquivo).
+"""
+
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Type, Union
+
+from .diff3_engine import DEFAULT_LABELS, DEFAULT_MARKER_SIZE, merge_records, split_records
+
+# Linha que separa os merges de um lote no GitMergeFileBackend
+BATCH_SENTINEL = "§§CSDIFF_BATCH_{}§§\n"
+_SENTINEL_PREFIX = "§§CSDIFF_BATCH_"
+
+
+class MergeBackend:
+    """Interface comum dos backends de diff3."""
+
+    name = ""
+
+    def merge(
+        self,
+        base: str,
+        left: str,
+        right: str,
+        labels: Sequence[str] = DEFAULT_LABELS
+    ) -> Tuple[str, int]:
+        """
+        Executa o merge de três vias.
+
+        Args:
+            base: Conteúdo do ancestral comum
+            left: Conteúdo do lado esquerdo
+            right: Conteúdo do lado direito
+            labels: Rótulos dos marcadores (left, base, right)
+
+        Returns:
+            (texto mesclado com marcadores diff3, número de conflitos)
+        """
+        raise NotImplementedError
+
+    def merge_batch(
+        self,
+        merges: Sequence[Tuple[str, str, str]],
+        labels: Sequence[str] = DEFAULT_LABELS
+    ) -> List[Tuple[str, int]]:
+        """
+        Executa vários merges independentes.
+
+        Args:
+            merges: Lista de (base, left, right)
+            labels: Rótulos dos marcadores (left, base, right)
+
+        Returns:
+            Lista de (texto mesclado, número de conflitos), na mesma ordem
+        """
+        return [self.merge(base, left, right, labels) for base, left, right in merges]
+
+
+class GitMergeFileBackend(MergeBackend):
+    """Executa `git merge-file` em um subprocess (um fork por merge)."""
+
+    name = "git"
+
+    def __init__(self, concatenate: bool = False):
+        # Concatena o lote num único merge-file (ver merge_batch)
+        self.concatenate = concatenate
+
+    def merge(self, base, left, right, labels=DEFAULT_LABELS):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            base_path = Path(tmpdir) / "base"
+            left_path = Path(tmpdir) / "left"
+            right_path = Path(tmpdir) / "right"
+
+            # Bytes para não traduzir finais de linha (saída idêntica ao git)
+            base_path.write_bytes(base.encode("utf-8"))
+            left_path.write_bytes(left.encode("utf-8"))
+            right_path.write_bytes(right.encode("utf-8"))
+
+            # --diff3 garante que o bloco ||||||| (base) apareça; -p imprime no stdout.
+            # Rótulos fixos (-L) deixam a saída independente do diretório temporário.
+            label_left, label_base, label_right = labels
+            cmd = [
+                "git", "merge-file",
+                "-p",
+                "--diff3",
+                "-L", label_left, "-L", label_base, "-L", label_right,
+                str(left_path),
+                str(base_path),
+                str(right_path)
+            ]
+
+            result = subprocess.run(cmd, capture_output=True)
+
+            # git merge-file retorna:
+            # 0: sem conflito
+            # positivo: número de conflitos (limitado a 127)
+            # negativo (255): erro, p.ex. arquivo binário
+            return result.stdout.decode("utf-8"), result.returncode
+
+    def merge_batch(self, merges, labels=DEFAULT_LABELS):
+        """
+        Com `concatenate`, um único `git merge-file` para todo o lote.
+
+        As entradas são concatenadas intercaladas com linhas sentinela
+        únicas (idênticas nas três versões) e a saída é recortada nelas.
+        O Myers do git não garante alinhar as sentinelas quando os blocos
+        são grandes e repetitivos; nesse caso, ou se alguma entrada não
+        termina em '\n', cada merge roda separadamente.
+
+        Desligado por padrão: as heurísticas do xdiff dependem do tamanho
+        do arquivo (descarte de linhas repetidas, corte de custo do Myers),
+        então o resultado concatenado pode diferir do merge isolado.
+        """
+        if not self.concatenate or len(merges) < 2 or not _batchable(merges):
+            return super().merge_batch(merges, labels)
+
+        sides = ([], [], [])
+        for i, parts in enumerate(merges):
+            sentinel = BATCH_SENTINEL.format(i)
+            for side, part in zip(sides, parts):
+                side.append(sentinel)
+                side.append(part)
+        closing = BATCH_SENTINEL.format(len(merges))
+        for side in sides:
+            side.append(closing)
+
+        merged, _ = self.merge(*("".join(side) for side in sides), labels=labels)
+        regions = _split_batch(merged, len(merges))
+        if regions is None:
+            return super().merge_batch(merges, labels)
+
+        start_marker = "<" * DEFAULT_MARKER_SIZE + " " + labels[0] + "\n"
+        return [
+            (region, sum(1 for line in split_records(region) if line == start_marker))
+            for region in regions
+        ]
+
+
+class PythonMergeBackend(MergeBackend):
+    """
+    Motor diff3 em processo (porta do xdiff do git).
+
+    Entradas que o git trata como binárias (byte NUL) são delegadas ao
+    fallback para reproduzir exatamente o comportamento do git.
+    """
+
+    name = "python"
+
+    def __init__(self, fallback: Optional[MergeBackend] = None):
+        self.fallback = fallback or GitMergeFileBackend()
+
+    def merge(self, base, left, right, labels=DEFAULT_LABELS):
+        if "\0" in base or "\0" in left or "\0" in right:
+            return self.fallback.merge(base, left, right, labels)
+
+        return merge_records(
+            split_records(base), split_records(left), split_records(right),
+            labels=labels
+        )
+
+
+class AutoMergeBackend(PythonMergeBackend):
+    """
+    Escolhe o backend pelo tamanho da entrada.
+
+    Abaixo de `max_records` linhas (somando as três versões) o motor em
+    processo é mais rápido que o fork; acima disso o custo do Myers em
+    Python supera o do subprocess e o git é usado.
+    """
+
+    name = "auto"
+
+    MAX_INPROCESS_RECORDS = 500
+
+    def __init__(
+        self,
+        fallback: Optional[MergeBackend] = None,
+        max_records: int = MAX_INPROCESS_RECORDS
+    ):
+        super().__init__(fallback)
+        self.max_records = max_records
+
+    def merge(self, base, left, right, labels=DEFAULT_LABELS):
+        base_recs = split_records(base)
+        left_recs = split_records(left)
+        right_recs = split_records(right)
+
+        total = len(base_recs) + len(left_recs) + len(right_recs)
+        if total > self.max_records or "\0" in base or "\0" in left or "\0" in right:
+            return self.fallback.merge(base, left, right, labels)
+
+        return merge_records(base_recs, left_recs, right_recs, labels=labels)
+
+    def merge_batch(self, merges, labels=DEFAULT_LABELS):
+        # Merges pequenos rodam em processo; os grandes vão juntos ao fallback
+        results: List[Optional[Tuple[str, int]]] = [None] * len(merges)
+        delegated = []
+        for i, (base, left, right) in enumerate(merges):
+            records = [split_records(text) for text in (base, left, right)]
+            if (sum(len(r) for r in records) > self.max_records
+                    or "\0" in base or "\0" in left or "\0" in right):
+                delegated.append(i)
+            else:
+                results[i] = merge_records(*records, labels=labels)
+
+        if delegated:
+            delegated_results = self.fallback.merge_batch([merges[i] for i in delegated], labels)
+            for i, result in zip(delegated, delegated_results):
+                results[i] = result
+        return results
+
+
+def _batchable(merges: Sequence[Tuple[str, str, str]]) -> bool:
+    """Entradas concatenáveis: terminam em '\\n' e não contêm sentinelas."""
+    return all(
+        _SENTINEL_PREFIX not in text and (not text or text.endswith("\n"))
+        for parts in merges for text in parts
+    )
+
+
+def _split_batch(merged: str, num_merges: int) -> Optional[List[str]]:
+    """
+    Recorta a saída do merge em lote nas sentinelas.
+
+    Returns:
+        Texto de cada merge, ou None se alguma sentinela não aparecer, na
+        ordem, como linha fora de conflito.
+    """
+    regions: List[str] = []
+    current: List[str] = []
+    expected = 0
+    in_conflict = False
+
+    for line in split_records(merged):
+        if line.startswith("<<<<<<<"):
+            in_conflict = True
+        elif line.startswith(">>>>>>>"):
+            in_conflict = False
+        elif line.startswith(_SENTINEL_PREFIX):
+            if in_conflict or line != BATCH_SENTINEL.format(expected):
+                return None
+            if expected > 0:
+                regions.append("".join(current))
+            elif current:
+                return None
+            current = []
+            expected += 1
+            continue
+        current.append(line)
+
+    if expected != num_merges + 1 or current:
+        return None
+    return regions
+
+
+BACKENDS: Dict[str, Type[MergeBackend]] = {
+    "auto": AutoMergeBackend,
+    "python": PythonMergeBackend,
+    "git": GitMergeFileBackend,
+}
+
+DEFAULT_BACKEND = "auto"
+
+
+def get_backend(backend: Union[str, MergeBackend, None] = None) -> MergeBackend:
+    """
+    Resolve um backend pelo nome (ou devolve a instância recebida).
+
+    Args:
+        backend: "auto", "python", "git", uma instância de MergeBackend
+                 ou None (usa DEFAULT_BACKEND)
+
+    Returns:
+        Instância de MergeBackend
+
+    Raises:
+        ValueError: Se o nome não for reconhecido
+    """
+    if isinstance(backend, MergeBackend):
+        return backend
+
+    name = backend or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Backend de merge desconhecido: {name} "
+            f"(disponíveis: {', '.join(BACKENDS)})"
+        )
+    return BACKENDS[name]()
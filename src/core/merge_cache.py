@@ -0,0 +1,250 @@
+"""
+Cache de resultados do CSDiffWeb.merge endereçado por conteúdo.
+
+A chave é o SHA-256 de (base, left, right, extensão, separadores e opções
+que alteram a saída). Dois níveis:
+
+- memória: LRU limitado por número de entradas
+- disco (opcional): SQLite em `cache_dir`, limitado por tamanho total, com
+  despejo das entradas acessadas há mais tempo
+
+Reexecuções de experimentos sobre as mesmas triplas (ou várias ferramentas
+e rodadas sobre a mesma tupla) passam a ler o resultado em vez de refazer
+o CSDiff.
+
+O mesmo cache memoiza o segundo passo por bloco de conflito: blocos
+idênticos (a mesma lista de imports em vários arquivos de um merge, por
+exemplo) são explodidos e mesclados uma única vez. `get_block_cache`
+devolve a instância compartilhada pelos CSDiffWeb do processo.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+# Incrementar quando o algoritmo mudar a saída (invalida entradas antigas)
+CACHE_VERSION = 1
+
+# Entradas em memória do cache de blocos compartilhado pelo processo
+BLOCK_CACHE_ENTRIES = 4096
+
+
+def make_key(base: str, left: str, right: str, extension: str, *options: str) -> str:
+    """
+    Calcula a chave de cache de um merge.
+
+    Args:
+        base, left, right: Conteúdos das três versões
+        extension: Extensão do arquivo
+        options: Demais valores que alteram a saída (separadores, modo, ...)
+
+    Returns:
+        Digest SHA-256 em hexadecimal
+    """
+    digest = hashlib.sha256()
+    # Prefixo de tamanho: evita colisões entre ("ab", "c") e ("a", "bc")
+    for part in (str(CACHE_VERSION), extension, *options, base, left, right):
+        data = part.encode("utf-8", "surrogatepass")
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class MergeCache:
+    """
+    Cache em dois níveis (memória LRU + SQLite) para resultados de merge.
+    """
+
+    DB_NAME = "merge_cache.sqlite3"
+
+    # Gravações entre recontagens do tamanho em disco (outros processos
+    # podem gravar no mesmo arquivo sem passar pelo total local)
+    DISK_RESYNC_PUTS = 256
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        cache_dir: Optional[Path] = None,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+        db_name: str = DB_NAME
+    ):
+        """
+        Inicializa cache.
+
+        Args:
+            max_entries: Máximo de resultados mantidos em memória
+            cache_dir: Diretório do nível em disco (None = só memória)
+            max_disk_bytes: Tamanho máximo somado dos resultados em disco
+            db_name: Nome do arquivo SQLite dentro de `cache_dir`
+        """
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
+        self._memory: "OrderedDict[str, Tuple]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Vários processos do runner podem compartilhar o mesmo arquivo
+            self._db = sqlite3.connect(str(self.cache_dir / db_name), timeout=60)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+            self._db.commit()
+
+        # Tamanho somado em disco, mantido a cada put (recontado com SUM só
+        # ao passar do limite ou a cada DISK_RESYNC_PUTS gravações)
+        self._disk_bytes = 0
+        self._puts_since_resync = 0
+        if self._db is not None:
+            self._disk_bytes = self._disk_size()
+
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'memory_evictions': 0,
+            'disk_evictions': 0,
+        }
+
+    def get(self, key: str) -> Optional[Tuple]:
+        """
+        Busca um resultado.
+
+        Returns:
+            Tupla retornada originalmente por CSDiffWeb.merge, ou None
+        """
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.stats['memory_hits'] += 1
+            return self._memory[key]
+
+        if self._db is not None:
+            row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._db.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+                self._db.commit()
+                value = tuple(json.loads(row[0]))
+                self._remember(key, value)
+                self.stats['disk_hits'] += 1
+                return value
+
+        self.stats['misses'] += 1
+        return None
+
+    def put(self, key: str, value: Tuple):
+        """Armazena um resultado nos dois níveis."""
+        self.stats['stores'] += 1
+        self._remember(key, value)
+
+        if self._db is not None:
+            payload = json.dumps(list(value), ensure_ascii=False)
+            replaced = self._db.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload), time.time())
+            )
+            self._disk_bytes += len(payload) - (replaced[0] if replaced else 0)
+            self._puts_since_resync += 1
+            if self._puts_since_resync >= self.DISK_RESYNC_PUTS:
+                self._disk_bytes = self._disk_size()
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+            self._db.commit()
+
+    def _remember(self, key: str, value: Tuple):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats['memory_evictions'] += 1
+
+    def _disk_size(self) -> int:
+        """Tamanho somado dos resultados em disco (recontado no banco)."""
+        self._puts_since_resync = 0
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def _evict_disk(self):
+        """Remove as entradas acessadas há mais tempo até caber no limite."""
+        total = self._disk_bytes = self._disk_size()
+        if total <= self.max_disk_bytes:
+            return
+
+        rows = self._db.execute("SELECT key, size FROM results ORDER BY accessed").fetchall()
+        for key, size in rows:
+            if total <= self.max_disk_bytes:
+                break
+            self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+            self.stats['disk_evictions'] += 1
+        self._disk_bytes = total
+
+    def clear(self):
+        """Esvazia os dois níveis."""
+        self._memory.clear()
+        if self._db is not None:
+            self._db.execute("DELETE FROM results")
+            self._db.commit()
+            self._disk_bytes = 0
+
+    def close(self):
+        """Fecha a conexão com o nível em disco."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __len__(self) -> int:
+        if self._db is not None:
+            return self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return len(self._memory)
+
+    def get_statistics(self) -> dict:
+        """Retorna estatísticas do cache."""
+        lookups = self.stats['memory_hits'] + self.stats['disk_hits'] + self.stats['misses']
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        return {
+            **self.stats,
+            'hit_rate': hits / lookups * 100 if lookups else 0.0,
+            'memory_entries': len(self._memory),
+        }
+
+    def print_statistics(self, title: str = "ESTATÍSTICAS DO CACHE DE MERGE"):
+        """Imprime estatísticas do cache."""
+        stats = self.get_statistics()
+        print("\n" + "=" * 60)
+        print(title)
+        print("=" * 60)
+        print(f"Acertos (memória):  {stats['memory_hits']}")
+        print(f"Acertos (disco):    {stats['disk_hits']}")
+        print(f"Faltas:             {stats['misses']}")
+        print(f"Taxa de acerto:     {stats['hit_rate']:.1f}%")
+        print(f"Despejos (memória): {stats['memory_evictions']}")
+        print(f"Despejos (disco):   {stats['disk_evictions']}")
+        print("=" * 60)
+
+
+_block_cache: Optional[MergeCache] = None
+
+
+def get_block_cache() -> MergeCache:
+    """
+    Retorna o cache de blocos compartilhado pelo processo (só memória).
+
+    Criado na primeira chamada. O runner passa sua própria instância (com
+    nível em disco) para compartilhar os blocos entre rodadas.
+    """
+    global _block_cache
+    if _block_cache is None:
+        _block_cache = MergeCache(max_entries=BLOCK_CACHE_ENTRIES)
+    return _block_cache
+
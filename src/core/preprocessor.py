@@ -1,25 +1,17 @@
-from typing import List
+from .separators import DEFAULT_EXPLODE_MODE, get_separators, get_tokenizer
 
 class Preprocessor:
     """
     Equivalente simplificado para o método 'addMarkers' do SepMerge.
     Apenas isola os separadores com quebras de linha.
     """
-    def __init__(self, extension: str):
-        from .separators import get_separators
+    def __init__(self, extension: str, mode: str = DEFAULT_EXPLODE_MODE):
         self.separators = get_separators(extension)
+        # Tokenizador compilado uma vez por (extensão, modo), ver separators.py
+        self.tokenizer = get_tokenizer(extension, mode)
 
     def explode(self, text: str) -> str:
-        # Lógica idêntica ao SepMerge (Java):
+        # Lógica idêntica ao SepMerge (Java) no modo "cascade":
         # line.replace(separator, String.format("%n%s%n", separator))
-        
-        # Para evitar substituir separadores que foram inseridos por substituições anteriores,
-        # o ideal é uma abordagem cuidadosa, mas o SepMerge original faz um loop simples.
-        # Vamos replicar o comportamento do Java.
-        
-        result = text
-        for sep in self.separators:
-            # O Python replace é equivalente ao do Java para strings
-            result = result.replace(sep, f"\n{sep}\n")
-            
-        return result
\ No newline at end of file
+        # para cada separador, mas feita em uma única varredura do texto.
+        return self.tokenizer.explode(text)
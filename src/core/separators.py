@@ -6,7 +6,9 @@ Este módulo define os separadores que serão usados para "explodir" o código
 em múltiplas linhas, permitindo que o diff3 opere em granularidade sintática.
 """
 
-from typing import List, Dict
+import re
+from functools import lru_cache
+from typing import Dict, List, Pattern
 
 # Mapeamento de extensões para separadores
 # TypeScript/JavaScript: Separadores lógicos (controle de fluxo, estruturas)
@@ -58,6 +60,234 @@ def get_separators(extension: str) -> List[str]:
     return sorted(seps, key=len, reverse=True)
 
 
+# Modos de explosão:
+# - "cascade": reproduz o loop de str.replace do SepMerge (Java), em que
+#   separadores que contêm outros menores são explodidos de novo
+#   ("=>" vira "\n=\n>\n\n" em .tsx)
+# - "single": cada separador é isolado uma única vez ("=>" vira "\n=>\n")
+EXPLODE_MODES = ("cascade", "single")
+DEFAULT_EXPLODE_MODE = "cascade"
+
+
+class SeparatorTokenizer:
+    """
+    Explode o texto em uma única varredura linear.
+
+    Uma única regex de alternância (maior separador primeiro) encontra os
+    separadores; cada um é substituído pela sua expansão pré-calculada.
+    No modo "cascade" a expansão de um separador é o resultado de aplicar
+    os passes seguintes do loop original sobre "\\n<sep>\\n".
+    """
+
+    def __init__(self, separators: List[str], mode: str = DEFAULT_EXPLODE_MODE):
+        if mode not in EXPLODE_MODES:
+            raise ValueError(
+                f"Modo de explosão desconhecido: {mode} "
+                f"(disponíveis: {', '.join(EXPLODE_MODES)})"
+            )
+        self.separators = separators
+        self.mode = mode
+
+        alternation = "|".join(re.escape(sep) for sep in separators)
+
+        # Grupo de captura: re.split devolve os separadores nas posições ímpares
+        self.pattern: Pattern = re.compile(f"({alternation})")
+        self.expansions: Dict[str, str] = {}
+        for i, sep in enumerate(separators):
+            expansion = f"\n{sep}\n"
+            if mode == "cascade":
+                expansion = _cascade(expansion, separators[i + 1:])
+            self.expansions[sep] = expansion
+
+        # A varredura única só equivale ao loop se nenhum separador de menor
+        # prioridade puder começar antes de um de maior prioridade e
+        # sobrepô-lo; caso contrário o modo cascade usa o loop original.
+        self._use_loop = mode == "cascade" and _has_priority_overlap(separators)
+
+        # Implosão: linhas cujo conteúdo é exatamente um separador. Os
+        # lookarounds não consomem os \n, então linhas vizinhas também casam.
+        self.line_pattern: Pattern = re.compile(f"(?<=\n)(?:{alternation})(?=\n)")
+        # Duas linhas-separador vizinhas: disputam o mesmo \n
+        self.adjacent_pattern: Pattern = re.compile(
+            f"\n(?:{alternation})\n(?:{alternation})\n"
+        )
+        # "\n<sep>\n": re.split devolve os separadores sem as quebras de linha
+        self.collapse_pattern: Pattern = re.compile(f"\n({alternation})\n")
+        self.ranks: Dict[str, int] = {sep: i for i, sep in enumerate(separators)}
+
+    def explode(self, text: str) -> str:
+        """Isola cada separador do texto com quebras de linha."""
+        if not self.separators:
+            return text
+        if self._use_loop:
+            return _cascade(text, self.separators)
+
+        parts = self.pattern.split(text)
+        parts[1::2] = map(self.expansions.__getitem__, parts[1::2])
+        return "".join(parts)
+
+    def implode(self, text: str) -> str:
+        """
+        Reverte a explosão: "\\n<sep>\\n" vira "<sep>", em uma única varredura.
+
+        Equivale a um str.replace por separador (maior primeiro). Quebras de
+        linha junto a marcadores de conflito são preservadas, para que os
+        marcadores continuem em linhas próprias.
+        """
+        if not self.separators:
+            return text
+
+        # Linhas-separador vizinhas disputam o mesmo \n e a ordem dos passes
+        # importa; o texto explodido quase nunca as tem (cada separador vem
+        # cercado de linhas próprias), então o caso geral fica fora do re.sub.
+        if "\0" in text or self.adjacent_pattern.search(text):
+            return self._implode_scan(text)
+
+        if any(marker in text for marker in CONFLICT_MARKERS):
+            text = self._protect_marker_lines(text)
+            return "".join(self.collapse_pattern.split(text)).replace("\0", "\n")
+        return "".join(self.collapse_pattern.split(text))
+
+    def _protect_marker_lines(self, text: str) -> str:
+        """
+        Troca por \\0 as quebras de linha em volta dos marcadores de conflito
+        (o collapse_pattern não as consome) e já colapsa o outro lado das
+        linhas-separador vizinhas a um marcador.
+        """
+        edits: Dict[int, str] = {}
+        for marker in CONFLICT_MARKERS:
+            start = text.find(marker)
+            while start != -1:
+                if start == 0 or text[start - 1] == "\n":
+                    end = text.find("\n", start)
+                    if start > 0:
+                        edits[start - 1] = "\0"
+                        prev_nl = text.rfind("\n", 0, start - 1)
+                        if prev_nl != -1 and text[prev_nl + 1:start - 1] in self.ranks:
+                            edits.setdefault(prev_nl, "")
+                    if end != -1:
+                        edits[end] = "\0"
+                        next_nl = text.find("\n", end + 1)
+                        if next_nl != -1 and text[end + 1:next_nl] in self.ranks:
+                            edits.setdefault(next_nl, "")
+                start = text.find(marker, start + 1)
+
+        pieces = []
+        pos = 0
+        for nl in sorted(edits):
+            pieces.append(text[pos:nl])
+            pieces.append(edits[nl])
+            pos = nl + 1
+        pieces.append(text[pos:])
+        return "".join(pieces)
+
+    def _implode_scan(self, text: str) -> str:
+        """
+        Implosão geral: resolve as linhas-separador vizinhas como o loop de
+        str.replace (vence a de maior prioridade; entre iguais, a mais à
+        esquerda).
+        """
+        matches = [
+            (m.start(), m.end(), self.ranks[m.group()])
+            for m in self.line_pattern.finditer(text)
+        ]
+        if not matches:
+            return text
+
+        pieces = []
+        pos = 0
+        for start, end in _select_collapses(matches):
+            # \n antes do separador (start - 1) e depois dele (end)
+            prev_line = text.rfind("\n", 0, start - 1) + 1
+            cut_before = not text.startswith(CONFLICT_MARKERS, prev_line)
+            cut_after = not text.startswith(CONFLICT_MARKERS, end + 1)
+
+            pieces.append(text[pos:start - 1 if cut_before else start])
+            pieces.append(text[start:end])
+            pos = end + 1 if cut_after else end
+
+        pieces.append(text[pos:])
+        return "".join(pieces)
+
+
+# Linhas de marcador do diff3, nunca unidas a um separador na implosão
+CONFLICT_MARKERS = ("<<<<<<<", "|||||||", "=======", ">>>>>>>")
+
+
+def _select_collapses(matches):
+    """
+    Escolhe quais linhas-separador colapsar, como o loop de str.replace.
+
+    Linhas vizinhas (separadas por um único \\n) formam uma sequência em que
+    cada \\n só pode ser removido uma vez: a sequência é resolvida em ordem
+    de prioridade e, dentro da mesma prioridade, da esquerda para a direita.
+    """
+    chosen = []
+    i = 0
+    while i < len(matches):
+        j = i + 1
+        while j < len(matches) and matches[j][0] == matches[j - 1][1] + 1:
+            j += 1
+
+        run = matches[i:j]
+        if len(run) == 1:
+            chosen.append(run[0][:2])
+        else:
+            taken = [False] * len(run)
+            for rank in sorted({r for _, _, r in run}):
+                for k, (_, _, r) in enumerate(run):
+                    if (r == rank
+                            and not (k > 0 and taken[k - 1])
+                            and not (k + 1 < len(run) and taken[k + 1])):
+                        taken[k] = True
+            chosen.extend(m[:2] for m, t in zip(run, taken) if t)
+        i = j
+    return chosen
+
+
+def _cascade(text: str, separators: List[str]) -> str:
+    """Loop original do SepMerge: um str.replace por separador."""
+    for sep in separators:
+        text = text.replace(sep, f"\n{sep}\n")
+    return text
+
+
+def _has_priority_overlap(separators: List[str]) -> bool:
+    """
+    True se um separador posterior termina com um prefixo próprio de um
+    anterior (p.ex. "?=" depois de "=>"), caso em que o match mais à
+    esquerda da regex difere da ordem de prioridade do loop.
+    """
+    for i, first in enumerate(separators):
+        for later in separators[i + 1:]:
+            for size in range(1, min(len(first), len(later))):
+                if later.endswith(first[:size]):
+                    return True
+    return False
+
+
+@lru_cache(maxsize=None)
+def _cached_tokenizer(normalized_ext: str, mode: str) -> SeparatorTokenizer:
+    return SeparatorTokenizer(get_separators(normalized_ext), mode)
+
+
+def get_tokenizer(extension: str, mode: str = DEFAULT_EXPLODE_MODE) -> SeparatorTokenizer:
+    """
+    Retorna o tokenizador da extensão, construído uma vez por processo.
+
+    Args:
+        extension: Extensão do arquivo (ex: ".ts", ".tsx")
+        mode: "cascade" (compatível com o SepMerge) ou "single"
+
+    Returns:
+        SeparatorTokenizer compartilhado para (extensão, modo)
+    """
+    normalized_ext = extension.lower()
+    if normalized_ext not in SEPARATORS:
+        normalized_ext = ".ts"
+    return _cached_tokenizer(normalized_ext, mode)
+
+
 def get_supported_extensions() -> List[str]:
     """
     Retorna lista de extensões suportadas pela ferramenta.
@@ -0,0 +1,250 @@
+"""
+Leitura de blobs por processos `git cat-file` persistentes.
+
+Em vez de resolver `commit.tree / filepath` e ler `blob.data_stream` pelo
+GitPython para cada versão de cada arquivo, mantém dois processos abertos
+por repositório:
+
+- `git cat-file --batch-check`: resolve `<sha>:<path>` no SHA do blob
+- `git cat-file --batch`: lê o conteúdo dos blobs
+
+As quatro versões de um arquivo (base, left, right, merged) são resolvidas
+em uma única ida e volta; blobs idênticos entre versões (ou já lidos em
+merges anteriores) são lidos uma única vez.
+"""
+
+import subprocess
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class GitBlobReaderError(RuntimeError):
+    """Falha de comunicação com o `git cat-file`."""
+
+
+class GitBlobReader:
+    """
+    Leitor de blobs de um repositório via `git cat-file --batch`.
+
+    Thread-safe: pedidos concorrentes são serializados.
+    """
+
+    def __init__(self, repo_path: Path, max_cache_bytes: int = 64 * 1024 * 1024):
+        """
+        Inicializa leitor (os processos só sobem no primeiro pedido).
+
+        Args:
+            repo_path: Diretório de trabalho (ou .git) do repositório
+            max_cache_bytes: Tamanho máximo do cache de blobs lidos (LRU)
+        """
+        self.repo_path = Path(repo_path)
+        self.max_cache_bytes = max_cache_bytes
+
+        self._check: Optional[subprocess.Popen] = None
+        self._batch: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+        # SHA do blob -> conteúdo
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cache_bytes = 0
+
+        self.stats = {
+            'resolved': 0,
+            'missing': 0,
+            'blobs_read': 0,
+            'blob_reuses': 0,
+            'bytes_read': 0,
+        }
+
+    def resolve(self, specs: Iterable[str]) -> List[Optional[str]]:
+        """
+        Resolve objetos (`<rev>:<path>`, SHA, ...) nos SHAs de seus blobs.
+
+        Args:
+            specs: Nomes de objetos aceitos por `git cat-file`
+
+        Returns:
+            SHA de cada blob, na mesma ordem; None se não existir ou não for blob
+        """
+        specs = list(specs)
+        with self._lock:
+            return self._resolve(specs)
+
+    def read_blobs(self, shas: Iterable[str]) -> Dict[str, bytes]:
+        """
+        Lê o conteúdo de blobs pelo SHA.
+
+        Returns:
+            Dict SHA -> conteúdo (SHAs repetidos são lidos uma vez)
+        """
+        shas = list(shas)
+        with self._lock:
+            return self._read_blobs(shas)
+
+    def read(self, specs: Iterable[str]) -> List[Optional[bytes]]:
+        """
+        Resolve e lê vários objetos em uma ida e volta.
+
+        Args:
+            specs: Nomes de objetos (ex.: `f"{commit.hexsha}:{filepath}"`)
+
+        Returns:
+            Conteúdo de cada objeto, na mesma ordem; None se não existir
+        """
+        specs = list(specs)
+        with self._lock:
+            shas = self._resolve(specs)
+            contents = self._read_blobs([sha for sha in shas if sha is not None])
+        return [contents[sha] if sha is not None else None for sha in shas]
+
+    def close(self):
+        """Encerra os processos `git cat-file`."""
+        with self._lock:
+            for process in (self._check, self._batch):
+                if process is None:
+                    continue
+                try:
+                    process.stdin.close()
+                except OSError:
+                    pass
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+                process.stdout.close()
+            self._check = None
+            self._batch = None
+
+    def get_statistics(self) -> Dict:
+        return self.stats.copy()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _start(self, mode: str) -> subprocess.Popen:
+        return subprocess.Popen(
+            ["git", "-C", str(self.repo_path), "cat-file", mode],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+
+    def _ensure_running(self, attr: str, mode: str) -> subprocess.Popen:
+        process = getattr(self, attr)
+        if process is None or process.poll() is not None:
+            if process is not None:
+                logger.warning(f"git cat-file {mode} encerrado, reiniciando")
+            process = self._start(mode)
+            setattr(self, attr, process)
+        return process
+
+    def _send(self, process: subprocess.Popen, names: List[str]):
+        payload = "".join(f"{name}\n" for name in names).encode('utf-8')
+        try:
+            process.stdin.write(payload)
+            process.stdin.flush()
+        except OSError as e:
+            raise GitBlobReaderError(f"Falha ao escrever no git cat-file: {e}") from e
+
+    def _header(self, process: subprocess.Popen) -> List[bytes]:
+        line = process.stdout.readline()
+        if not line:
+            raise GitBlobReaderError("git cat-file encerrou a saída")
+        return line.rstrip(b"\n").split(b" ")
+
+    def _resolve(self, specs: List[str]) -> List[Optional[str]]:
+        if not specs:
+            return []
+        # Nomes com quebra de linha não são expressáveis no protocolo
+        valid = [spec for spec in specs if "\n" not in spec]
+        process = self._ensure_running('_check', '--batch-check')
+
+        resolved = {}
+        try:
+            self._send(process, valid)
+            for spec in valid:
+                fields = self._header(process)
+                # "<sha> <tipo> <tamanho>" ou "<nome> missing" / "<nome> ambiguous"
+                if len(fields) == 3 and fields[1] == b"blob":
+                    resolved[spec] = fields[0].decode('ascii')
+        except GitBlobReaderError:
+            # Respostas pendentes dessincronizariam o próximo pedido
+            self._kill('_check')
+            raise
+
+        shas = [resolved.get(spec) for spec in specs]
+        found = sum(sha is not None for sha in shas)
+        self.stats['resolved'] += found
+        self.stats['missing'] += len(shas) - found
+        return shas
+
+    def _read_blobs(self, shas: List[str]) -> Dict[str, bytes]:
+        contents = {}
+        pending = []
+        for sha in shas:
+            if sha in contents or sha in pending:
+                self.stats['blob_reuses'] += 1
+            elif sha in self._cache:
+                self._cache.move_to_end(sha)
+                contents[sha] = self._cache[sha]
+                self.stats['blob_reuses'] += 1
+            else:
+                pending.append(sha)
+
+        if not pending:
+            return contents
+
+        process = self._ensure_running('_batch', '--batch')
+
+        try:
+            self._send(process, pending)
+            for sha in pending:
+                fields = self._header(process)
+                if len(fields) != 3:
+                    raise GitBlobReaderError(f"Objeto {sha} não encontrado")
+                size = int(fields[2])
+                data = process.stdout.read(size + 1)[:size]
+                if len(data) != size:
+                    raise GitBlobReaderError(f"Leitura incompleta do objeto {sha}")
+
+                contents[sha] = data
+                self.stats['blobs_read'] += 1
+                self.stats['bytes_read'] += size
+                self._remember(sha, data)
+        except GitBlobReaderError:
+            self._kill('_batch')
+            raise
+
+        return contents
+
+    def _kill(self, attr: str):
+        process = getattr(self, attr)
+        if process is None:
+            return
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+        for stream in (process.stdin, process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+        setattr(self, attr, None)
+
+    def _remember(self, sha: str, data: bytes):
+        if len(data) > self.max_cache_bytes:
+            return
+        self._cache[sha] = data
+        self._cache_bytes += len(data)
+        while self._cache_bytes > self.max_cache_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_bytes -= len(evicted)
@@ -10,15 +10,80 @@ REQUISITOS DO ORIENTADOR:
 Este módulo implementa o FILTRO CRÍTICO mencionado no pseudocódigo:
     SE len(pais.split()) ≠ 2:
         CONTINUAR  # Ignorar (não é merge real)
+
+Os merges são enumerados por um único `git rev-list --merges --parents`
+lido em streaming (iter_merge_records): cada linha já traz o merge e seus
+pais, e objetos Commit só são criados para os merges aprovados. As merge
+bases de cada lote de merges são calculadas juntas por um
+MergeBaseService (cache persistente + grafo local), quando fornecido.
 """
 
+import subprocess
+from itertools import islice
 from git import Commit
-from typing import List, Dict, Optional
+from gitdb.util import hex_to_bin
+from typing import Callable, List, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
 import logging
 
+from .merge_base import MergeBaseService, git_merge_base
+
 logger = logging.getLogger(__name__)
 
 
+class MergeRecord(NamedTuple):
+    """Merge listado pelo rev-list: SHA do commit e SHAs dos pais."""
+    sha: str
+    parents: Tuple[str, ...]
+
+
+def iter_merge_records(
+    repo,
+    max_count: Optional[int] = None,
+    revs: Tuple[str, ...] = ('--all',)
+) -> Iterator[MergeRecord]:
+    """
+    Enumera commits de merge com um único `git rev-list --merges --parents`.
+
+    A saída é lida linha a linha: nada é materializado e o processo é
+    encerrado se o consumidor parar antes do fim.
+
+    Args:
+        repo: Repositório Git
+        max_count: Máximo de merges (None = todos)
+        revs: Revisões de partida (padrão: todas as refs)
+
+    Yields:
+        MergeRecord(sha, parents), na ordem do rev-list
+
+    Examples:
+        >>> records = iter_merge_records(repo, max_count=1000)
+        >>> next(records).parents
+        ('3f2a...', '9b1c...')
+    """
+    args = ["git", "--git-dir", str(repo.git_dir), "rev-list", "--merges", "--parents"]
+    if max_count is not None:
+        args.append(f"--max-count={max_count}")
+    args.extend(revs)
+
+    process = subprocess.Popen(
+        args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    try:
+        for line in process.stdout:
+            sha, *parents = line.split()
+            yield MergeRecord(sha, tuple(parents))
+
+        stderr = process.stderr.read()
+        if process.wait() != 0:
+            raise subprocess.CalledProcessError(process.returncode, args, stderr=stderr)
+    finally:
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+
 class CommitFilter:
     """
     Filtra commits de merge válidos para mineração.
@@ -29,13 +94,34 @@ class CommitFilter:
     3. Ter ancestral comum válido (merge base existe)
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        merge_bases: Optional[MergeBaseService] = None,
+        batch_size: int = 256,
+        on_reject: Optional[Callable[[str, str], None]] = None
+    ):
+        """
+        Inicializa filtro.
+
+        Args:
+            merge_bases: Serviço de merge bases em lote/cache do repositório
+                         (None = um `git merge-base` por merge)
+            batch_size: Merges cujas bases são calculadas juntas em
+                        filter_merge_records
+            on_reject: Chamado com (SHA do merge, motivo) para cada merge
+                       rejeitado em filter_merge_records; o motivo é a chave
+                       da estatística correspondente
+        """
+        self.merge_bases = merge_bases
+        self.batch_size = batch_size
+        self.on_reject = on_reject
         self.stats = {
             'total_commits': 0,
             'merge_commits': 0,
             'invalid_parent_count': 0,
             'fast_forwards': 0,
             'no_merge_base': 0,
+            'merge_base_errors': 0,
             'valid_merges': 0
         }
 
@@ -145,72 +231,181 @@ class CommitFilter:
 
         except Exception as e:
             logger.error(f"Erro ao buscar merge base: {e}")
-            self.stats['no_merge_base'] += 1
+            self.stats['merge_base_errors'] += 1
             return None
 
-    def filter_merge_commits(
+    def get_merge_base_sha(
         self,
         repo,
-        commits: List[Commit]
-    ) -> List[Dict]:
+        left_sha: str,
+        right_sha: str
+    ) -> Optional[str]:
         """
-        Filtra lista de commits, retornando apenas merges válidos.
+        Encontra o merge base entre dois commits, pelos SHAs.
 
         Args:
             repo: Repositório Git
-            commits: Lista de commits a filtrar
+            left_sha: SHA do primeiro pai
+            right_sha: SHA do segundo pai
 
         Returns:
-            Lista de dicts com estrutura:
-            {
-                'commit': Commit do merge,
-                'base': Commit do ancestral comum,
-                'left': Primeiro pai,
-                'right': Segundo pai
-            }
+            SHA do merge base, ou None se não encontrado (ou em caso de erro)
+        """
+        try:
+            if self.merge_bases is not None:
+                base_sha = self.merge_bases.merge_base(left_sha, right_sha)
+            else:
+                base_sha = git_merge_base(repo, left_sha, right_sha)
+        except Exception as e:
+            logger.error(f"Erro ao buscar merge base: {e}")
+            self.stats['merge_base_errors'] += 1
+            return None
+
+        if base_sha is None:
+            self._count_no_merge_base(left_sha, right_sha)
+        return base_sha
+
+    def _count_no_merge_base(self, left_sha: str, right_sha: str):
+        self.stats['no_merge_base'] += 1
+        logger.warning(
+            f"Nenhum merge base encontrado entre "
+            f"{left_sha[:8]} e {right_sha[:8]}"
+        )
+
+    def filter_merge_records(
+        self,
+        repo,
+        records: Iterable[MergeRecord]
+    ) -> Iterator[Dict]:
+        """
+        Filtra merges listados pelo rev-list, sob demanda.
+
+        Os filtros usam apenas SHAs; os objetos Commit do merge aprovado são
+        criados sem ler o objeto no repositório (carregamento preguiçoso).
+
+        Args:
+            repo: Repositório Git
+            records: MergeRecords (ver iter_merge_records)
+
+        Yields:
+            Dicts com 'commit', 'base', 'left', 'right' (como filter_merge_commits)
 
         Examples:
             >>> filter = CommitFilter()
-            >>> merges = filter.filter_merge_commits(repo, all_commits)
-            >>> len(merges) >= 0
-            True
+            >>> merges = filter.filter_merge_records(repo, iter_merge_records(repo))
+            >>> next(merges)['base']
+            <git.Commit "...">
         """
-        valid_merges = []
+        records = iter(records)
+        while True:
+            chunk = list(islice(records, self.batch_size))
+            if not chunk:
+                return
+            yield from self._filter_chunk(repo, chunk)
+
+    def _filter_chunk(self, repo, chunk: List[MergeRecord]) -> Iterator[Dict]:
+        """Filtra um lote de merges, calculando as merge bases juntas."""
+        candidates = []
+        for record in chunk:
+            self.stats['total_commits'] += 1
 
-        for commit in commits:
             # Filtro 1: Deve ter exatamente 2 pais
-            if not self.is_valid_merge_commit(commit):
+            if len(record.parents) != 2:
+                self.stats['invalid_parent_count'] += 1
+                logger.debug(
+                    f"Ignorando {record.sha[:8]}: "
+                    f"{len(record.parents)} pais (esperado: 2)"
+                )
+                self._reject(record, 'invalid_parent_count')
                 continue
 
-            left_parent, right_parent = commit.parents
-
-            # Filtro 2: Encontrar merge base
-            base = self.get_merge_base(repo, left_parent, right_parent)
-            if base is None:
+            self.stats['merge_commits'] += 1
+            candidates.append(record)
+
+        # Filtro 2: Encontrar merge base (em lote, se houver serviço)
+        if self.merge_bases is not None:
+            bases = self.merge_bases.merge_bases(record.parents for record in candidates)
+        else:
+            bases = None
+
+        for record in candidates:
+            left_sha, right_sha = record.parents
+            try:
+                if bases is not None:
+                    base_sha = bases[record.parents]
+                else:
+                    base_sha = git_merge_base(repo, left_sha, right_sha)
+            except Exception as e:
+                # Erro não é rejeição: o merge não vai para o ledger e é
+                # reavaliado na próxima execução
+                self.stats['merge_base_errors'] += 1
+                logger.error(f"Erro ao buscar merge base de {record.sha[:8]}: {e!r}")
+                continue
+            if base_sha is None:
+                self._count_no_merge_base(left_sha, right_sha)
+                self._reject(record, 'no_merge_base')
                 continue
 
             # Filtro 3: Não pode ser fast-forward
-            if self.is_fast_forward(base, left_parent, right_parent):
-                logger.debug(f"Ignorando {commit.hexsha[:8]}: fast-forward")
+            if base_sha in (left_sha, right_sha):
+                self.stats['fast_forwards'] += 1
+                logger.debug(f"Ignorando {record.sha[:8]}: fast-forward")
+                self._reject(record, 'fast_forwards')
                 continue
 
             # Commit válido!
             self.stats['valid_merges'] += 1
-            valid_merges.append({
-                'commit': commit,
-                'base': base,
-                'left': left_parent,
-                'right': right_parent
-            })
 
             logger.info(
-                f"✓ Merge válido: {commit.hexsha[:8]} "
-                f"(base: {base.hexsha[:8]}, "
-                f"left: {left_parent.hexsha[:8]}, "
-                f"right: {right_parent.hexsha[:8]})"
+                f"✓ Merge válido: {record.sha[:8]} "
+                f"(base: {base_sha[:8]}, "
+                f"left: {left_sha[:8]}, "
+                f"right: {right_sha[:8]})"
             )
 
-        return valid_merges
+            yield {
+                'commit': Commit(repo, hex_to_bin(record.sha)),
+                'base': Commit(repo, hex_to_bin(base_sha)),
+                'left': Commit(repo, hex_to_bin(left_sha)),
+                'right': Commit(repo, hex_to_bin(right_sha))
+            }
+
+    def _reject(self, record: MergeRecord, reason: str):
+        if self.on_reject is not None:
+            self.on_reject(record.sha, reason)
+
+    def filter_merge_commits(
+        self,
+        repo,
+        commits: List[Commit]
+    ) -> List[Dict]:
+        """
+        Filtra lista de commits, retornando apenas merges válidos.
+
+        Args:
+            repo: Repositório Git
+            commits: Lista de commits a filtrar
+
+        Returns:
+            Lista de dicts com estrutura:
+            {
+                'commit': Commit do merge,
+                'base': Commit do ancestral comum,
+                'left': Primeiro pai,
+                'right': Segundo pai
+            }
+
+        Examples:
+            >>> filter = CommitFilter()
+            >>> merges = filter.filter_merge_commits(repo, all_commits)
+            >>> len(merges) >= 0
+            True
+        """
+        records = (
+            MergeRecord(commit.hexsha, tuple(p.hexsha for p in commit.parents))
+            for commit in commits
+        )
+        return list(self.filter_merge_records(repo, records))
 
     def get_statistics(self) -> Dict:
         """
@@ -237,6 +432,7 @@ class CommitFilter:
         print(f"  Commits de merge (--merges): {self.stats['merge_commits']}")
         print(f"  └─ Pais inválidos (≠ 2):     {self.stats['invalid_parent_count']}")
         print(f"  └─ Sem merge base:           {self.stats['no_merge_base']}")
+        print(f"  └─ Erros de merge base:      {self.stats['merge_base_errors']}")
         print(f"  └─ Fast-forwards:            {self.stats['fast_forwards']}")
         print(f"\n✓ MERGES VÁLIDOS:              {self.stats['valid_merges']}")
         print("=" * 60)
@@ -11,19 +11,46 @@ Este módulo orquestra todo o processo de mineração:
 
 IMPLEMENTA O ALGORITMO DA SEÇÃO 3.2:
     MinerarMergeCommits(repositorios, extensoes)
+
+Com `workers > 1`, os repositórios são minerados em paralelo (um por
+thread; o trabalho é dominado por git e I/O). A meta global de triplas e a
+numeração das triplas salvas são compartilhadas sob um lock.
+
+Com `storage='store'`, as triplas vão para um TripletStore em
+`triplets_dir/store` (objetos por SHA de blob + manifestos, sem duplicatas)
+em vez de diretórios triplet_NNN/. Com `storage='pack'`, vão para um
+pacote único com índice de offsets (triplets_dir/triplets.pack + .idx).
+
+Com `build_index=True` (padrão), cada tripla salva entra no índice de
+características (triplets_dir/index.sqlite3, ver triplet_index.py).
+
+Com `incremental=True`, cada repositório mantém um MiningLedger: merges já
+processados são pulados, só merges novos desde a última execução completa
+são listados e a numeração continua após as triplas já existentes.
 """
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from git import Repo
 from pathlib import Path
 from typing import List, Dict, Optional
 from tqdm import tqdm
 import logging
-
-from .commit_filter import CommitFilter
+import subprocess
+import threading
+
+from .commit_filter import CommitFilter, iter_merge_records
+from .merge_base import MergeBaseCache, MergeBaseService
+from .mining_ledger import MiningLedger, current_tips, existing_commits
+from .triplet_pack import TripletPackReader
+from .triplet_store import STORE_DIR, TripletStore
 from .triplet_extractor import TripletExtractor
+from .triplet_index import INDEX_DB_NAME, TripletIndex
+from .triplet_metadata import build_metadata
 
 logger = logging.getLogger(__name__)
 
+STORAGE_FORMATS = ('dirs', 'store', 'pack')
+
 
 class GitHubMiner:
     """
@@ -40,7 +67,11 @@ class GitHubMiner:
         self,
         repos_dir: Path,
         triplets_dir: Path,
-        target_triplets: int = 100
+        target_triplets: int = 100,
+        workers: int = 1,
+        incremental: bool = False,
+        storage: str = 'dirs',
+        build_index: bool = True
     ):
         """
         Inicializa minerador.
@@ -49,15 +80,50 @@ class GitHubMiner:
             repos_dir: Diretório onde clonar repositórios
             triplets_dir: Diretório para salvar triplas
             target_triplets: Meta de triplas a minerar (padrão: 100)
+            workers: Repositórios minerados em paralelo (1 = sequencial)
+            incremental: Usa o diário de mineração para visitar só merges novos
+            storage: 'dirs' (triplet_NNN/), 'store' (TripletStore em triplets_dir/store)
+                     ou 'pack' (pacote triplets.pack + triplets.idx em triplets_dir)
+            build_index: Indexa as características das triplas salvas
         """
+        if storage not in STORAGE_FORMATS:
+            raise ValueError(f"Armazenamento inválido: {storage} (use {', '.join(STORAGE_FORMATS)})")
+
         self.repos_dir = Path(repos_dir)
         self.triplets_dir = Path(triplets_dir)
         self.target_triplets = target_triplets
+        self.workers = max(1, workers)
+        self.incremental = incremental
+        self.storage = storage
+
+        # Merge bases já calculadas (persistidas entre sessões de mineração)
+        self.merge_base_cache = MergeBaseCache(self.repos_dir / MergeBaseCache.DB_NAME)
+
+        # Estado compartilhado entre workers: meta global e próximo ID de tripla
+        self._lock = threading.Lock()
+        self._max_total: Optional[int] = None
+        # Triplas reservadas da meta global (por merge, durante a extração)
+        self._triplets_reserved = 0
+        self._last_triplet_id = 0
+        # Diários de mineração abertos (modo incremental), por repositório
+        self._ledgers: Dict[str, MiningLedger] = {}
 
         # Criar diretórios se não existirem
         self.repos_dir.mkdir(parents=True, exist_ok=True)
         self.triplets_dir.mkdir(parents=True, exist_ok=True)
 
+        self.triplet_store: Optional[TripletStore] = None
+        if storage == 'store':
+            self.triplet_store = TripletStore(self.triplets_dir / STORE_DIR)
+        # Extrator compartilhado pelos workers: um único escritor do pacote
+        self._pack_extractor: Optional[TripletExtractor] = None
+        if storage == 'pack':
+            self._pack_extractor = TripletExtractor(self.triplets_dir)
+
+        # Índice aberto durante mine_repositories (fechado ao final)
+        self.build_index = build_index
+        self.triplet_index: Optional[TripletIndex] = None
+
         # Estatísticas globais
         self.stats = {
             'repos_processed': 0,
@@ -65,6 +131,9 @@ class GitHubMiner:
             'total_commits': 0,
             'total_merges': 0,
             'valid_merges': 0,
+            'merge_bases_cached': 0,
+            'merge_bases_computed': 0,
+            'merges_already_mined': 0,
             'total_triplets': 0
         }
 
@@ -108,7 +177,7 @@ class GitHubMiner:
 
         except Exception as e:
             logger.error(f"Erro ao clonar/atualizar {repo_name}: {e}")
-            self.stats['repos_failed'] += 1
+            self._merge_stats({'repos_failed': 1})
             return None
 
     def mine_repository(
@@ -143,52 +212,126 @@ class GitHubMiner:
         if repo is None:
             return []
 
-        self.stats['repos_processed'] += 1
+        ledger = None
+        if self.incremental:
+            ledger = MiningLedger(self.triplets_dir, repo_name)
+            with self._lock:
+                self._ledgers[repo_name] = ledger
 
-        # Listar commits de merge
-        logger.info("Listando commits de merge...")
+        # Estatísticas locais, consolidadas em self.stats no final
+        stats = {'repos_processed': 1}
         try:
-            # Usar --merges flag do git log
-            merge_commits = list(
-                repo.iter_commits('--all', merges=True, max_count=max_commits)
-            )
-            logger.info(f"Encontrados {len(merge_commits)} commits de merge")
-            self.stats['total_commits'] += len(merge_commits)
-            self.stats['total_merges'] += len(merge_commits)
-
-        except Exception as e:
-            logger.error(f"Erro ao listar commits: {e}")
-            return []
+            return self._mine_cloned_repository(repo, repo_name, max_commits, stats, ledger)
+        finally:
+            self._merge_stats(stats)
+            if ledger is not None:
+                ledger.close()
 
-        # Filtrar merges válidos
-        logger.info("Filtrando merges válidos...")
-        commit_filter = CommitFilter()
-        valid_merges = commit_filter.filter_merge_commits(repo, merge_commits)
-        self.stats['valid_merges'] += len(valid_merges)
-
-        commit_filter.print_statistics()
+    def _mine_cloned_repository(
+        self,
+        repo: Repo,
+        repo_name: str,
+        max_commits: int,
+        stats: Dict,
+        ledger: Optional[MiningLedger] = None
+    ) -> List[Dict]:
+        """
+        Lista, filtra e extrai triplas de um repositório já clonado.
 
-        if not valid_merges:
-            logger.warning(f"Nenhum merge válido encontrado em {repo_name}")
-            return []
+        Enumeração, filtro e extração formam um pipeline preguiçoso sobre um
+        único `git rev-list --merges --parents`: ao atingir a meta, os merges
+        restantes nem chegam a ser filtrados.
+        """
+        revs = ('--all',)
+        if ledger is not None:
+            ledger.begin_run(current_tips(repo))
+            high_water = existing_commits(repo, ledger.high_water)
+            if high_water:
+                logger.info(f"Listando apenas merges novos desde a última mineração de {repo_name}")
+                revs = ('--all', '--not', *high_water)
+
+        # Listar e filtrar commits de merge (sob demanda)
+        logger.info("Listando e filtrando commits de merge...")
+        merge_bases = MergeBaseService(repo, cache=self.merge_base_cache)
+        commit_filter = CommitFilter(
+            merge_bases=merge_bases,
+            on_reject=ledger.record_rejection if ledger is not None else None
+        )
+        records = iter_merge_records(repo, max_count=max_commits, revs=revs)
+        pending_records = ledger.skip_processed(records) if ledger is not None else records
+        valid_merges = commit_filter.filter_merge_records(repo, pending_records)
 
         # Extrair triplas
-        logger.info(f"Extraindo triplas de {len(valid_merges)} merges...")
         triplet_extractor = TripletExtractor(self.triplets_dir)
 
         all_triplets = []
-        for merge_info in tqdm(valid_merges, desc="Extraindo triplas"):
-            triplets = triplet_extractor.extract_triplet(repo, merge_info)
-            all_triplets.extend(triplets)
-
-            # Verificar se atingiu meta
-            if len(all_triplets) >= self.target_triplets:
-                logger.info(f"Meta de {self.target_triplets} triplas atingida!")
-                break
-
-        triplet_extractor.print_statistics()
+        scan_complete = False
+        try:
+            for merge_info in tqdm(valid_merges, desc="Extraindo triplas",
+                                   disable=self.workers > 1):
+                rejections = {} if ledger is not None else None
+                triplets = triplet_extractor.extract_triplet(repo, merge_info, rejections)
+                for triplet in triplets:
+                    triplet['repo'] = repo_name
+                if ledger is not None:
+                    # Contagem completa: merge truncado pela meta fica pendente
+                    ledger.stage_merge(merge_info['commit'].hexsha, rejections, len(triplets))
+
+                # Reserva da meta merge a merge: workers concorrentes não
+                # extraem além do que ainda cabe na meta global
+                granted = self._reserve_budget(len(triplets), len(all_triplets))
+                all_triplets.extend(triplets[:granted])
+
+                # Verificar se atingiu meta (do repo ou o que resta da meta global)
+                if self._remaining_budget(len(all_triplets)) <= 0:
+                    logger.info(f"Meta de {self.target_triplets} triplas atingida!")
+                    break
+            else:
+                scan_complete = True
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Erro ao listar commits: {e.stderr or e}")
+        except BaseException:
+            # Triplas reservadas que não serão salvas voltam para a meta
+            self._release_budget(len(all_triplets))
+            raise
+        finally:
+            valid_merges.close()
+            if pending_records is not records:
+                pending_records.close()
+            records.close()
+            triplet_extractor.close()
+
+            filter_stats = commit_filter.get_statistics()
+            stats['total_commits'] = filter_stats['total_commits']
+            stats['total_merges'] = filter_stats['total_commits']
+            stats['valid_merges'] = filter_stats['valid_merges']
+
+            if ledger is not None:
+                skipped = ledger.get_statistics()['merges_skipped']
+                stats['merges_already_mined'] = skipped
+                # Varredura limitada por max_commits pode ter deixado merges para
+                # trás; merges com erro de merge base também ficam pendentes
+                visited = filter_stats['total_commits'] + skipped
+                ledger.scan_complete = (scan_complete and visited < max_commits
+                                        and not filter_stats['merge_base_errors'])
+
+            base_stats = merge_bases.get_statistics()
+            stats['merge_bases_cached'] = base_stats['cache_hits']
+            stats['merge_bases_computed'] = (base_stats['graph_computed'] +
+                                             base_stats['git_computed'])
+
+        logger.info(f"Analisados {filter_stats['total_commits']} commits de merge")
+        if stats.get('merges_already_mined'):
+            logger.info(f"{stats['merges_already_mined']} merges já minerados foram pulados")
+        if self.workers == 1:
+            commit_filter.print_statistics()
+
+        if not filter_stats['valid_merges']:
+            logger.warning(f"Nenhum merge válido encontrado em {repo_name}")
+            return []
 
-        self.stats['total_triplets'] += len(all_triplets)
+        if self.workers == 1:
+            triplet_extractor.print_statistics()
 
         logger.info(f"\n✓ {len(all_triplets)} triplas extraídas de {repo_name}")
         return all_triplets
@@ -221,59 +364,231 @@ class GitHubMiner:
         all_triplets = []
         max_total = max_triplets or self.target_triplets
 
+        with self._lock:
+            self._max_total = max_total
+            self._triplets_reserved = 0
+            # Incremental, store e pacote: novas triplas continuam a numeração
+            # existente (store e pacote não podem reusar IDs já gravados)
+            continue_ids = self.incremental or self.storage != 'dirs'
+            self._last_triplet_id = self._max_saved_triplet_id() if continue_ids else 0
+            if self.build_index and self.triplet_index is None:
+                self.triplet_index = TripletIndex(self.triplets_dir / INDEX_DB_NAME)
+
         print("\n" + "=" * 60)
         print(f"INICIANDO MINERAÇÃO DE {len(repo_list)} REPOSITÓRIOS")
         print(f"Meta: {max_total} triplas")
+        if self.workers > 1:
+            print(f"Workers: {self.workers}")
         print("=" * 60)
 
-        for i, repo_info in enumerate(repo_list, 1):
-            print(f"\n[{i}/{len(repo_list)}] Processando: {repo_info['name']}")
+        try:
+            if self.workers == 1:
+                for i, repo_info in enumerate(repo_list, 1):
+                    print(f"\n[{i}/{len(repo_list)}] Processando: {repo_info['name']}")
+
+                    all_triplets.extend(self._mine_and_save(repo_info))
+
+                    # Verificar se atingiu meta global
+                    if self._remaining_budget() <= 0:
+                        logger.info(
+                            f"\n🎯 Meta global de {max_total} triplas atingida! "
+                            f"Parando mineração."
+                        )
+                        break
+
+                    logger.info(
+                        f"Progresso: {len(all_triplets)}/{max_total} triplas "
+                        f"({len(all_triplets)/max_total*100:.1f}%)"
+                    )
+            else:
+                all_triplets = self._mine_concurrently(repo_list, max_total)
+        finally:
+            with self._lock:
+                self._max_total = None
+            if self._pack_extractor is not None:
+                self._pack_extractor.close()
+            if self.triplet_index is not None:
+                self.triplet_index.close()
+                self.triplet_index = None
+
+        self.print_final_statistics()
+        return all_triplets[:max_total]
+
+    def _mine_concurrently(
+        self,
+        repo_list: List[Dict],
+        max_total: int
+    ) -> List[Dict]:
+        """
+        Minera repositórios em um pool de `self.workers` threads.
+
+        Repositórios ainda não iniciados quando a meta global é atingida são
+        pulados. As triplas retornam na ordem de conclusão dos repositórios.
+        """
+        all_triplets = []
 
-            triplets = self.mine_repository(
-                repo_info['url'],
-                repo_info['name']
-            )
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {
+                pool.submit(self._mine_and_save, repo_info): repo_info['name']
+                for repo_info in repo_list
+            }
+
+            with tqdm(total=len(futures), desc="Repositórios") as progress:
+                for future in as_completed(futures):
+                    repo_name = futures[future]
+                    try:
+                        triplets = future.result()
+                    except Exception as e:
+                        logger.error(f"Erro ao minerar {repo_name}: {e}")
+                        self._merge_stats({'repos_failed': 1})
+                        triplets = []
+
+                    all_triplets.extend(triplets)
+                    progress.update(1)
+                    progress.set_postfix(triplas=f"{len(all_triplets)}/{max_total}")
+
+                    if self._remaining_budget() <= 0:
+                        # Cancela repositórios que ainda não começaram
+                        for pending in futures:
+                            pending.cancel()
 
-            all_triplets.extend(triplets)
+        return all_triplets
 
-            # Salvar triplas conforme são extraídas
-            self._save_triplets_batch(triplets, len(all_triplets) - len(triplets))
+    def _mine_and_save(self, repo_info: Dict) -> List[Dict]:
+        """
+        Minera um repositório e salva as triplas dentro da meta global.
 
-            # Verificar se atingiu meta global
-            if len(all_triplets) >= max_total:
-                logger.info(
-                    f"\n🎯 Meta global de {max_total} triplas atingida! "
-                    f"Parando mineração."
-                )
-                break
+        Returns:
+            Triplas salvas (já reservadas da meta durante a extração)
+        """
+        if self._remaining_budget() <= 0:
+            return []
 
-            logger.info(
-                f"Progresso: {len(all_triplets)}/{max_total} triplas "
-                f"({len(all_triplets)/max_total*100:.1f}%)"
-            )
+        accepted = self.mine_repository(repo_info['url'], repo_info['name'])
+
+        # Salvar triplas conforme são extraídas
+        triplet_ids = self._save_triplets_batch(accepted)
+        self._merge_stats({'total_triplets': len(triplet_ids)})
+
+        with self._lock:
+            ledger = self._ledgers.pop(repo_info['name'], None)
+        if ledger is not None:
+            ledger.record_triplets(triplet_ids, accepted)
+            ledger.finish_run()
+            ledger.close()
+
+        return accepted
+
+    def _max_saved_triplet_id(self) -> int:
+        """Maior ID entre as triplas já salvas em triplets_dir."""
+        if self.triplet_store is not None:
+            return self.triplet_store.max_id()
+        if self.storage == 'pack':
+            if not TripletPackReader.exists(self.triplets_dir):
+                return 0
+            with TripletPackReader(self.triplets_dir) as pack:
+                return max(pack.ids(), default=0)
+        ids = [
+            int(path.name.split('_', 1)[1])
+            for path in self.triplets_dir.glob("triplet_*")
+            if path.name.split('_', 1)[1].isdigit()
+        ]
+        return max(ids, default=0)
+
+    def _remaining_budget(self, repo_count: int = 0) -> int:
+        """
+        Triplas que ainda cabem na meta (do repositório e global).
 
-        self.print_final_statistics()
-        return all_triplets[:max_total]
+        Args:
+            repo_count: Triplas já reservadas pelo repositório atual
+        """
+        with self._lock:
+            remaining = self.target_triplets - repo_count
+            if self._max_total is not None:
+                remaining = min(remaining, self._max_total - self._triplets_reserved)
+            return remaining
+
+    def _reserve_budget(self, wanted: int, repo_count: int) -> int:
+        """
+        Reserva triplas de um merge na meta, sob lock.
+
+        Args:
+            wanted: Triplas extraídas do merge
+            repo_count: Triplas já reservadas pelo repositório atual
+
+        Returns:
+            Triplas concedidas (as primeiras `granted` do merge)
+        """
+        with self._lock:
+            available = self.target_triplets - repo_count
+            if self._max_total is not None:
+                available = min(available, self._max_total - self._triplets_reserved)
+            granted = max(0, min(wanted, available))
+            if self._max_total is not None:
+                self._triplets_reserved += granted
+            return granted
+
+    def _release_budget(self, count: int):
+        """Devolve à meta global triplas reservadas que não serão salvas."""
+        with self._lock:
+            if self._max_total is not None:
+                self._triplets_reserved -= count
+
+    def _merge_stats(self, stats: Dict):
+        """Soma contadores de um repositório às estatísticas globais."""
+        with self._lock:
+            for key, value in stats.items():
+                self.stats[key] += value
 
     def _save_triplets_batch(
         self,
         triplets: List[Dict],
-        start_id: int
-    ):
+        start_id: Optional[int] = None
+    ) -> List[int]:
         """
         Salva lote de triplas no disco.
 
         Args:
             triplets: Lista de triplas a salvar
-            start_id: ID inicial para numeração
+            start_id: ID inicial para numeração (None = próximos IDs livres
+                      desta execução, reservados sob lock)
+
+        Returns:
+            IDs atribuídos às triplas
         """
+        with self._lock:
+            if start_id is None:
+                start_id = self._last_triplet_id
+            self._last_triplet_id = max(self._last_triplet_id, start_id + len(triplets))
+
         extractor = TripletExtractor(self.triplets_dir)
 
+        triplet_ids = []
         for i, triplet in enumerate(triplets):
             triplet_id = start_id + i + 1
-            extractor.save_triplet(triplet, triplet_id)
+            if self.triplet_store is not None:
+                # Tripla idêntica já armazenada: fica com o ID existente
+                stored_id = self.triplet_store.add(triplet, triplet_id)
+                if stored_id != triplet_id:
+                    triplet_ids.append(stored_id)
+                    continue
+            elif self._pack_extractor is not None:
+                self._pack_extractor.save_triplet_packed(triplet, triplet_id)
+            else:
+                extractor.save_triplet(triplet, triplet_id)
+            triplet_ids.append(triplet_id)
+            self._index_triplet(triplet, triplet_id)
 
         logger.info(f"✓ {len(triplets)} triplas salvas no disco")
+        return triplet_ids
+
+    def _index_triplet(self, triplet: Dict, triplet_id: int):
+        """Registra as características da tripla salva no índice."""
+        if self.triplet_index is None:
+            return
+        name = f"triplet_{triplet_id:03d}"
+        contents = {version: triplet[f'{version}_content'] for version in ('base', 'left', 'right', 'merged')}
+        self.triplet_index.add(name, contents, build_metadata(triplet, triplet_id))
 
     def get_statistics(self) -> Dict:
         """Retorna estatísticas globais da mineração."""
@@ -289,7 +604,11 @@ class GitHubMiner:
         print(f"Total de commits:          {self.stats['total_commits']}")
         print(f"  └─ Commits de merge:     {self.stats['total_merges']}")
         print(f"  └─ Merges válidos:       {self.stats['valid_merges']}")
-        print(f"\n✓ TRIPLAS EXTRAÍDAS:       {self.stats['total_triplets']}")
+        print(f"Merge bases em cache:      {self.stats['merge_bases_cached']}")
+        print(f"Merge bases calculadas:    {self.stats['merge_bases_computed']}")
+        if self.incremental:
+            print(f"Merges já minerados:       {self.stats['merges_already_mined']}")
+        print(f"\n✓ TRIPLAS SALVAS:          {self.stats['total_triplets']}")
         print("=" * 60)
 
         if self.stats['total_merges'] > 0:
@@ -302,5 +621,10 @@ class GitHubMiner:
                                  self.stats['valid_merges'])
             print(f"Média de triplas por merge: {triplets_per_merge:.1f}")
 
-        print(f"\nTriplas salvas em: {self.triplets_dir}")
+        if self.triplet_store is not None:
+            store_stats = self.triplet_store.get_statistics()
+            print(f"Triplas duplicadas:        {store_stats['duplicates']}")
+            print(f"Objetos reusados no store: {store_stats['objects_reused']}")
+
+        print(f"\nTriplas salvas em: {self.triplet_store.root if self.triplet_store else self.triplets_dir}")
         print("=" * 60 + "\n")
@@ -0,0 +1,301 @@
+"""
+Cálculo de merge bases em lote, com cache persistente.
+
+Em vez de um `git merge-base left right` por merge commit:
+
+- cache: SQLite com os pares (left, right) -> base já calculados, reusado
+  entre sessões de mineração (após um `fetch`, só merges novos são
+  calculados)
+- lote: com muitos pares pendentes, o grafo de commits é lido uma vez
+  (`git rev-list --all --parents --topo-order --reverse`) e as bases são
+  calculadas localmente, pintando os ancestrais dos dois pais em ordem de
+  número de geração (mesmo algoritmo do git)
+- fallback: pares com mais de uma base candidata (criss-cross) ou fora do
+  grafo, e lotes pequenos, usam `git merge-base`
+
+"Sem ancestral comum" (base None) é um resultado e vai para o cache; uma
+falha do `git merge-base` (objeto ausente, repositório corrompido, ...)
+não: o par fica fora do resultado e é recalculado na próxima vez.
+"""
+
+import heapq
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+from git.exc import GitCommandError
+
+logger = logging.getLogger(__name__)
+
+Pair = Tuple[str, str]
+
+# Flags do algoritmo de pintura (paint_down_to_common do git)
+_PARENT1 = 1
+_PARENT2 = 2
+_STALE = 4
+_RESULT = 8
+
+
+class MergeBaseError(Exception):
+    """Falha ao calcular uma merge base (diferente de não haver ancestral comum)."""
+
+
+def git_merge_base(repo, left: str, right: str) -> Optional[str]:
+    """
+    Executa `git merge-base left right`.
+
+    Returns:
+        SHA da base, ou None se não houver ancestral comum (saída 1)
+
+    Raises:
+        GitCommandError: Em qualquer outra falha do git
+    """
+    try:
+        output = repo.git.merge_base(left, right, with_exceptions=True)
+    except GitCommandError as e:
+        if e.status == 1:
+            return None
+        raise
+    # Retornar primeiro merge base (geralmente há apenas um)
+    return output.split()[0] if output else None
+
+
+class MergeBaseCache:
+    """
+    Cache persistente (SQLite) de merge bases por par de SHAs.
+
+    Thread-safe: pode ser compartilhado pelos workers do minerador.
+    """
+
+    DB_NAME = "merge_bases.sqlite3"
+
+    def __init__(self, db_path: Path):
+        """
+        Inicializa cache.
+
+        Args:
+            db_path: Arquivo SQLite (diretório criado se necessário)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.db_path), timeout=60, check_same_thread=False)
+        # base NULL = par calculado sem ancestral comum
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS merge_bases ("
+            " left_sha TEXT NOT NULL,"
+            " right_sha TEXT NOT NULL,"
+            " base_sha TEXT,"
+            " PRIMARY KEY (left_sha, right_sha))"
+        )
+        self._db.commit()
+
+    def get_many(self, pairs: Iterable[Pair]) -> Dict[Pair, Optional[str]]:
+        """
+        Busca pares no cache.
+
+        Returns:
+            Dict par -> base, apenas para os pares encontrados
+        """
+        found = {}
+        with self._lock:
+            for pair in pairs:
+                row = self._db.execute(
+                    "SELECT base_sha FROM merge_bases WHERE left_sha = ? AND right_sha = ?",
+                    pair
+                ).fetchone()
+                if row is not None:
+                    found[pair] = row[0]
+        return found
+
+    def put_many(self, bases: Dict[Pair, Optional[str]]):
+        """Armazena bases calculadas."""
+        if not bases:
+            return
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO merge_bases (left_sha, right_sha, base_sha) VALUES (?, ?, ?)",
+                [(left, right, base) for (left, right), base in bases.items()]
+            )
+            self._db.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM merge_bases").fetchone()[0]
+
+    def close(self):
+        """Fecha o banco."""
+        with self._lock:
+            self._db.close()
+
+
+class MergeBaseService:
+    """
+    Calcula merge bases de um repositório em lote.
+    """
+
+    def __init__(
+        self,
+        repo,
+        cache: Optional[MergeBaseCache] = None,
+        graph_threshold: int = 32
+    ):
+        """
+        Inicializa serviço.
+
+        Args:
+            repo: Repositório Git
+            cache: Cache persistente (None = sem persistência)
+            graph_threshold: Pares pendentes a partir dos quais o grafo de
+                             commits é carregado (abaixo disso, `git merge-base`)
+        """
+        self.repo = repo
+        self.cache = cache
+        self.graph_threshold = graph_threshold
+
+        # SHA -> (geração, pais); carregado sob demanda
+        self._graph: Optional[Dict[str, Tuple[int, Tuple[str, ...]]]] = None
+
+        self.stats = {
+            'cache_hits': 0,
+            'graph_computed': 0,
+            'git_computed': 0,
+            'git_errors': 0,
+        }
+
+    def merge_base(self, left: str, right: str) -> Optional[str]:
+        """
+        Merge base de um par (None se não houver ancestral comum).
+
+        Raises:
+            MergeBaseError: Se o cálculo falhar
+        """
+        bases = self.merge_bases([(left, right)])
+        if (left, right) not in bases:
+            raise MergeBaseError(f"Erro ao buscar merge base de {left[:8]} e {right[:8]}")
+        return bases[(left, right)]
+
+    def merge_bases(self, pairs: Iterable[Pair]) -> Dict[Pair, Optional[str]]:
+        """
+        Calcula merge bases de vários pares.
+
+        Args:
+            pairs: Pares (left, right) de SHAs
+
+        Returns:
+            Dict par -> SHA da base (None se não houver ancestral comum);
+            pares cujo cálculo falhou ficam fora do dict
+        """
+        pairs = list(dict.fromkeys(pairs))
+        bases = self.cache.get_many(pairs) if self.cache is not None else {}
+        self.stats['cache_hits'] += len(bases)
+
+        pending = [pair for pair in pairs if pair not in bases]
+        if not pending:
+            return bases
+
+        if self._graph is None and len(pending) >= self.graph_threshold:
+            self._graph = self._load_graph()
+
+        computed = {}
+        for left, right in pending:
+            base = self._graph_merge_base(left, right) if self._graph is not None else None
+            if base is not None:
+                self.stats['graph_computed'] += 1
+                computed[(left, right)] = base[0]
+                continue
+
+            try:
+                computed[(left, right)] = git_merge_base(self.repo, left, right)
+            except Exception as e:
+                # Falha não é "sem ancestral comum": fora do resultado e do cache
+                logger.error(f"Erro ao buscar merge base: {e}")
+                self.stats['git_errors'] += 1
+                continue
+            self.stats['git_computed'] += 1
+
+        if self.cache is not None:
+            self.cache.put_many(computed)
+        bases.update(computed)
+        return bases
+
+    def get_statistics(self) -> Dict:
+        return self.stats.copy()
+
+    def _load_graph(self) -> Dict[str, Tuple[int, Tuple[str, ...]]]:
+        """Lê o grafo de commits (pais antes dos filhos) e numera gerações."""
+        logger.info("Carregando grafo de commits para cálculo de merge bases...")
+        output = self.repo.git.rev_list('--all', '--parents', '--topo-order', '--reverse')
+
+        graph = {}
+        for line in output.splitlines():
+            sha, *parents = line.split()
+            generation = 1 + max((graph[p][0] for p in parents if p in graph), default=0)
+            graph[sha] = (generation, tuple(parents))
+
+        logger.info(f"Grafo carregado: {len(graph)} commits")
+        return graph
+
+    def _graph_merge_base(self, left: str, right: str) -> Optional[Tuple[Optional[str]]]:
+        """
+        Calcula a base pelo grafo local.
+
+        Returns:
+            (base,) — base None se não houver ancestral comum —, ou None se
+            o par não puder ser resolvido localmente (fora do grafo ou mais
+            de uma base candidata)
+        """
+        graph = self._graph
+        if left not in graph or right not in graph:
+            return None
+
+        flags = {left: _PARENT1}
+        flags[right] = flags.get(right, 0) | _PARENT2
+
+        queue: List[Tuple[int, str]] = []
+        queued = set()
+        nonstale = 0
+        for sha in {left, right}:
+            heapq.heappush(queue, (-graph[sha][0], sha))
+            queued.add(sha)
+            nonstale += 1
+
+        results = []
+        while nonstale:
+            _, sha = heapq.heappop(queue)
+            queued.discard(sha)
+            sha_flags = flags[sha]
+            if not sha_flags & _STALE:
+                nonstale -= 1
+
+            paint = sha_flags & (_PARENT1 | _PARENT2 | _STALE)
+            if paint == (_PARENT1 | _PARENT2):
+                if not sha_flags & _RESULT:
+                    flags[sha] |= _RESULT
+                    results.append(sha)
+                paint |= _STALE
+
+            for parent in graph[sha][1]:
+                old = flags.get(parent, 0)
+                if old & paint == paint:
+                    continue
+                new = old | paint
+                flags[parent] = new
+                if parent in queued:
+                    if not old & _STALE and new & _STALE:
+                        nonstale -= 1
+                elif parent in graph:
+                    heapq.heappush(queue, (-graph[parent][0], parent))
+                    queued.add(parent)
+                    if not new & _STALE:
+                        nonstale += 1
+                else:
+                    # Pai ausente do grafo (clone raso): resultado não confiável
+                    return None
+
+        if len(results) > 1:
+            return None
+        return (results[0] if results else None,)
@@ -0,0 +1,214 @@
+"""
+Registro incremental de mineração por repositório.
+
+Cada repositório minerado tem um diário JSONL append-only em
+`triplets_dir/.ledger/<repo>.jsonl` com:
+
+- merges rejeitados pelo CommitFilter (e o motivo)
+- merges extraídos: motivo de rejeição de cada arquivo no TripletExtractor
+  e IDs das triplas salvas
+- execuções: refs do repositório no início e se a varredura foi completa
+
+As refs da última execução completa são a marca d'água: a próxima execução
+só lista merges alcançáveis a partir das refs atuais e não das antigas
+(`git rev-list --all --not <marca>`). Merges já registrados são pulados
+mesmo sem marca (execução anterior interrompida pela meta ou por
+max_commits).
+
+Um merge só é registrado como extraído quando todas as suas triplas foram
+salvas; se a meta global truncar um merge, ele volta na próxima execução.
+"""
+
+import json
+import subprocess
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+import logging
+
+from .commit_filter import MergeRecord
+
+logger = logging.getLogger(__name__)
+
+
+def current_tips(repo) -> List[str]:
+    """SHAs apontados pelas refs do repositório (mesmo conjunto de `--all`)."""
+    output = repo.git.rev_parse('--all')
+    return sorted(set(output.split()))
+
+
+def existing_commits(repo, shas: Iterable[str]) -> List[str]:
+    """Filtra SHAs que ainda existem no repositório (refs antigas podem sumir)."""
+    shas = list(shas)
+    if not shas:
+        return []
+    result = subprocess.run(
+        ["git", "--git-dir", str(repo.git_dir), "cat-file", "--batch-check"],
+        input="".join(f"{sha}\n" for sha in shas),
+        capture_output=True, text=True
+    )
+    return [
+        sha for sha, line in zip(shas, result.stdout.splitlines())
+        if not line.endswith(" missing")
+    ]
+
+
+class MiningLedger:
+    """
+    Diário de mineração de um repositório.
+    """
+
+    DIR_NAME = ".ledger"
+
+    def __init__(self, triplets_dir: Path, repo_name: str):
+        """
+        Inicializa diário (lendo o registro de execuções anteriores).
+
+        Args:
+            triplets_dir: Diretório das triplas mineradas
+            repo_name: Nome do repositório
+        """
+        self.path = Path(triplets_dir) / self.DIR_NAME / f"{repo_name}.jsonl"
+        self.repo_name = repo_name
+
+        # Merges já processados (rejeitados ou extraídos por completo)
+        self.processed: Set[str] = set()
+        self.rejections: Dict[str, str] = {}
+        self.triplet_ids: Dict[str, List[int]] = {}
+        # Refs da última execução completa
+        self.high_water: List[str] = []
+
+        # Execução corrente
+        self.run_tips: List[str] = []
+        self.scan_complete = False
+        self._staged: Dict[str, Dict] = {}
+        self._file = None
+
+        self.stats = {
+            'merges_skipped': 0,
+            'merges_rejected': 0,
+            'merges_extracted': 0,
+        }
+
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Linha truncada (processo morto no meio da escrita)
+                    continue
+
+                kind = record.get('type')
+                if kind == 'rejected':
+                    self.processed.add(record['merge'])
+                    self.rejections[record['merge']] = record['reason']
+                elif kind == 'extracted':
+                    self.processed.add(record['merge'])
+                    self.triplet_ids[record['merge']] = record['triplets']
+                elif kind == 'run' and record.get('complete'):
+                    self.high_water = record['tips']
+
+    def _write(self, record: Dict):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def begin_run(self, tips: List[str]):
+        """Marca o início de uma execução com as refs atuais."""
+        self.run_tips = tips
+        self.scan_complete = False
+
+    def skip_processed(self, records: Iterable[MergeRecord]) -> Iterator[MergeRecord]:
+        """Descarta merges já registrados em execuções anteriores."""
+        for record in records:
+            if record.sha in self.processed:
+                self.stats['merges_skipped'] += 1
+                continue
+            yield record
+
+    def record_rejection(self, merge_sha: str, reason: str):
+        """Registra merge rejeitado pelo CommitFilter."""
+        self.processed.add(merge_sha)
+        self.rejections[merge_sha] = reason
+        self.stats['merges_rejected'] += 1
+        self._write({'type': 'rejected', 'merge': merge_sha, 'reason': reason})
+
+    def stage_merge(self, merge_sha: str, files: Dict[str, str], triplet_count: int):
+        """
+        Registra merge extraído, pendente até suas triplas serem salvas.
+
+        Args:
+            merge_sha: SHA do merge
+            files: Caminho -> motivo de rejeição no TripletExtractor
+            triplet_count: Triplas extraídas do merge
+        """
+        entry = {'type': 'extracted', 'merge': merge_sha, 'files': files, 'triplets': []}
+        if triplet_count == 0:
+            self._commit_merge(entry)
+        else:
+            self._staged[merge_sha] = dict(entry, expected=triplet_count)
+
+    def record_triplets(self, triplet_ids: List[int], triplets: List[Dict]):
+        """
+        Registra triplas salvas e conclui os merges com todas as triplas salvas.
+
+        Args:
+            triplet_ids: IDs atribuídos (mesma ordem de triplets)
+            triplets: Triplas salvas (com 'commit_sha')
+        """
+        saved = defaultdict(list)
+        for triplet_id, triplet in zip(triplet_ids, triplets):
+            saved[triplet['commit_sha']].append(triplet_id)
+
+        for merge_sha, ids in saved.items():
+            entry = self._staged.get(merge_sha)
+            if entry is None:
+                continue
+            entry['triplets'].extend(ids)
+            if len(entry['triplets']) >= entry['expected']:
+                del self._staged[merge_sha]
+                del entry['expected']
+                self._commit_merge(entry)
+
+    def _commit_merge(self, entry: Dict):
+        self.processed.add(entry['merge'])
+        self.triplet_ids[entry['merge']] = entry['triplets']
+        self.stats['merges_extracted'] += 1
+        self._write(entry)
+
+    def finish_run(self):
+        """
+        Registra o fim da execução.
+
+        A marca d'água só avança se a varredura foi completa e nenhum merge
+        ficou pendente (triplas descartadas pela meta).
+        """
+        complete = self.scan_complete and not self._staged
+        self._write({
+            'type': 'run',
+            'tips': self.run_tips,
+            'complete': complete,
+            'pending': sorted(self._staged),
+            'time': time.time(),
+        })
+        if complete:
+            self.high_water = self.run_tips
+        self._staged.clear()
+
+    def get_statistics(self) -> Dict:
+        return self.stats.copy()
+
+    def close(self):
+        """Fecha o diário."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -9,15 +9,33 @@ Este módulo extrai as três versões de cada arquivo modificado em um merge:
 
 CRITÉRIO DE SELEÇÃO:
 Apenas arquivos modificados por AMBOS os pais (mudanças conflitantes potenciais)
+
+Os arquivos modificados vêm de `git diff-tree --raw`, que já informa os SHAs
+dos blobs: "modificado nos dois lados" e "presente em todas as versões" são
+decididos sem ler conteúdo. As quatro versões de cada tripla válida são
+lidas por um GitBlobReader (processos `git cat-file` persistentes por
+repositório), em uma ida e volta por arquivo.
+
+As triplas são salvas em diretórios triplet_NNN/ (`save_triplet`) ou num
+pacote único com índice de offsets (`save_triplet_packed`, ver
+triplet_pack.py).
 """
 
 from git import Repo, Commit
 from pathlib import Path
-from typing import List, Dict, Set, Optional
+from typing import List, Dict, Set, Optional, Sequence, Tuple
 import logging
+import threading
+
+from .blob_reader import GitBlobReader, GitBlobReaderError
+from .triplet_metadata import build_metadata, read_metadata, version_file, write_metadata
+from .triplet_pack import TripletPackWriter
 
 logger = logging.getLogger(__name__)
 
+# SHA usado pelo git para "arquivo inexistente" na saída --raw
+NULL_SHA = '0' * 40
+
 
 class TripletExtractor:
     """
@@ -31,14 +49,16 @@ class TripletExtractor:
 
     VALID_EXTENSIONS = {'.ts', '.tsx', '.js', '.jsx'}
 
-    def __init__(self, output_dir: Path):
+    def __init__(self, output_dir: Path, compress_pack: bool = True):
         """
         Inicializa extrator.
 
         Args:
             output_dir: Diretório onde triplas serão salvas
+            compress_pack: Comprime os registros do pacote (save_triplet_packed)
         """
         self.output_dir = Path(output_dir)
+        self.compress_pack = compress_pack
         self.stats = {
             'total_files': 0,
             'unsupported_extension': 0,
@@ -48,6 +68,57 @@ class TripletExtractor:
             'valid_triplets': 0
         }
 
+        # Leitores de blobs abertos, por diretório .git
+        self._blob_readers: Dict[str, GitBlobReader] = {}
+        # Pacote de triplas, aberto na primeira gravação
+        self._pack_writer: Optional[TripletPackWriter] = None
+        self._pack_lock = threading.Lock()
+
+    def get_modified_entries(
+        self,
+        repo: Repo,
+        base: Commit,
+        target: Commit
+    ) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """
+        Retorna arquivos modificados entre dois commits, com os SHAs dos blobs.
+
+        Usa `git diff-tree -r --raw` (comparação de entradas das árvores):
+        nenhum objeto Diff é construído e nenhum conteúdo é lido.
+
+        Args:
+            repo: Repositório Git
+            base: Commit base
+            target: Commit alvo
+
+        Returns:
+            Dict caminho -> (blob em base, blob em target); None onde o
+            arquivo não existe (adicionado/removido)
+
+        Examples:
+            >>> extractor = TripletExtractor(Path('/tmp'))
+            >>> entries = extractor.get_modified_entries(repo, base, left)
+            >>> base_blob, left_blob = entries["src/index.ts"]
+        """
+        try:
+            output = repo.git.diff_tree(
+                '-r', '-z', '--raw', '--no-renames', base.hexsha, target.hexsha
+            )
+        except Exception as e:
+            logger.error(f"Erro ao buscar arquivos modificados: {e}")
+            return {}
+
+        entries = {}
+        # Registros: ":<modo a> <modo b> <sha a> <sha b> <status>\0<caminho>\0"
+        fields = output.split('\0')
+        for meta, filepath in zip(fields[0::2], fields[1::2]):
+            _, _, sha_a, sha_b, _ = meta.split(' ')
+            entries[filepath] = (
+                None if sha_a == NULL_SHA else sha_a,
+                None if sha_b == NULL_SHA else sha_b
+            )
+        return entries
+
     def get_modified_files(
         self,
         repo: Repo,
@@ -71,23 +142,7 @@ class TripletExtractor:
             >>> isinstance(files, set)
             True
         """
-        try:
-            # Diff entre base e target
-            diffs = base.diff(target)
-
-            modified_files = set()
-            for diff in diffs:
-                # Pegar caminho do arquivo (a_path ou b_path dependendo do tipo)
-                if diff.a_path:
-                    modified_files.add(diff.a_path)
-                if diff.b_path and diff.b_path != diff.a_path:
-                    modified_files.add(diff.b_path)
-
-            return modified_files
-
-        except Exception as e:
-            logger.error(f"Erro ao buscar arquivos modificados: {e}")
-            return set()
+        return set(self.get_modified_entries(repo, base, target))
 
     def is_supported_file(self, filepath: str) -> bool:
         """
@@ -146,10 +201,77 @@ class TripletExtractor:
             logger.error(f"Erro ao extrair {filepath} de {commit.hexsha[:8]}: {e}")
             return None
 
+    def extract_file_contents(
+        self,
+        repo: Repo,
+        commits: Sequence[Commit],
+        filepath: str
+    ) -> List[Optional[str]]:
+        """
+        Extrai o conteúdo de um arquivo em vários commits de uma só vez.
+
+        Usa o `git cat-file` persistente do repositório: todas as versões são
+        resolvidas em uma ida e volta e blobs idênticos são lidos uma vez.
+
+        Args:
+            repo: Repositório Git
+            commits: Commits dos quais extrair o arquivo
+            filepath: Caminho do arquivo
+
+        Returns:
+            Conteúdo em cada commit (mesma ordem), None onde não existir
+
+        Examples:
+            >>> extractor = TripletExtractor(Path('/tmp'))
+            >>> base, left = extractor.extract_file_contents(repo, [b, l], "src/index.ts")
+        """
+        reader = self._get_blob_reader(repo)
+        try:
+            blobs = reader.read(f"{commit.hexsha}:{filepath}" for commit in commits)
+        except GitBlobReaderError as e:
+            logger.warning(f"Falha no git cat-file ({e}), lendo {filepath} pelo GitPython")
+            return [self.extract_file_content(commit, filepath) for commit in commits]
+
+        return [
+            blob.decode('utf-8', errors='ignore') if blob is not None else None
+            for blob in blobs
+        ]
+
+    def _get_blob_reader(self, repo: Repo) -> GitBlobReader:
+        """Retorna (criando se necessário) o leitor de blobs do repositório."""
+        key = str(repo.git_dir)
+        if key not in self._blob_readers:
+            self._blob_readers[key] = GitBlobReader(Path(repo.git_dir))
+        return self._blob_readers[key]
+
+    def _read_blob_contents(
+        self,
+        reader: GitBlobReader,
+        blob_shas: Sequence[str]
+    ) -> Optional[List[str]]:
+        """Lê e decodifica blobs pelo SHA (None em caso de falha)."""
+        try:
+            blobs = reader.read_blobs(blob_shas)
+        except GitBlobReaderError as e:
+            logger.error(f"Erro ao ler blobs {[sha[:8] for sha in blob_shas]}: {e}")
+            return None
+        return [blobs[sha].decode('utf-8', errors='ignore') for sha in blob_shas]
+
+    def close(self):
+        """Encerra os processos `git cat-file` abertos e fecha o pacote."""
+        for reader in self._blob_readers.values():
+            reader.close()
+        self._blob_readers.clear()
+        with self._pack_lock:
+            if self._pack_writer is not None:
+                self._pack_writer.close()
+                self._pack_writer = None
+
     def extract_triplet(
         self,
         repo: Repo,
-        merge_info: Dict
+        merge_info: Dict,
+        rejections: Optional[Dict[str, str]] = None
     ) -> List[Dict]:
         """
         Extrai triplas de um merge commit.
@@ -157,6 +279,8 @@ class TripletExtractor:
         Args:
             repo: Repositório Git
             merge_info: Dict com keys 'commit', 'base', 'left', 'right'
+            rejections: Se fornecido, recebe caminho -> motivo (chave da
+                        estatística) de cada arquivo descartado
 
         Returns:
             Lista de triplas extraídas, cada uma um dict com:
@@ -167,7 +291,8 @@ class TripletExtractor:
                 'left_content': str,
                 'right_content': str,
                 'merged_content': str, 
-                'commit_sha': str
+                'commit_sha': str,
+                'blob_shas': {'base': str, 'left': str, 'right': str, 'merged': str}
             }
 
         Examples:
@@ -181,22 +306,21 @@ class TripletExtractor:
         right = merge_info['right']
         commit = merge_info['commit']
 
-        # Encontrar arquivos modificados em cada lado
-        files_left = self.get_modified_files(repo, base, left)
-        files_right = self.get_modified_files(repo, base, right)
+        # Encontrar arquivos modificados em cada lado (com SHAs dos blobs)
+        entries_left = self.get_modified_entries(repo, base, left)
+        entries_right = self.get_modified_entries(repo, base, right)
 
         # Interseção: arquivos modificados por AMBOS os lados
-        files_both = files_left.intersection(files_right)
+        files_both = sorted(entries_left.keys() & entries_right.keys())
 
         logger.info(
             f"Merge {commit.hexsha[:8]}: "
-            f"{len(files_left)} arquivos em left, "
-            f"{len(files_right)} em right, "
+            f"{len(entries_left)} arquivos em left, "
+            f"{len(entries_right)} em right, "
             f"{len(files_both)} em ambos"
         )
 
-        triplets = []
-
+        candidates = []
         for filepath in files_both:
             self.stats['total_files'] += 1
 
@@ -204,26 +328,57 @@ class TripletExtractor:
             if not self.is_supported_file(filepath):
                 self.stats['unsupported_extension'] += 1
                 logger.debug(f"Ignorando {filepath}: extensão não suportada")
+                if rejections is not None:
+                    rejections[filepath] = 'unsupported_extension'
                 continue
 
-            # Extrair conteúdo das quatro versões (base, left, right, merged)
-            base_content = self.extract_file_content(base, filepath)
-            left_content = self.extract_file_content(left, filepath)
-            right_content = self.extract_file_content(right, filepath)
-            merged_content = self.extract_file_content(commit, filepath)  # GABARITO
+            candidates.append(filepath)
+
+        if not candidates:
+            return []
+
+        # Blobs do resultado do merge (GABARITO), resolvidos sem ler conteúdo
+        reader = self._get_blob_reader(repo)
+        try:
+            merged_blobs = reader.resolve(f"{commit.hexsha}:{fp}" for fp in candidates)
+        except GitBlobReaderError as e:
+            logger.error(f"Erro ao resolver blobs de {commit.hexsha[:8]}: {e}")
+            self.stats['extraction_errors'] += len(candidates)
+            if rejections is not None:
+                rejections.update(dict.fromkeys(candidates, 'extraction_errors'))
+            return []
+
+        triplets = []
+
+        for filepath, merged_blob in zip(candidates, merged_blobs):
+            base_blob, left_blob = entries_left[filepath]
+            right_blob = entries_right[filepath][1]
+            blob_shas = (base_blob, left_blob, right_blob, merged_blob)
 
             # Filtro 2: Arquivo deve existir em todas as versões (incluindo merge result)
-            if base_content is None or left_content is None or right_content is None or merged_content is None:
+            if None in blob_shas:
                 self.stats['file_not_in_all_versions'] += 1
                 logger.debug(
                     f"Ignorando {filepath}: não existe em todas as versões "
-                    f"(base={base_content is not None}, "
-                    f"left={left_content is not None}, "
-                    f"right={right_content is not None}, "
-                    f"merged={merged_content is not None})"
+                    f"(base={base_blob is not None}, "
+                    f"left={left_blob is not None}, "
+                    f"right={right_blob is not None}, "
+                    f"merged={merged_blob is not None})"
                 )
+                if rejections is not None:
+                    rejections[filepath] = 'file_not_in_all_versions'
                 continue
 
+            # Extrair conteúdo das quatro versões (blobs repetidos lidos uma vez)
+            contents = self._read_blob_contents(reader, blob_shas)
+            if contents is None:
+                self.stats['extraction_errors'] += 1
+                if rejections is not None:
+                    rejections[filepath] = 'extraction_errors'
+                continue
+
+            base_content, left_content, right_content, merged_content = contents
+
             # Tripla válida!
             extension = Path(filepath).suffix.lower()
             triplet = {
@@ -236,7 +391,13 @@ class TripletExtractor:
                 'commit_sha': commit.hexsha,
                 'base_sha': base.hexsha,
                 'left_sha': left.hexsha,
-                'right_sha': right.hexsha
+                'right_sha': right.hexsha,
+                'blob_shas': {
+                    'base': blob_shas[0],
+                    'left': blob_shas[1],
+                    'right': blob_shas[2],
+                    'merged': blob_shas[3]
+                }
             }
 
             triplets.append(triplet)
@@ -264,7 +425,7 @@ class TripletExtractor:
             left.ts
             right.ts
             merged.ts      # ⭐ GABARITO (resultado real do merge)
-            metadata.txt
+            metadata.json  # metadados estruturados (ver triplet_metadata.py)
 
         Args:
             triplet: Dict com conteúdos da tripla
@@ -300,26 +461,77 @@ class TripletExtractor:
             triplet['merged_content'], encoding='utf-8'
         )
 
-        # Salvar metadados
-        metadata = f"""Triplet ID: {triplet_id}
-Original File: {triplet['filepath']}
-Extension: {triplet['extension']}
-Commit SHA: {triplet['commit_sha']}
-Base SHA: {triplet['base_sha']}
-Left SHA: {triplet['left_sha']}
-Right SHA: {triplet['right_sha']}
-
-File Sizes:
-  Base:   {len(triplet['base_content'])} bytes
-  Left:   {len(triplet['left_content'])} bytes
-  Right:  {len(triplet['right_content'])} bytes
-  Merged: {len(triplet['merged_content'])} bytes (GABARITO)
-"""
-        (triplet_dir / "metadata.txt").write_text(metadata, encoding='utf-8')
+        # Salvar metadados (registro versionado, com tamanhos, linhas e SHAs)
+        write_metadata(triplet_dir, build_metadata(triplet, triplet_id))
 
         logger.info(f"Tripla salva em: {triplet_dir}")
         return triplet_dir
 
+    def save_triplet_packed(self, triplet: Dict, triplet_id: int) -> Path:
+        """
+        Salva tripla no pacote de output_dir (triplets.pack + triplets.idx).
+
+        Thread-safe; o pacote fica aberto até `close()`.
+
+        Args:
+            triplet: Dict com conteúdos da tripla
+            triplet_id: ID numérico da tripla
+
+        Returns:
+            Path do diretório do pacote
+        """
+        with self._pack_lock:
+            if self._pack_writer is None:
+                self._pack_writer = TripletPackWriter(self.output_dir, compress=self.compress_pack)
+            writer = self._pack_writer
+
+        writer.append(dict(triplet, metadata=build_metadata(triplet, triplet_id)), triplet_id)
+        logger.debug(f"Tripla {triplet_id} salva no pacote de {self.output_dir}")
+        return self.output_dir
+
+    @staticmethod
+    def load_saved_triplet(triplet_dir: Path) -> Optional[Dict]:
+        """
+        Lê uma tripla salva por `save_triplet` (inverso de save_triplet).
+
+        Args:
+            triplet_dir: Diretório triplet_NNN/
+
+        Returns:
+            Dict com as chaves de extract_triplet ('merged_content' None em
+            triplas antigas sem merged), ou None se faltar base/left/right
+        """
+        metadata = read_metadata(triplet_dir) or {}
+
+        contents = {}
+        extension = ''
+        for version in ('base', 'left', 'right', 'merged'):
+            path = version_file(triplet_dir, version, metadata.get('extension', ''))
+            if path is None:
+                contents[version] = None
+                continue
+            extension = path.suffix
+            contents[version] = path.read_text(encoding='utf-8')
+
+        if None in (contents['base'], contents['left'], contents['right']):
+            return None
+
+        triplet = {
+            'filepath': metadata.get('filepath', ''),
+            'extension': metadata.get('extension') or extension,
+            'base_content': contents['base'],
+            'left_content': contents['left'],
+            'right_content': contents['right'],
+            'merged_content': contents['merged'],
+            'commit_sha': metadata.get('commit_sha', ''),
+            'base_sha': metadata.get('base_sha', ''),
+            'left_sha': metadata.get('left_sha', ''),
+            'right_sha': metadata.get('right_sha', ''),
+        }
+        if metadata.get('repo'):
+            triplet['repo'] = metadata['repo']
+        return triplet
+
     def get_statistics(self) -> Dict:
         """Retorna estatísticas do extrator."""
         return self.stats.copy()
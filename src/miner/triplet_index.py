@@ -0,0 +1,392 @@
+"""
+Índice de características das triplas (SQLite em triplets_dir/index.sqlite3).
+
+Selecionar triplas por tamanho, extensão, número de conflitos ou
+repositório exigiria carregar o conteúdo de todas. O índice guarda, por
+tripla:
+
+- origem: repositório, commit, arquivo e extensão
+- linhas e bytes de cada versão
+- veredito e motivo do FileFilter (aplicado à base, como no CSDiff-Web)
+- número de conflitos do diff3 puro (`git merge-file`, via merge_backends)
+- SHA do blob git de cada versão (detecta tripla regravada com o mesmo nome)
+
+É preenchido na extração (GitHubMiner) e atualizado incrementalmente pelo
+ExperimentRunner (só triplas ausentes ou com blobs diferentes dos metadados
+atuais são lidas). Consultas são filtros sobre as colunas da tabela
+`triplets`, p.ex.:
+
+    extension = '.tsx' AND diff3_conflicts >= 3
+
+O filtro não é repassado ao SQLite como texto: compile_where aceita só
+comparações `coluna op valor` (e IS [NOT] NULL) entre colunas conhecidas,
+combinadas com AND, OR, NOT e parênteses, e gera uma consulta com os
+valores como parâmetros.
+"""
+
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+from src.core.filters import FileFilter
+from src.core.merge_backends import get_backend
+from .triplet_metadata import VERSIONS, count_lines, git_blob_sha
+
+logger = logging.getLogger(__name__)
+
+INDEX_DB_NAME = "index.sqlite3"
+
+# Colunas de características (além de `name`, a chave)
+COLUMNS = (
+    'id', 'repo', 'commit_sha', 'filepath', 'extension',
+    *(f'{version}_lines' for version in VERSIONS),
+    *(f'{version}_bytes' for version in VERSIONS),
+    'filter_skipped', 'filter_reason', 'diff3_conflicts',
+    *(f'{version}_blob' for version in VERSIONS),
+)
+
+# Operadores aceitos no filtro (`==` vira `=`)
+_OPERATORS = ('=', '==', '!=', '<>', '<', '<=', '>', '>=', 'LIKE', 'NOT LIKE')
+
+_TOKEN = re.compile(
+    r"\s*(?:"
+    r"(?P<string>'(?:[^']|'')*')"
+    r"|(?P<number>-?\d+(?:\.\d+)?)"
+    r"|(?P<op>==|!=|<>|<=|>=|=|<|>)"
+    r"|(?P<paren>[()])"
+    r"|(?P<param>\?)"
+    r"|(?P<word>[A-Za-z_][A-Za-z0-9_]*)"
+    r")"
+)
+
+
+def _tokenize(where: str) -> List[Tuple[str, str]]:
+    """Divide o filtro em (tipo, texto); ValueError em caracteres não aceitos."""
+    tokens = []
+    pos = 0
+    where = where.rstrip()
+    while pos < len(where):
+        match = _TOKEN.match(where, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"Filtro inválido perto de: {where[pos:].strip()[:20]!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        pos = match.end()
+    return tokens
+
+
+def compile_where(where: str, params: Sequence = ()) -> Tuple[str, List]:
+    """
+    Compila um filtro sobre as colunas do índice numa cláusula parametrizada.
+
+    Gramática:
+
+        expr   := termo (OR termo)*
+        termo  := fator (AND fator)*
+        fator  := NOT fator | '(' expr ')' | coluna op valor | coluna IS [NOT] NULL
+        valor  := 'texto' | número | ?
+
+    Colunas: `name` e COLUMNS. Operadores: =, ==, !=, <>, <, <=, >, >=,
+    LIKE, NOT LIKE. Palavras-chave sem distinção de maiúsculas.
+
+    Args:
+        where: Filtro, p.ex. "extension = '.tsx' AND diff3_conflicts >= 3"
+        params: Valores dos `?` do filtro, em ordem
+
+    Returns:
+        (cláusula com `?`, parâmetros)
+
+    Raises:
+        ValueError: Se o filtro usar colunas, operadores ou sintaxe não aceitos
+    """
+    tokens = _tokenize(where)
+    columns = ('name',) + COLUMNS
+    given = list(params)
+    sql: List[str] = []
+    values: List = []
+    pos = 0
+
+    def peek(offset: int = 0) -> Tuple[str, str]:
+        if pos + offset < len(tokens):
+            kind, text = tokens[pos + offset]
+            return kind, text.upper() if kind == 'word' else text
+        return '', ''
+
+    def take() -> Tuple[str, str]:
+        nonlocal pos
+        if pos >= len(tokens):
+            raise ValueError("Filtro incompleto")
+        pos += 1
+        return tokens[pos - 1]
+
+    def value():
+        kind, text = take()
+        if kind == 'string':
+            return text[1:-1].replace("''", "'")
+        if kind == 'number':
+            return float(text) if '.' in text else int(text)
+        if kind == 'param':
+            if not given:
+                raise ValueError("Faltam parâmetros para os '?' do filtro")
+            return given.pop(0)
+        raise ValueError(f"Valor esperado, encontrado {text!r}")
+
+    def factor():
+        kind, text = peek()
+        if (kind, text) == ('word', 'NOT'):
+            take()
+            sql.append("NOT")
+            factor()
+            return
+        if (kind, text) == ('paren', '('):
+            take()
+            sql.append("(")
+            expr()
+            if take()[1] != ')':
+                raise ValueError("')' esperado no filtro")
+            sql.append(")")
+            return
+
+        kind, column = take()
+        if kind != 'word' or column not in columns:
+            raise ValueError(f"Coluna desconhecida no filtro: {column!r}")
+        kind, op = peek()
+        if op == 'IS':
+            take()
+            negated = peek() == ('word', 'NOT')
+            if negated:
+                take()
+            if peek() != ('word', 'NULL'):
+                raise ValueError("IS só aceita NULL ou NOT NULL")
+            take()
+            sql.append(f"{column} IS {'NOT ' if negated else ''}NULL")
+            return
+        if op == 'NOT' and peek(1) == ('word', 'LIKE'):
+            take()
+            op = 'NOT LIKE'
+        if op not in _OPERATORS:
+            raise ValueError(f"Operador não aceito no filtro: {op!r}")
+        take()
+        sql.append(f"{column} {'=' if op == '==' else op} ?")
+        values.append(value())
+
+    def term():
+        factor()
+        while peek() == ('word', 'AND'):
+            take()
+            sql.append("AND")
+            factor()
+
+    def expr():
+        term()
+        while peek() == ('word', 'OR'):
+            take()
+            sql.append("OR")
+            term()
+
+    expr()
+    if pos < len(tokens):
+        raise ValueError(f"Trecho inesperado no filtro: {tokens[pos][1]!r}")
+    if given:
+        raise ValueError("Parâmetros a mais para os '?' do filtro")
+    return " ".join(sql), values
+
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS triplets ("
+    " name TEXT PRIMARY KEY,"
+    " id INTEGER,"
+    " repo TEXT,"
+    " commit_sha TEXT,"
+    " filepath TEXT,"
+    " extension TEXT,"
+    + "".join(f" {version}_lines INTEGER," for version in VERSIONS)
+    + "".join(f" {version}_bytes INTEGER," for version in VERSIONS)
+    + " filter_skipped INTEGER,"
+    " filter_reason TEXT,"
+    " diff3_conflicts INTEGER,"
+    + ",".join(f" {version}_blob TEXT" for version in VERSIONS)
+    + ")"
+)
+
+
+class TripletIndex:
+    """
+    Índice SQLite de características das triplas.
+
+    Thread-safe: pode ser compartilhado pelos workers do minerador.
+    """
+
+    def __init__(self, db_path: Path, backend: str = "auto"):
+        """
+        Abre (ou cria) o índice.
+
+        Args:
+            db_path: Arquivo SQLite (diretório criado se necessário)
+            backend: Backend do diff3 usado na contagem de conflitos
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.file_filter = FileFilter()
+        self.backend = get_backend(backend)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.db_path), timeout=60, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute(_SCHEMA)
+        # Índices anteriores às colunas de blobs: linhas antigas ficam com
+        # blobs NULL e são reindexadas pelo runner
+        existing = {row[1] for row in self._db.execute("PRAGMA table_info(triplets)")}
+        for version in VERSIONS:
+            if f'{version}_blob' not in existing:
+                self._db.execute(f"ALTER TABLE triplets ADD COLUMN {version}_blob TEXT")
+        for column in ('extension', 'repo', 'diff3_conflicts'):
+            self._db.execute(f"CREATE INDEX IF NOT EXISTS idx_{column} ON triplets ({column})")
+        self._db.commit()
+
+        self.stats = {
+            'triplets_indexed': 0,
+        }
+
+    @classmethod
+    def exists(cls, db_path: Path) -> bool:
+        """True se o índice já foi criado."""
+        return Path(db_path).exists()
+
+    def features(self, contents: Dict[str, Optional[str]], metadata: Dict) -> Dict:
+        """
+        Calcula as características de uma tripla.
+
+        Args:
+            contents: Versão ('base', 'left', 'right', 'merged') -> conteúdo
+                      (merged pode ser None em triplas antigas)
+            metadata: Metadados estruturados (triplet_metadata); linhas e
+                      bytes registrados são reusados
+
+        Returns:
+            Dict coluna -> valor (colunas de COLUMNS)
+        """
+        files = metadata.get('files') or {}
+        row = {
+            'id': metadata.get('id') if isinstance(metadata.get('id'), int) else None,
+            'repo': metadata.get('repo', ''),
+            'commit_sha': metadata.get('commit_sha', ''),
+            'filepath': metadata.get('filepath', ''),
+            'extension': metadata.get('extension', ''),
+        }
+        for version in VERSIONS:
+            content = contents.get(version)
+            recorded = files.get(version)
+            if recorded is not None:
+                row[f'{version}_lines'] = recorded['lines']
+                row[f'{version}_bytes'] = recorded['size']
+                row[f'{version}_blob'] = recorded['blob_sha']
+            elif content is not None:
+                row[f'{version}_lines'] = count_lines(content)
+                row[f'{version}_bytes'] = len(content.encode('utf-8', 'surrogatepass'))
+                row[f'{version}_blob'] = git_blob_sha(content)
+            else:
+                row[f'{version}_lines'] = row[f'{version}_bytes'] = row[f'{version}_blob'] = None
+
+        reason = self.file_filter.get_skip_reason(contents['base'], row['filepath'])
+        row['filter_skipped'] = int(bool(reason))
+        row['filter_reason'] = reason
+
+        try:
+            _, conflicts = self.backend.merge(contents['base'], contents['left'], contents['right'])
+            # git merge-file: negativo/255 = erro
+            row['diff3_conflicts'] = conflicts if 0 <= conflicts < 255 else None
+        except Exception as e:
+            logger.warning(f"Erro no diff3 de {row['filepath']}: {e}")
+            row['diff3_conflicts'] = None
+
+        return row
+
+    def add(self, name: str, contents: Dict[str, Optional[str]], metadata: Dict):
+        """
+        Indexa (ou reindexa) uma tripla.
+
+        Args:
+            name: Nome da tripla (ex.: "triplet_001")
+            contents: Versão -> conteúdo
+            metadata: Metadados estruturados da tripla
+        """
+        row = self.features(contents, metadata)
+        columns = ('name',) + COLUMNS
+        with self._lock:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO triplets ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})",
+                [name] + [row[column] for column in COLUMNS]
+            )
+            self._db.commit()
+            self.stats['triplets_indexed'] += 1
+
+    def names(self, where: Optional[str] = None, params: Sequence = ()) -> List[str]:
+        """
+        Nomes das triplas indexadas que satisfazem `where`, em ordem.
+
+        Args:
+            where: Filtro sobre as colunas (ver compile_where; None = todas)
+            params: Valores dos `?` do filtro
+
+        Raises:
+            ValueError: Se o filtro for inválido
+        """
+        return [row['name'] for row in self._select("name", where, params)]
+
+    def query(self, where: Optional[str] = None, params: Sequence = ()) -> List[Dict]:
+        """Linhas (todas as colunas) das triplas que satisfazem `where`."""
+        return [dict(row) for row in self._select("*", where, params)]
+
+    def _select(self, columns: str, where: Optional[str], params: Sequence) -> List[sqlite3.Row]:
+        """SELECT com o filtro compilado (valores só como parâmetros)."""
+        sql = f"SELECT {columns} FROM triplets"
+        values: List = []
+        if where:
+            clause, values = compile_where(where, params)
+            sql += f" WHERE {clause}"
+        with self._lock:
+            return self._db.execute(sql + " ORDER BY name", values).fetchall()
+
+    def blobs(self) -> Dict[str, Dict[str, str]]:
+        """
+        SHAs dos blobs indexados, por tripla.
+
+        Returns:
+            Dict nome -> {versão: blob_sha} (versões sem blob omitidas)
+        """
+        columns = ', '.join(f'{version}_blob' for version in VERSIONS)
+        with self._lock:
+            rows = self._db.execute(f"SELECT name, {columns} FROM triplets").fetchall()
+        return {
+            row[0]: {version: sha for version, sha in zip(VERSIONS, row[1:]) if sha}
+            for row in rows
+        }
+
+    def remove(self, names: Iterable[str]):
+        """Remove triplas do índice."""
+        with self._lock:
+            self._db.executemany("DELETE FROM triplets WHERE name = ?", [(name,) for name in names])
+            self._db.commit()
+
+    def __contains__(self, name: str) -> bool:
+        with self._lock:
+            return self._db.execute(
+                "SELECT 1 FROM triplets WHERE name = ?", (name,)
+            ).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM triplets").fetchone()[0]
+
+    def get_statistics(self) -> Dict:
+        return self.stats.copy()
+
+    def close(self):
+        """Fecha o banco."""
+        with self._lock:
+            self._db.close()
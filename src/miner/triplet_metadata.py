@@ -0,0 +1,216 @@
+"""
+Metadados estruturados de triplas (metadata.json versionado).
+
+O registro é gravado pelo extrator junto com a tripla e lido sem parse de
+texto. Além da origem (arquivo, commits, repositório), traz tamanho em
+bytes, número de linhas e SHA do blob git de cada versão, para que etapas
+seguintes não precisem reler os conteúdos:
+
+    {
+      "version": 1,
+      "id": 1,
+      "filepath": "src/app.ts",
+      "extension": ".ts",
+      "repo": "vscode",
+      "commit_sha": "...", "base_sha": "...", "left_sha": "...", "right_sha": "...",
+      "files": {
+        "base":   {"size": 1234, "lines": 40, "blob_sha": "..."},
+        "left":   {...}, "right": {...}, "merged": {...}
+      }
+    }
+
+Triplas antigas (só metadata.txt) são convertidas em memória por
+`read_metadata`, ou em disco por `migrate_triplet_dir`
+(scripts/migrate_metadata.py).
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+METADATA_NAME = "metadata.json"
+LEGACY_METADATA_NAME = "metadata.txt"
+METADATA_VERSION = 1
+
+VERSIONS = ('base', 'left', 'right', 'merged')
+
+# Campos de metadata.txt -> campos do registro estruturado
+_LEGACY_FIELDS = {
+    'Triplet ID': 'id',
+    'Original File': 'filepath',
+    'Extension': 'extension',
+    'Repository': 'repo',
+    'Commit SHA': 'commit_sha',
+    'Base SHA': 'base_sha',
+    'Left SHA': 'left_sha',
+    'Right SHA': 'right_sha',
+}
+
+
+def git_blob_sha(text: str) -> str:
+    """SHA-1 do blob git com o conteúdo (UTF-8) do texto."""
+    data = text.encode('utf-8', 'surrogatepass')
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def count_lines(text: str) -> int:
+    """Número de linhas (última linha sem quebra também conta)."""
+    return text.count('\n') + (1 if text and not text.endswith('\n') else 0)
+
+
+def file_features(text: str, blob_sha: Optional[str] = None) -> Dict:
+    """
+    Tamanho em bytes, linhas e SHA do blob de um conteúdo.
+
+    `blob_sha` já conhecido (p.ex. lido do repositório) dispensa o cálculo.
+    """
+    return {
+        'size': len(text.encode('utf-8', 'surrogatepass')),
+        'lines': count_lines(text),
+        'blob_sha': blob_sha or git_blob_sha(text),
+    }
+
+
+def build_metadata(triplet: Dict, triplet_id: int) -> Dict:
+    """
+    Monta o registro de metadados de uma tripla.
+
+    Args:
+        triplet: Dict da tripla (como retornado por TripletExtractor.extract_triplet)
+        triplet_id: ID numérico da tripla
+
+    Returns:
+        Registro estruturado (versão METADATA_VERSION)
+    """
+    # SHAs lidos do repositório pelo extrator (triplas antigas não têm)
+    blob_shas = triplet.get('blob_shas') or {}
+    files = {}
+    for version in VERSIONS:
+        content = triplet.get(f'{version}_content')
+        if content is not None:
+            files[version] = file_features(content, blob_shas.get(version))
+
+    return {
+        'version': METADATA_VERSION,
+        'id': triplet_id,
+        'filepath': triplet.get('filepath', ''),
+        'extension': triplet.get('extension', ''),
+        'repo': triplet.get('repo', ''),
+        'commit_sha': triplet.get('commit_sha', ''),
+        'base_sha': triplet.get('base_sha', ''),
+        'left_sha': triplet.get('left_sha', ''),
+        'right_sha': triplet.get('right_sha', ''),
+        'files': files,
+    }
+
+
+def version_file(triplet_dir: Path, version: str, extension: str = '') -> Optional[Path]:
+    """
+    Arquivo de uma versão no diretório da tripla.
+
+    Diretórios antigos podem ter a mesma versão com duas extensões (p.ex.
+    base.ts e base.tsx, com conteúdos diferentes): com `extension`
+    conhecida, vale `<versão><extensão>`; sem ela, o primeiro em ordem.
+    """
+    triplet_dir = Path(triplet_dir)
+    if extension:
+        path = triplet_dir / f"{version}{extension}"
+        if path.exists():
+            return path
+    files = sorted(triplet_dir.glob(f"{version}.*"))
+    return files[0] if files else None
+
+
+def write_metadata(triplet_dir: Path, metadata: Dict) -> Path:
+    """Grava metadata.json no diretório da tripla."""
+    path = Path(triplet_dir) / METADATA_NAME
+    path.write_text(json.dumps(metadata, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+    return path
+
+
+def parse_legacy_metadata(text: str) -> Dict:
+    """
+    Converte o conteúdo de um metadata.txt nos campos do registro.
+
+    Tamanhos, linhas e SHAs dos blobs não estão no formato antigo: o
+    registro volta sem 'files' (ver migrate_triplet_dir).
+    """
+    metadata = {'version': METADATA_VERSION}
+    for line in text.split('\n'):
+        if ':' not in line:
+            continue
+        key, value = line.split(':', 1)
+        field = _LEGACY_FIELDS.get(key.strip())
+        if field is not None:
+            metadata[field] = value.strip()
+
+    if str(metadata.get('id', '')).isdigit():
+        metadata['id'] = int(metadata['id'])
+    for field in _LEGACY_FIELDS.values():
+        metadata.setdefault(field, '')
+    metadata['files'] = {}
+    return metadata
+
+
+def read_metadata(triplet_dir: Path) -> Optional[Dict]:
+    """
+    Lê os metadados de um diretório de tripla.
+
+    Returns:
+        Registro estruturado (de metadata.json, ou convertido de
+        metadata.txt), ou None se não houver metadados
+    """
+    triplet_dir = Path(triplet_dir)
+    path = triplet_dir / METADATA_NAME
+    if path.exists():
+        metadata = json.loads(path.read_text(encoding='utf-8'))
+        if metadata.get('version', 0) > METADATA_VERSION:
+            logger.warning(
+                f"{triplet_dir.name}: metadados na versão {metadata['version']} "
+                f"(suportada: {METADATA_VERSION})"
+            )
+        return metadata
+
+    legacy = triplet_dir / LEGACY_METADATA_NAME
+    if legacy.exists():
+        return parse_legacy_metadata(legacy.read_text(encoding='utf-8'))
+    return None
+
+
+def migrate_triplet_dir(triplet_dir: Path) -> bool:
+    """
+    Grava metadata.json para uma tripla antiga (só metadata.txt).
+
+    Campos de origem vêm do metadata.txt; tamanhos, linhas e SHAs dos
+    blobs são calculados dos arquivos. O metadata.txt é mantido.
+
+    Returns:
+        True se a tripla foi migrada (False se já tinha metadata.json ou
+        não tem arquivos de versões)
+    """
+    triplet_dir = Path(triplet_dir)
+    if (triplet_dir / METADATA_NAME).exists():
+        return False
+
+    metadata = read_metadata(triplet_dir) or parse_legacy_metadata('')
+    for version in VERSIONS:
+        # Mesmo arquivo que o runner vai ler (extensão do metadata.txt)
+        path = version_file(triplet_dir, version, metadata['extension'])
+        if path is not None:
+            metadata['files'][version] = file_features(path.read_text(encoding='utf-8'))
+            if not metadata['extension']:
+                metadata['extension'] = path.suffix
+
+    if not metadata['files']:
+        return False
+
+    if metadata['id'] == '':
+        suffix = triplet_dir.name.split('_', 1)[-1]
+        metadata['id'] = int(suffix) if suffix.isdigit() else ''
+
+    write_metadata(triplet_dir, metadata)
+    return True
@@ -0,0 +1,223 @@
+"""
+Arquivo empacotado de triplas (um arquivo de dados + índice de offsets).
+
+Com dezenas de milhares de triplas, o layout triplet_NNN/ custa um glob,
+quatro ou cinco leituras e a leitura dos metadados por tripla. O pacote
+guarda todas as triplas em dois arquivos append-only:
+
+    triplets.pack   # MAGIC + registros (JSON da tripla, zlib opcional)
+    triplets.idx    # MAGIC + entradas fixas (id, offset, tamanho, flags)
+
+O leitor abre o índice uma vez e mapeia os dados com mmap: carregar é uma
+leitura sequencial (ou indexada por ID), sem um arquivo por tripla.
+
+Escrita segura contra interrupções: o registro é gravado antes da entrada
+do índice, então dados sem entrada são ignorados e uma entrada truncada no
+fim do índice é descartada ao reabrir. Um pacote sem o índice (ou vice-versa)
+não é reaberto para escrita, e cada ID só pode ser gravado uma vez.
+"""
+
+import json
+import mmap
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+PACK_NAME = "triplets.pack"
+INDEX_NAME = "triplets.idx"
+
+PACK_MAGIC = b"CSDPACK1"
+INDEX_MAGIC = b"CSDIDX01"
+
+# id, offset, tamanho do registro, flags
+_ENTRY = struct.Struct("<IQIB")
+_FLAG_ZLIB = 1
+
+
+class TripletPackError(Exception):
+    """Arquivo de pacote inválido."""
+
+
+def _check_magic(path: Path, magic: bytes):
+    with open(path, 'rb') as f:
+        if f.read(len(magic)) != magic:
+            raise TripletPackError(f"Arquivo não é um pacote de triplas: {path}")
+
+
+class TripletPackWriter:
+    """
+    Escritor (append-only) de um pacote de triplas.
+
+    Thread-safe: os workers do minerador podem gravar ao mesmo tempo.
+    """
+
+    def __init__(self, directory: Path, compress: bool = True):
+        """
+        Abre (ou cria) o pacote de `directory`.
+
+        Args:
+            directory: Diretório com triplets.pack e triplets.idx
+            compress: Comprime cada registro com zlib
+
+        Raises:
+            TripletPackError: Se só um dos dois arquivos existir, ou se
+                              não forem um pacote de triplas
+        """
+        self.directory = Path(directory)
+        self.compress = compress
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        data_path = self.directory / PACK_NAME
+        index_path = self.directory / INDEX_NAME
+        # IDs já gravados (não podem ser regravados)
+        self._ids = set()
+        if data_path.exists() and index_path.exists():
+            _check_magic(data_path, PACK_MAGIC)
+            _check_magic(index_path, INDEX_MAGIC)
+            # Descartar entrada truncada (processo morto no meio da escrita)
+            entries_size = index_path.stat().st_size - len(INDEX_MAGIC)
+            with open(index_path, 'r+b') as f:
+                f.truncate(len(INDEX_MAGIC) + entries_size - entries_size % _ENTRY.size)
+                f.seek(len(INDEX_MAGIC))
+                raw = f.read()
+            self._ids = {entry[0] for entry in _ENTRY.iter_unpack(raw)}
+        elif data_path.exists() or index_path.exists():
+            # Recriar o arquivo que falta apagaria (ou tornaria inacessíveis)
+            # as triplas já gravadas
+            missing = index_path if data_path.exists() else data_path
+            raise TripletPackError(f"Pacote incompleto, arquivo ausente: {missing}")
+        else:
+            data_path.write_bytes(PACK_MAGIC)
+            index_path.write_bytes(INDEX_MAGIC)
+
+        self._lock = threading.Lock()
+        self._data = open(data_path, 'ab')
+        self._index = open(index_path, 'ab')
+
+        self.stats = {
+            'triplets_written': 0,
+            'bytes_written': 0,
+        }
+
+    def append(self, triplet: Dict, triplet_id: int):
+        """
+        Grava uma tripla.
+
+        Args:
+            triplet: Dict da tripla (como retornado por TripletExtractor.extract_triplet)
+            triplet_id: ID numérico da tripla
+
+        Raises:
+            ValueError: Se o pacote já tem uma tripla com `triplet_id`
+        """
+        payload = json.dumps(dict(triplet, id=triplet_id), ensure_ascii=False)
+        record = payload.encode('utf-8', 'surrogatepass')
+        flags = 0
+        if self.compress:
+            record = zlib.compress(record)
+            flags |= _FLAG_ZLIB
+
+        with self._lock:
+            if triplet_id in self._ids:
+                raise ValueError(f"ID de tripla já usado no pacote: {triplet_id}")
+            self._ids.add(triplet_id)
+            offset = self._data.tell()
+            self._data.write(record)
+            self._data.flush()
+            self._index.write(_ENTRY.pack(triplet_id, offset, len(record), flags))
+            self._index.flush()
+            self.stats['triplets_written'] += 1
+            self.stats['bytes_written'] += len(record)
+
+    def close(self):
+        """Fecha o pacote."""
+        with self._lock:
+            self._data.close()
+            self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TripletPackReader:
+    """
+    Leitor de um pacote de triplas (dados mapeados com mmap).
+    """
+
+    def __init__(self, directory: Path):
+        """
+        Abre o pacote de `directory`.
+
+        Raises:
+            TripletPackError: Se os arquivos não forem um pacote de triplas
+        """
+        self.directory = Path(directory)
+        data_path = self.directory / PACK_NAME
+        index_path = self.directory / INDEX_NAME
+        _check_magic(data_path, PACK_MAGIC)
+
+        raw = index_path.read_bytes()
+        if raw[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            raise TripletPackError(f"Arquivo não é um índice de triplas: {index_path}")
+        raw = raw[len(INDEX_MAGIC):]
+        raw = raw[:len(raw) - len(raw) % _ENTRY.size]
+
+        self._file = open(data_path, 'rb')
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # ID -> (offset, tamanho, flags); a última entrada de um ID vale
+        self._entries: Dict[int, Tuple[int, int, int]] = {}
+        for triplet_id, offset, length, flags in _ENTRY.iter_unpack(raw):
+            if offset + length <= len(self._data):
+                self._entries[triplet_id] = (offset, length, flags)
+
+    @classmethod
+    def exists(cls, directory: Path) -> bool:
+        """True se `directory` contém um pacote."""
+        directory = Path(directory)
+        return (directory / PACK_NAME).exists() and (directory / INDEX_NAME).exists()
+
+    def ids(self) -> List[int]:
+        """IDs das triplas do pacote, em ordem."""
+        return sorted(self._entries)
+
+    def get(self, triplet_id: int) -> Dict:
+        """
+        Lê uma tripla (mesmas chaves de extract_triplet, mais 'id' e, se
+        gravada pelo TripletExtractor, 'metadata').
+        """
+        offset, length, flags = self._entries[triplet_id]
+        record = self._data[offset:offset + length]
+        if flags & _FLAG_ZLIB:
+            record = zlib.decompress(record)
+        return json.loads(record.decode('utf-8', 'surrogatepass'))
+
+    def __iter__(self) -> Iterator[Tuple[int, Dict]]:
+        # Ordem do arquivo: leitura sequencial dos dados
+        for triplet_id in sorted(self._entries, key=lambda i: self._entries[i][0]):
+            yield triplet_id, self.get(triplet_id)
+
+    def __contains__(self, triplet_id: int) -> bool:
+        return triplet_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def close(self):
+        """Fecha o pacote."""
+        self._data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,229 @@
+"""
+Armazenamento de triplas endereçado por conteúdo.
+
+Em vez de quatro arquivos completos + metadados por tripla
+(triplet_NNN/), cada versão é gravada uma única vez como objeto, com a
+chave igual ao SHA do blob git do conteúdo, e cada tripla vira uma linha
+de manifesto referenciando os objetos:
+
+    store/
+      objects/ab/cdef...     # conteúdo de cada versão (uma vez só)
+      manifests.jsonl        # uma tripla por linha (append-only)
+
+Uma mesma base usada por muitas triplas, ou left == merged, ocupa espaço
+uma vez. Triplas com (base, left, right) idênticos a uma tripla já
+armazenada não são duplicadas: `add` devolve o ID existente.
+
+`export_directory` recria o layout triplet_NNN/ para ferramentas que
+esperam os diretórios.
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import logging
+
+from src.core.blob_store import BlobStore
+from .triplet_extractor import TripletExtractor
+from .triplet_metadata import build_metadata, git_blob_sha
+
+logger = logging.getLogger(__name__)
+
+VERSIONS = ('base', 'left', 'right', 'merged')
+
+# Subdiretório de triplets_dir com o store do minerador
+STORE_DIR = "store"
+
+
+class GitBlobStore(BlobStore):
+    """BlobStore com chaves no formato de SHA de blob git."""
+
+    def digest(self, text: str) -> str:
+        return git_blob_sha(text)
+
+
+class TripletStore:
+    """
+    Store de triplas: objetos por SHA de blob + manifestos.
+
+    Thread-safe: os workers do minerador podem gravar ao mesmo tempo.
+    """
+
+    MANIFEST_NAME = "manifests.jsonl"
+    OBJECTS_DIR = "objects"
+
+    def __init__(self, root: Path, dedup: bool = True):
+        """
+        Abre (ou cria) um store.
+
+        Args:
+            root: Diretório do store
+            dedup: Não armazena de novo triplas com (base, left, right) já vistos
+        """
+        self.root = Path(root)
+        self.dedup = dedup
+        self.objects = GitBlobStore(self.root / self.OBJECTS_DIR)
+        self.manifest_path = self.root / self.MANIFEST_NAME
+
+        self._lock = threading.Lock()
+        self._manifests: Dict[int, Dict] = {}
+        # (extensão, base, left, right) -> ID da tripla
+        self._by_inputs: Dict[Tuple[str, str, str, str], int] = {}
+
+        self.stats = {
+            'triplets_added': 0,
+            'duplicates': 0,
+            'objects_written': 0,
+            'objects_reused': 0,
+        }
+
+        self._load()
+
+    @classmethod
+    def exists(cls, root: Path) -> bool:
+        """True se `root` contém um store."""
+        return (Path(root) / cls.MANIFEST_NAME).exists()
+
+    def _load(self):
+        if not self.manifest_path.exists():
+            return
+        with open(self.manifest_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    manifest = json.loads(line)
+                except ValueError:
+                    # Linha truncada (processo morto no meio da escrita)
+                    continue
+                self._index(manifest)
+
+    def _index(self, manifest: Dict):
+        self._manifests[manifest['id']] = manifest
+        blobs = manifest['blobs']
+        key = (manifest['extension'], blobs['base'], blobs['left'], blobs['right'])
+        self._by_inputs.setdefault(key, manifest['id'])
+
+    def add(self, triplet: Dict, triplet_id: int) -> int:
+        """
+        Armazena uma tripla.
+
+        Args:
+            triplet: Dict da tripla (como retornado por TripletExtractor.extract_triplet)
+            triplet_id: ID numérico da tripla
+
+        Returns:
+            ID sob o qual a tripla está armazenada (o de uma tripla idêntica
+            já existente, se houver)
+
+        Raises:
+            ValueError: Se `triplet_id` já pertence a outra tripla
+        """
+        # SHAs do extrator, quando presentes, dispensam recalcular os hashes
+        known = triplet.get('blob_shas') or {}
+        blobs = {
+            version: known.get(version) or self.objects.digest(triplet[f'{version}_content'])
+            for version in VERSIONS
+        }
+        key = (triplet['extension'], blobs['base'], blobs['left'], blobs['right'])
+
+        with self._lock:
+            if self.dedup and key in self._by_inputs:
+                self.stats['duplicates'] += 1
+                return self._by_inputs[key]
+            if triplet_id in self._manifests:
+                raise ValueError(f"ID de tripla já usado no store: {triplet_id}")
+
+            for version in VERSIONS:
+                if blobs[version] in self.objects:
+                    self.stats['objects_reused'] += 1
+                else:
+                    self.objects.put(triplet[f'{version}_content'], blobs[version])
+                    self.stats['objects_written'] += 1
+
+            # Metadados estruturados (triplet_metadata) + objetos de cada versão
+            manifest = dict(build_metadata(triplet, triplet_id), blobs=blobs)
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.manifest_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(manifest, ensure_ascii=False) + '\n')
+            self._index(manifest)
+            self.stats['triplets_added'] += 1
+
+        return triplet_id
+
+    def ids(self) -> List[int]:
+        """IDs das triplas armazenadas, em ordem."""
+        with self._lock:
+            return sorted(self._manifests)
+
+    def max_id(self) -> int:
+        """Maior ID armazenado (0 se vazio)."""
+        with self._lock:
+            return max(self._manifests, default=0)
+
+    def manifest(self, triplet_id: int) -> Dict:
+        """Manifesto de uma tripla."""
+        with self._lock:
+            return self._manifests[triplet_id]
+
+    def object_path(self, blob_sha: str) -> Path:
+        """Arquivo com o conteúdo de um objeto."""
+        return self.objects.path(blob_sha)
+
+    def get(self, triplet_id: int) -> Dict:
+        """
+        Reconstrói o dict de uma tripla (mesmas chaves de extract_triplet).
+        """
+        manifest = self.manifest(triplet_id)
+        triplet = {
+            key: manifest[key]
+            for key in ('filepath', 'extension', 'commit_sha', 'base_sha', 'left_sha', 'right_sha')
+        }
+        if manifest.get('repo'):
+            triplet['repo'] = manifest['repo']
+        for version in VERSIONS:
+            # Leitura direta (sem o cache do BlobStore: exportações percorrem tudo)
+            data = self.object_path(manifest['blobs'][version]).read_bytes()
+            triplet[f'{version}_content'] = data.decode('utf-8', 'surrogatepass')
+        triplet['blob_shas'] = dict(manifest['blobs'])
+        return triplet
+
+    def __iter__(self) -> Iterator[Tuple[int, Dict]]:
+        for triplet_id in self.ids():
+            yield triplet_id, self.get(triplet_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._manifests)
+
+    def export_directory(self, output_dir: Path, ids: Optional[List[int]] = None) -> int:
+        """
+        Exporta triplas no layout de diretórios triplet_NNN/.
+
+        Args:
+            output_dir: Diretório de destino
+            ids: Triplas a exportar (None = todas)
+
+        Returns:
+            Número de triplas exportadas
+        """
+        extractor = TripletExtractor(Path(output_dir))
+        count = 0
+        for triplet_id in (ids if ids is not None else self.ids()):
+            extractor.save_triplet(self.get(triplet_id), triplet_id)
+            count += 1
+        logger.info(f"✓ {count} triplas exportadas para {output_dir}")
+        return count
+
+    def get_statistics(self) -> Dict:
+        return self.stats.copy()
+
+    def print_statistics(self):
+        """Imprime estatísticas formatadas."""
+        print("\n" + "=" * 60)
+        print("ESTATÍSTICAS DO STORE DE TRIPLAS")
+        print("=" * 60)
+        print(f"Triplas armazenadas:  {self.stats['triplets_added']}")
+        print(f"Triplas duplicadas:   {self.stats['duplicates']}")
+        print(f"Objetos gravados:     {self.stats['objects_written']}")
+        print(f"Objetos reusados:     {self.stats['objects_reused']}")
+        print("=" * 60 + "\n")
@@ -0,0 +1,153 @@
+"""
+Diário de checkpoint das execuções de experimentos.
+
+Cada tripla concluída vira uma linha JSON (append-only) em
+`results_dir/checkpoint.jsonl`, com o resultado já achatado pelo
+ResultCollector e a impressão digital da configuração (versões das
+ferramentas, timeout, ...). Com `--resume`, triplas já registradas com a
+mesma configuração são restauradas do diário em vez de reexecutadas.
+
+Uma linha truncada (processo morto no meio da escrita) é ignorada na
+leitura e removida ao retomar, antes de novos registros.
+
+Ao retomar, só os ids e as posições (bytes) das linhas ficam em memória;
+cada resultado é relido do diário quando a tripla é restaurada.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def config_fingerprint(config: Dict) -> str:
+    """
+    Calcula a impressão digital de uma configuração.
+
+    Args:
+        config: Valores que alteram os resultados (versões, timeout, ...)
+
+    Returns:
+        Digest SHA-256 (16 primeiros caracteres hexadecimais)
+    """
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class CheckpointJournal:
+    """
+    Diário JSONL de triplas concluídas.
+    """
+
+    FILE_NAME = "checkpoint.jsonl"
+
+    def __init__(self, results_dir: Path, config: Dict):
+        """
+        Inicializa diário.
+
+        Args:
+            results_dir: Diretório de resultados do runner
+            config: Configuração da execução (ver config_fingerprint)
+        """
+        self.path = Path(results_dir) / self.FILE_NAME
+        self.config = config
+        self.fingerprint = config_fingerprint(config)
+        self._file = None
+        self._reader = None
+
+    def load(self) -> Dict[str, int]:
+        """
+        Localiza as triplas registradas com a configuração atual.
+
+        Os resultados não ficam em memória: leia cada um com read().
+
+        Returns:
+            Dict triplet_id -> posição (bytes) do registro no diário
+        """
+        offsets = {}
+        if not self.path.exists():
+            return offsets
+
+        skipped = 0
+        offset = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                position = offset
+                offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('config') != self.fingerprint:
+                    skipped += 1
+                    continue
+                offsets[record['triplet_id']] = position
+
+        if skipped:
+            logger.info(f"Checkpoint: {skipped} registros de outra configuração ignorados")
+        return offsets
+
+    def read(self, offset: int) -> Dict:
+        """
+        Relê um resultado registrado.
+
+        Args:
+            offset: Posição retornada por load()
+
+        Returns:
+            Resultado achatado (linha do CSV)
+        """
+        if self._reader is None:
+            self._reader = open(self.path, 'rb')
+        self._reader.seek(offset)
+        return json.loads(self._reader.readline())['entry']
+
+    def open(self, resume: bool = False):
+        """
+        Abre o diário para escrita.
+
+        Args:
+            resume: Mantém registros anteriores (senão o diário é recriado)
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if resume and self.path.exists():
+            self._truncate_partial_line()
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+
+    def _truncate_partial_line(self):
+        """Corta o diário após o último '\\n' (descarta linha truncada no fim)."""
+        with open(self.path, 'r+b') as f:
+            end = f.seek(0, 2)
+            position = end
+            while position > 0:
+                start = max(0, position - 65536)
+                f.seek(start)
+                chunk = f.read(position - start)
+                newline = chunk.rfind(b'\n')
+                if newline >= 0:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position < end:
+                logger.warning(f"Checkpoint: linha truncada descartada ({end - position} bytes)")
+                f.truncate(position)
+
+    def record(self, triplet_id: str, entry: Dict):
+        """Registra uma tripla concluída (gravada imediatamente)."""
+        if self._file is None:
+            self.open(resume=True)
+        record = {'triplet_id': triplet_id, 'config': self.fingerprint, 'entry': entry}
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+        self._file.flush()
+
+    def close(self):
+        """Fecha o diário."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
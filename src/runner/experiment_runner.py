@@ -3,22 +3,53 @@ Orquestrador de experimentos.
 Executa CSDiff-Web + mergiraf + slow-diff3 em triplas mineradas.
 
 Este é o módulo principal do Runner. Ele:
-1. Carrega triplas do diretório data/triplets/
+1. Carrega triplas do diretório data/triplets/ (diretórios triplet_NNN/,
+   o TripletStore em data/triplets/store e/ou o pacote triplets.pack)
 2. Executa as 3 ferramentas em cada tripla
 3. Coleta resultados e métricas
 4. Gera relatórios CSV e resumos
+
+Com `where`, só as triplas que satisfazem a consulta no índice de
+características (triplets_dir/index.sqlite3, ver triplet_index.py) são
+carregadas; triplas ainda não indexadas são indexadas antes.
+
+As triplas são carregadas sob demanda: só a lista de nomes é montada no
+início e o conteúdo é lido por uma thread com leitura antecipada limitada
+(`read_ahead`), então a memória não cresce com o tamanho do corpus.
+
+Com `workers > 1` as triplas são distribuídas num pool de processos (com
+um número limitado de triplas em voo); os resultados voltam ao processo
+principal na ordem das triplas e as estatísticas de cada worker são
+somadas às do runner.
 """
 
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from tqdm import tqdm
 import logging
-
+import multiprocessing.util
+import queue
+import shutil
+import tempfile
+import threading
+
+from src.core.merge_cache import BLOCK_CACHE_ENTRIES, MergeCache
+from src.miner.triplet_index import INDEX_DB_NAME, TripletIndex, compile_where
+from src.miner.triplet_metadata import build_metadata, read_metadata, version_file
+from src.miner.triplet_pack import TripletPackReader
+from src.miner.triplet_store import STORE_DIR, TripletStore
 from .tool_executor import ToolExecutor
 from .result_collector import ResultCollector
+from .checkpoint import CheckpointJournal
 
 logger = logging.getLogger(__name__)
 
+# Tripla a carregar: (nome, função de carga, argumento da função)
+TripletSource = Tuple[str, Callable[[Any], Optional[Dict]], Any]
+
 
 class ExperimentRunner:
     """
@@ -31,7 +62,13 @@ class ExperimentRunner:
         self,
         triplets_dir: Path,
         results_dir: Path,
-        timeout: int = 60
+        timeout: int = 60,
+        cache_dir: Optional[Path] = None,
+        workers: int = 1,
+        results_format: str = 'csv',
+        read_ahead: int = 16,
+        where: Optional[str] = None,
+        persist_block_cache: bool = False
     ):
         """
         Inicializa runner.
@@ -40,27 +77,59 @@ class ExperimentRunner:
             triplets_dir: Diretório com triplas (data/triplets/)
             results_dir: Diretório para salvar resultados
             timeout: Timeout por execução (segundos)
+            cache_dir: Diretório do cache de merges do CSDiff-Web
+                       (None = cache só em memória)
+            workers: Processos executando triplas em paralelo (1 = sequencial)
+            results_format: Formato da tabela de resultados ('csv' ou 'parquet')
+            read_ahead: Triplas carregadas à frente do processamento, numa
+                        thread (0 = carga na própria thread de processamento)
+            where: Filtro sobre o índice de características, p.ex.
+                   "extension = '.tsx' AND diff3_conflicts >= 3" (None = todas;
+                   sintaxe em triplet_index.compile_where)
+            persist_block_cache: Guarda também o memo de blocos em cache_dir
+                                 (padrão: só em memória, para não encurtar
+                                 os tempos medidos com blocos de execuções
+                                 anteriores)
         """
         self.triplets_dir = Path(triplets_dir)
         self.results_dir = Path(results_dir)
         self.timeout = timeout
+        self.cache_dir = cache_dir
+        self.block_cache_dir = cache_dir if persist_block_cache else None
+        self.workers = max(1, workers)
+        self.read_ahead = max(0, read_ahead)
+        self.where = where
+        if where:
+            # Filtro inválido falha aqui, antes de listar e indexar as triplas
+            compile_where(where)
 
         # Criar diretório de resultados
         self.results_dir.mkdir(parents=True, exist_ok=True)
 
         # Componentes
-        self.executor = ToolExecutor(timeout=timeout)
-        self.collector = ResultCollector(output_dir=results_dir)
+        self.executor = _build_executor(timeout, cache_dir, self.block_cache_dir)
+        self.merge_cache = self.executor.merge_cache
+        self.block_cache = self.executor.block_cache
+        self.collector = ResultCollector(output_dir=results_dir, results_format=results_format)
+
+        # Arquivos de entrada do slow-diff3 para triplas do pacote
+        self._scratch_dir: Optional[tempfile.TemporaryDirectory] = None
+
+        # Listagem feita por count_triplets: (max_triplets, fontes, pacote)
+        self._listing: Optional[Tuple[Optional[int], List[TripletSource], Optional[TripletPackReader]]] = None
 
         self.stats = {
             'triplets_loaded': 0,
             'triplets_processed': 0,
-            'triplets_skipped': 0
+            'triplets_skipped': 0,
+            'triplets_resumed': 0
         }
 
     def load_triplets(self, max_triplets: Optional[int] = None) -> List[Dict]:
         """
-        Carrega triplas do diretório.
+        Carrega triplas do diretório (todas em memória).
+
+        Para corpora grandes, prefira `iter_triplets`.
 
         Args:
             max_triplets: Máximo de triplas a carregar (None = todas)
@@ -68,90 +137,413 @@ class ExperimentRunner:
         Returns:
             Lista de triplas.
         """
-        triplets = []
+        triplets = list(self._stream_triplets(*self._list_sources(max_triplets)))
+        logger.info(f"Carregadas {len(triplets)} triplas com sucesso")
+        return triplets
 
-        # Listar diretórios triplet_*
-        triplet_dirs = sorted(self.triplets_dir.glob("triplet_*"))
+    def iter_triplets(self, max_triplets: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Carrega triplas sob demanda, na ordem dos nomes.
 
-        if not triplet_dirs:
-            logger.warning(f"Nenhuma tripla encontrada em {self.triplets_dir}")
-            return []
+        Com `read_ahead > 0`, até `read_ahead` triplas são lidas à frente
+        numa thread. Triplas que não carregam entram em
+        stats['triplets_skipped'] e não são produzidas.
+
+        Args:
+            max_triplets: Máximo de triplas a carregar (None = todas)
+
+        Yields:
+            Dicts das triplas (mesmo formato de load_triplets)
+        """
+        return self._read_ahead(self._stream_triplets(*self._list_sources(max_triplets)))
+
+    def count_triplets(self, max_triplets: Optional[int] = None) -> int:
+        """
+        Número de triplas que seriam executadas, em qualquer layout
+        (diretórios, store ou pacote), após `where` e `max_triplets`.
+        """
+        # A listagem fica guardada para o run_experiments seguinte
+        self._close_listing()
+        sources, pack = self._list_sources(max_triplets)
+        self._listing = (max_triplets, sources, pack)
+        return len(sources)
+
+    def _close_listing(self) -> None:
+        """Descarta a listagem guardada por count_triplets."""
+        listing, self._listing = self._listing, None
+        if listing is not None and listing[2] is not None:
+            listing[2].close()
+
+    def _list_sources(
+        self,
+        max_triplets: Optional[int] = None
+    ) -> Tuple[List[TripletSource], Optional[TripletPackReader]]:
+        """
+        Lista as triplas a executar sem ler seus conteúdos.
+
+        Aplica o filtro `where` (pelo índice) e depois `max_triplets`.
 
-        logger.info(f"Encontrados {len(triplet_dirs)} diretórios de triplas")
+        Returns:
+            (fontes em ordem de nome, pacote aberto ou None)
+        """
+        sources, pack = self._discover_sources()
+
+        if not sources:
+            logger.warning(f"Nenhuma tripla encontrada em {self.triplets_dir}")
+        else:
+            logger.info(f"Encontradas {len(sources)} triplas")
+
+        # Filtrar pelo índice de características (sem ler as triplas)
+        # (só as ausentes; regravadas são reindexadas com update_index)
+        if self.where and sources:
+            self.update_index(sources=sources, check_stale=False)
+            index = self._open_index()
+            try:
+                selected = set(index.names(self.where))
+            finally:
+                index.close()
+            sources = [source for source in sources if source[0] in selected]
+            logger.info(f"{len(sources)} triplas satisfazem o filtro: {self.where}")
 
         # Limitar se necessário
         if max_triplets:
-            triplet_dirs = triplet_dirs[:max_triplets]
+            sources = sources[:max_triplets]
             logger.info(f"Limitando a {max_triplets} triplas")
 
-        # Carregar cada tripla
-        for triplet_dir in triplet_dirs:
-            try:
-                triplet = self._load_single_triplet(triplet_dir)
+        return sources, pack
+
+    def _discover_sources(self) -> Tuple[List[TripletSource], Optional[TripletPackReader]]:
+        """
+        Todas as triplas de triplets_dir, em ordem de nome.
+
+        Returns:
+            (fontes, pacote aberto ou None)
+        """
+        # Fontes por nome: diretórios triplet_* têm precedência sobre o
+        # store (triplets_dir/store), que tem precedência sobre o pacote
+        sources = {
+            path.name: (self._load_single_triplet, path)
+            for path in self.triplets_dir.glob("triplet_*")
+        }
+        store = self._open_store()
+        if store is not None:
+            for triplet_id in store.ids():
+                sources.setdefault(
+                    f"triplet_{triplet_id:03d}",
+                    (partial(self._load_store_triplet, store), triplet_id)
+                )
+        pack = self._open_pack()
+        if pack is not None:
+            for triplet_id in pack.ids():
+                sources.setdefault(
+                    f"triplet_{triplet_id:03d}",
+                    (partial(self._load_pack_triplet, pack), triplet_id)
+                )
+
+        return [(name, *sources[name]) for name in sorted(sources)], pack
+
+    def _open_index(self) -> TripletIndex:
+        """Abre (ou cria) o índice de características de triplets_dir."""
+        return TripletIndex(self.triplets_dir / INDEX_DB_NAME)
+
+    def update_index(
+        self,
+        rebuild: bool = False,
+        sources: Optional[List[TripletSource]] = None,
+        check_stale: bool = True
+    ) -> int:
+        """
+        Indexa as triplas ausentes ou desatualizadas no índice de características.
+
+        Uma tripla está desatualizada quando os SHAs dos blobs nos seus
+        metadados atuais diferem dos indexados (p.ex. regravada com o mesmo
+        nome). Triplas antigas sem blobs nos metadados (metadata.txt) só
+        são indexadas se ausentes. Triplas que não existem mais são
+        removidas do índice.
+
+        Args:
+            rebuild: Reindexa todas as triplas
+            sources: Fontes a considerar (None = todas de triplets_dir)
+            check_stale: Compara os blobs de cada tripla já indexada
+                (lê os metadados de todas; False = só as ausentes)
+
+        Returns:
+            Número de triplas indexadas
+        """
+        pack = None
+        if sources is None:
+            sources, pack = self._discover_sources()
+
+        index = self._open_index()
+        try:
+            indexed = index.blobs()
+            names = {name for name, _, _ in sources}
+            index.remove(set(indexed) - names)
+
+            missing = [
+                source for source in sources
+                if rebuild or source[0] not in indexed
+                or (check_stale and self._is_stale(indexed[source[0]], *source[1:]))
+            ]
+            if missing:
+                logger.info(f"Indexando {len(missing)} triplas...")
+            count = 0
+            # Carga direta (sem passar pelas estatísticas da execução)
+            for name, loader, source in missing:
+                try:
+                    triplet = loader(source)
+                except Exception as e:
+                    logger.error(f"Erro ao indexar {name}: {e}")
+                    continue
+                if not triplet:
+                    continue
+                metadata = dict(triplet['metadata'])
+                for key in ('filepath', 'extension'):
+                    if not metadata.get(key):
+                        metadata[key] = triplet[key]
+                contents = {version: triplet[version] for version in ('base', 'left', 'right', 'merged')}
+                index.add(name, contents, metadata)
+                self._release_triplet(triplet)
+                count += 1
+        finally:
+            index.close()
+            if pack is not None:
+                pack.close()
+        return count
+
+    def _is_stale(self, indexed: Dict[str, str], loader: Callable, source: Any) -> bool:
+        """True se os blobs dos metadados atuais diferem dos indexados."""
+        func = getattr(loader, 'func', loader)
+        try:
+            if func == self._load_store_triplet:
+                current = dict(loader.args[0].manifest(source)['blobs'])
+            else:
+                if func == self._load_pack_triplet:
+                    metadata = loader.args[0].get(source).get('metadata') or {}
+                else:
+                    metadata = read_metadata(source) or {}
+                current = {
+                    version: features['blob_sha']
+                    for version, features in metadata.get('files', {}).items()
+                }
+        except Exception as e:
+            logger.warning(f"Metadados ilegíveis ({source}): {e}")
+            return True
+        # Sem blobs nos metadados (triplas antigas): só o nome é comparado
+        return bool(current) and current != indexed
+
+    def _stream_triplets(
+        self,
+        sources: List[TripletSource],
+        pack: Optional[TripletPackReader],
+        skip: Iterable[str] = ()
+    ) -> Iterator[Dict]:
+        """
+        Carrega as fontes uma a uma.
+
+        Args:
+            sources: Fontes (de _list_sources)
+            pack: Pacote aberto por _list_sources (fechado ao final)
+            skip: Nomes não carregados (produzidos só como {'id': nome}),
+                  ex.: triplas retomadas do checkpoint
+        """
+        skip = set(skip)
+        try:
+            for name, loader, source in sources:
+                if name in skip:
+                    yield {'id': name}
+                    continue
+                try:
+                    triplet = loader(source)
+                except Exception as e:
+                    logger.error(f"Erro ao carregar {name}: {e}")
+                    triplet = None
+
                 if triplet:
-                    triplets.append(triplet)
                     self.stats['triplets_loaded'] += 1
+                    yield triplet
                 else:
                     self.stats['triplets_skipped'] += 1
+        finally:
+            if pack is not None:
+                pack.close()
 
-            except Exception as e:
-                logger.error(f"Erro ao carregar {triplet_dir.name}: {e}")
-                self.stats['triplets_skipped'] += 1
+    def _read_ahead(self, triplets: Iterator[Dict]) -> Iterator[Dict]:
+        """
+        Consome `triplets` numa thread, até `read_ahead` triplas à frente.
 
-        logger.info(f"Carregadas {len(triplets)} triplas com sucesso")
-        return triplets
+        Erros da carga são relançados no consumidor; fechar o gerador
+        retornado encerra a thread.
+        """
+        if self.read_ahead == 0:
+            yield from triplets
+            return
+
+        buffer: queue.Queue = queue.Queue(maxsize=self.read_ahead)
+        stop = threading.Event()
+        end = object()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    buffer.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            error = None
+            try:
+                for triplet in triplets:
+                    if not put((triplet, None)):
+                        return
+            except BaseException as e:
+                error = e
+            finally:
+                triplets.close()
+            put((end, error))
+
+        thread = threading.Thread(target=produce, name="triplet-read-ahead", daemon=True)
+        thread.start()
+        try:
+            while True:
+                triplet, error = buffer.get()
+                if triplet is end:
+                    if error is not None:
+                        raise error
+                    return
+                yield triplet
+        finally:
+            stop.set()
+            thread.join()
+
+    def _open_store(self) -> Optional[TripletStore]:
+        """Abre o TripletStore de triplets_dir, se existir."""
+        store_dir = self.triplets_dir / STORE_DIR
+        if not TripletStore.exists(store_dir):
+            return None
+        return TripletStore(store_dir)
+
+    def _load_store_triplet(self, store: TripletStore, triplet_id: int) -> Dict:
+        """
+        Carrega uma tripla do TripletStore.
+
+        Os arquivos de cada versão (para o slow-diff3) são os próprios
+        objetos do store.
+        """
+        manifest = store.manifest(triplet_id)
+        stored = store.get(triplet_id)
+        files = {
+            version: store.object_path(manifest['blobs'][version])
+            for version in ('base', 'left', 'right', 'merged')
+        }
+        return {
+            'id': f"triplet_{triplet_id:03d}",
+            'dir': None,
+            'metadata': manifest,
+            'base': stored['base_content'],
+            'left': stored['left_content'],
+            'right': stored['right_content'],
+            'merged': stored['merged_content'],  # GABARITO
+            'extension': manifest['extension'],
+            'filepath': manifest['filepath'],
+            'base_file': files['base'],
+            'left_file': files['left'],
+            'right_file': files['right'],
+            'merged_file': files['merged']
+        }
+
+    def _open_pack(self) -> Optional[TripletPackReader]:
+        """Abre o pacote de triplas de triplets_dir, se existir."""
+        if not TripletPackReader.exists(self.triplets_dir):
+            return None
+        return TripletPackReader(self.triplets_dir)
+
+    def _load_pack_triplet(self, pack: TripletPackReader, triplet_id: int) -> Dict:
+        """
+        Carrega uma tripla do pacote.
+
+        O slow-diff3 lê arquivos: base, left e right são gravados num
+        diretório temporário do runner (removido ao fim do processo).
+        """
+        stored = pack.get(triplet_id)
+        name = f"triplet_{triplet_id:03d}"
+        extension = stored['extension']
+
+        if self._scratch_dir is None:
+            self._scratch_dir = tempfile.TemporaryDirectory(prefix="csdiff-triplets-")
+        input_dir = Path(self._scratch_dir.name) / name
+        input_dir.mkdir(exist_ok=True)
+        files = {}
+        for version in ('base', 'left', 'right'):
+            files[version] = input_dir / f"{version}{extension}"
+            files[version].write_text(stored[f'{version}_content'], encoding='utf-8')
+
+        # Pacotes anteriores aos metadados estruturados: calculados aqui
+        metadata = stored.get('metadata') or build_metadata(stored, triplet_id)
+        return {
+            'id': name,
+            'dir': None,
+            'metadata': metadata,
+            'base': stored['base_content'],
+            'left': stored['left_content'],
+            'right': stored['right_content'],
+            'merged': stored['merged_content'],  # GABARITO
+            'extension': extension,
+            'filepath': stored['filepath'],
+            'base_file': files['base'],
+            'left_file': files['left'],
+            'right_file': files['right'],
+            'merged_file': None
+        }
 
     def _load_single_triplet(self, triplet_dir: Path) -> Optional[Dict]:
         """
         Carrega uma única tripla.
 
+        Com metadata.json, os nomes dos arquivos vêm da extensão registrada;
+        triplas antigas (metadata.txt ou sem metadados) usam glob.
+
         Args:
             triplet_dir: Path do diretório da tripla
 
         Returns:
             Dict com dados da tripla, ou None se erro
         """
-        # Procurar arquivos base, left, right, merged
-        # Podem ter extensões diferentes (.ts, .tsx, .js, .jsx)
-        base_files = list(triplet_dir.glob("base.*"))
-        left_files = list(triplet_dir.glob("left.*"))
-        right_files = list(triplet_dir.glob("right.*"))
-        merged_files = list(triplet_dir.glob("merged.*"))
+        metadata = read_metadata(triplet_dir) or {}
+
+        files = {}
+        for version in ('base', 'left', 'right', 'merged'):
+            if version in metadata.get('files', {}):
+                files[version] = triplet_dir / f"{version}{metadata['extension']}"
+            else:
+                # Podem ter extensões diferentes (.ts, .tsx, .js, .jsx)
+                files[version] = version_file(triplet_dir, version, metadata.get('extension', ''))
 
-        if not base_files or not left_files or not right_files:
+        if not files['base'] or not files['left'] or not files['right']:
             logger.warning(f"{triplet_dir.name}: arquivos incompletos")
             return None
 
-        base_file = base_files[0]
-        left_file = left_files[0]
-        right_file = right_files[0]
-        merged_file = merged_files[0] if merged_files else None
-
         # Extensão
-        extension = base_file.suffix
+        extension = files['base'].suffix
 
         # Carregar conteúdos (base, left, right, merged)
         try:
-            base_content = base_file.read_text(encoding='utf-8')
-            left_content = left_file.read_text(encoding='utf-8')
-            right_content = right_file.read_text(encoding='utf-8')
+            base_content = files['base'].read_text(encoding='utf-8')
+            left_content = files['left'].read_text(encoding='utf-8')
+            right_content = files['right'].read_text(encoding='utf-8')
 
             # Carregar merged se existir (GABARITO)
             merged_content = None
-            if merged_file and merged_file.exists():
-                merged_content = merged_file.read_text(encoding='utf-8')
+            if files['merged'] and files['merged'].exists():
+                merged_content = files['merged'].read_text(encoding='utf-8')
             else:
                 logger.warning(f"{triplet_dir.name}: arquivo merged não encontrado (tripla antiga)")
         except Exception as e:
             logger.error(f"Erro ao ler arquivos de {triplet_dir.name}: {e}")
             return None
 
-        # Carregar metadata se existir
-        metadata = {}
-        metadata_file = triplet_dir / "metadata.txt"
-        if metadata_file.exists():
-            metadata = self._parse_metadata(metadata_file)
-
         return {
             'id': triplet_dir.name,
             'dir': triplet_dir,
@@ -161,83 +553,221 @@ class ExperimentRunner:
             'right': right_content,
             'merged': merged_content,  # GABARITO (resultado real do merge)
             'extension': extension,
-            'filepath': metadata.get('Original File', ''),
-            'base_file': base_file,
-            'left_file': left_file,
-            'right_file': right_file,
-            'merged_file': merged_file
+            'filepath': metadata.get('filepath', ''),
+            'base_file': files['base'],
+            'left_file': files['left'],
+            'right_file': files['right'],
+            'merged_file': files['merged']
         }
 
-    def _parse_metadata(self, metadata_file: Path) -> Dict:
-        """
-        Parse arquivo metadata.txt.
-        """
-        metadata = {}
-        try:
-            lines = metadata_file.read_text(encoding='utf-8').split('\n')
-            for line in lines:
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    metadata[key.strip()] = value.strip()
-        except Exception as e:
-            logger.warning(f"Erro ao parsear metadata: {e}")
-        return metadata
-
     def run_experiments(
         self,
-        max_triplets: Optional[int] = None
+        max_triplets: Optional[int] = None,
+        resume: bool = False
     ) -> Dict:
         """
         Executa experimentos em triplas.
 
+        Cada tripla concluída é gravada no checkpoint (checkpoint.jsonl em
+        results_dir) assim que termina.
+
         Args:
             max_triplets: Máximo de triplas a processar (None = todas)
+            resume: Reaproveita triplas do checkpoint com a mesma configuração
 
         Returns:
             Dict com resultados.
         """
 
-        # Carregar triplas
-        logger.info("Carregando triplas...")
-        triplets = self.load_triplets(max_triplets=max_triplets)
+        # Listar triplas (o conteúdo é carregado durante o processamento)
+        logger.info("Listando triplas...")
+        if self._listing is not None and self._listing[0] == max_triplets:
+            _, sources, pack = self._listing
+            self._listing = None
+        else:
+            self._close_listing()
+            sources, pack = self._list_sources(max_triplets)
 
-        if not triplets:
+        if not sources:
             logger.error("Nenhuma tripla para processar")
             return {
                 'triplets_processed': 0,
+                'results_path': None,
                 'csv_path': None,
                 'summary_path': None,
                 'metrics': {}
             }
 
-        # Processar cada tripla
-        logger.info(f"Processando {len(triplets)} triplas...")
+        journal = CheckpointJournal(self.results_dir, self.get_run_config())
+        done = self._load_checkpoint(journal, sources) if resume else {}
+        journal.open(resume=resume)
+        self.collector.journal = journal
 
-        for triplet in tqdm(triplets, desc="Executando experimentos"):
-            try:
-                self._process_single_triplet(triplet)
-                self.stats['triplets_processed'] += 1
+        # Triplas retomadas do checkpoint não são carregadas
+        triplets = self._read_ahead(self._stream_triplets(sources, pack, skip=done))
 
-            except Exception as e:
-                logger.error(f"Erro ao processar {triplet['id']}: {e}")
+        # Processar cada tripla
+        logger.info(f"Processando {len(sources)} triplas...")
+
+        try:
+            if self.workers > 1:
+                self._run_parallel(triplets, len(sources), done, journal)
+            else:
+                for triplet in tqdm(triplets, total=len(sources), desc="Executando experimentos"):
+                    # Triplas do checkpoint entram no CSV na mesma posição
+                    if triplet['id'] in done:
+                        self._restore_triplet(journal, done[triplet['id']])
+                        continue
+                    try:
+                        self._process_single_triplet(triplet)
+                        self.stats['triplets_processed'] += 1
+
+                    except Exception as e:
+                        logger.error(f"Erro ao processar {triplet['id']}: {e}")
+                    finally:
+                        self._release_triplet(triplet)
+        finally:
+            # Também em exceções/KeyboardInterrupt: sem worker Node ou threads órfãos
+            triplets.close()
+            self.executor.close()
+            journal.close()
+            self.collector.journal = None
 
         # Gerar relatórios
         logger.info("Gerando relatórios...")
-        csv_path = self.collector.generate_csv()
+        results_path = self.collector.generate_results()
         summary_path = self.collector.generate_summary()
         metrics = self.collector.calculate_metrics()
 
         logger.info(f"✓ Experimentos concluídos!")
-        logger.info(f"  CSV:     {csv_path}")
+        logger.info(f"  Tabela:  {results_path}")
         logger.info(f"  Resumo:  {summary_path}")
 
         return {
             'triplets_processed': self.stats['triplets_processed'],
-            'csv_path': csv_path,
+            'triplets_resumed': self.stats['triplets_resumed'],
+            'results_path': results_path,
+            'csv_path': results_path if self.collector.results_format == 'csv' else None,
             'summary_path': summary_path,
             'metrics': metrics
         }
 
+    def get_run_config(self) -> Dict:
+        """Configuração que altera resultados (entra na chave do checkpoint)."""
+        return {
+            'tools': self.executor.get_tool_versions(),
+            'timeout': self.timeout
+        }
+
+    def _load_checkpoint(self, journal: CheckpointJournal, sources: List[TripletSource]) -> Dict[str, int]:
+        """
+        Localiza no checkpoint as triplas já executadas com a mesma configuração.
+
+        Returns:
+            Dict triplet_id -> posição no diário, só para as triplas listadas
+        """
+        ids = {name for name, _, _ in sources}
+        done = {tid: offset for tid, offset in journal.load().items() if tid in ids}
+        logger.info(f"Checkpoint: {len(done)} triplas retomadas, {len(sources) - len(done)} pendentes")
+        return done
+
+    def _restore_triplet(self, journal: CheckpointJournal, offset: int):
+        """Relê uma tripla do checkpoint e a registra no CSV."""
+        self.collector.restore_result(journal.read(offset))
+        self.stats['triplets_resumed'] += 1
+
+    def _run_parallel(
+        self,
+        triplets: Iterable[Dict],
+        total: int,
+        done: Dict[str, int],
+        journal: CheckpointJournal
+    ):
+        """
+        Executa as ferramentas num pool de processos.
+
+        As triplas são submetidas conforme chegam do carregador, com no
+        máximo 2 × workers em voo, e os resultados são coletados na ordem
+        das triplas, então o CSV sai idêntico ao da execução sequencial.
+        Cada worker tem seu próprio ToolExecutor (e conexões aos caches em
+        disco); os contadores de cada tripla voltam junto com o resultado e
+        são somados aqui.
+        """
+        workers = max(1, min(self.workers, total - len(done)))
+        logger.info(f"Usando {workers} processos")
+        window = 2 * workers
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.timeout, self.cache_dir, self.block_cache_dir)
+        ) as pool, tqdm(total=total, desc="Executando experimentos") as progress:
+            in_flight: deque = deque()
+            for triplet in triplets:
+                future = None
+                if triplet['id'] not in done:
+                    future = pool.submit(_execute_in_worker, triplet)
+                in_flight.append((triplet, future))
+
+                while len(in_flight) > window:
+                    self._collect_outcome(*in_flight.popleft(), done, journal)
+                    progress.update(1)
+
+            while in_flight:
+                self._collect_outcome(*in_flight.popleft(), done, journal)
+                progress.update(1)
+
+    def _collect_outcome(
+        self,
+        triplet: Dict,
+        future: Optional[Future],
+        done: Dict[str, int],
+        journal: CheckpointJournal
+    ):
+        """Registra o resultado de uma tripla executada num worker (ou retomada)."""
+        if future is None:
+            # Triplas do checkpoint entram no CSV na mesma posição
+            self._restore_triplet(journal, done[triplet['id']])
+            return
+
+        try:
+            tool_results, counters, error = future.result()
+        finally:
+            self._release_triplet(triplet)
+        self._merge_worker_counters(counters)
+        if error is not None:
+            logger.error(f"Erro ao processar {triplet['id']}: {error}")
+            return
+
+        self.collector.add_result(
+            triplet_id=triplet['id'],
+            triplet_metadata=triplet['metadata'],
+            tool_results=tool_results,
+            merged_content=triplet.get('merged')  # GABARITO
+        )
+        self.stats['triplets_processed'] += 1
+
+    def _release_triplet(self, triplet: Dict):
+        """Remove os arquivos temporários de uma tripla do pacote já executada."""
+        base_file = triplet.get('base_file')
+        if self._scratch_dir is None or base_file is None:
+            return
+        input_dir = Path(base_file).parent
+        if input_dir.parent == Path(self._scratch_dir.name):
+            shutil.rmtree(input_dir, ignore_errors=True)
+
+    def _merge_worker_counters(self, counters: Dict[str, Dict[str, int]]):
+        """Soma os contadores de uma tripla executada num worker."""
+        targets = {
+            'executor': self.executor.stats,
+            'merge_cache': self.merge_cache.stats,
+            'block_cache': self.block_cache.stats
+        }
+        for name, delta in counters.items():
+            target = targets[name]
+            for key, value in delta.items():
+                target[key] = target.get(key, 0) + value
+
     def _process_single_triplet(self, triplet: Dict):
         """
         Processa uma única tripla com todas as ferramentas.
@@ -281,7 +811,86 @@ class ExperimentRunner:
         print(f"Triplas carregadas:   {self.stats['triplets_loaded']}")
         print(f"Triplas processadas:  {self.stats['triplets_processed']}")
         print(f"Triplas puladas:      {self.stats['triplets_skipped']}")
+        print(f"Triplas retomadas:    {self.stats['triplets_resumed']}")
         print("=" * 60)
 
         self.executor.print_statistics()
-        self.collector.print_statistics()
\ No newline at end of file
+        self.merge_cache.print_statistics()
+        self.block_cache.print_statistics("ESTATÍSTICAS DO CACHE DE BLOCOS")
+        self.collector.print_statistics()
+
+
+def _build_executor(
+    timeout: int,
+    cache_dir: Optional[Path],
+    block_cache_dir: Optional[Path] = None
+) -> ToolExecutor:
+    """Cria o ToolExecutor com os caches de merges e de blocos."""
+    return ToolExecutor(
+        timeout=timeout,
+        merge_cache=MergeCache(cache_dir=cache_dir),
+        block_cache=MergeCache(
+            max_entries=BLOCK_CACHE_ENTRIES,
+            cache_dir=block_cache_dir,
+            db_name="block_cache.sqlite3"
+        )
+    )
+
+
+# ToolExecutor de cada processo do pool (criado em _init_worker)
+_worker_executor: Optional[ToolExecutor] = None
+
+
+def _init_worker(timeout: int, cache_dir: Optional[Path], block_cache_dir: Optional[Path] = None):
+    global _worker_executor
+    _worker_executor = _build_executor(timeout, cache_dir, block_cache_dir)
+    # Processos do pool saem por os._exit (atexit não roda); os finalizadores
+    # do multiprocessing rodam quando o worker termina normalmente
+    multiprocessing.util.Finalize(None, _close_worker, exitpriority=10)
+
+
+def _close_worker():
+    """Encerra o ToolExecutor do worker (worker Node do slow-diff3 e threads)."""
+    global _worker_executor
+    if _worker_executor is not None:
+        _worker_executor.close()
+        _worker_executor = None
+
+
+def _worker_counters() -> Dict[str, Dict[str, int]]:
+    return {
+        'executor': dict(_worker_executor.stats),
+        'merge_cache': dict(_worker_executor.merge_cache.stats),
+        'block_cache': dict(_worker_executor.block_cache.stats)
+    }
+
+
+def _execute_in_worker(triplet: Dict):
+    """
+    Executa as ferramentas numa tripla dentro de um worker.
+
+    Returns:
+        (resultados das ferramentas, contadores incrementados, erro ou None)
+    """
+    before = _worker_counters()
+    tool_results, error = None, None
+    try:
+        tool_results = _worker_executor.execute_all(
+            base=triplet['base'],
+            left=triplet['left'],
+            right=triplet['right'],
+            extension=triplet['extension'],
+            filename=triplet['filepath'],
+            base_file=triplet.get('base_file'),
+            left_file=triplet.get('left_file'),
+            right_file=triplet.get('right_file')
+        )
+    except Exception as e:
+        error = str(e)
+
+    after = _worker_counters()
+    counters = {
+        name: {key: value - before[name].get(key, 0) for key, value in stats.items()}
+        for name, stats in after.items()
+    }
+    return tool_results, counters, error
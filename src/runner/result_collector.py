@@ -7,35 +7,167 @@ Este módulo é responsável por:
 2. Calcular métricas (conflitos, erros, tempo)
 3. Gerar CSV comparativo
 4. Gerar estatísticas agregadas
+
+O CSV é escrito em streaming: o esquema de colunas é fixo (CSV_FIELDNAMES)
+e cada linha vai para o disco assim que a tripla termina. As métricas são
+agregadas incrementalmente, então a memória não cresce com o número de
+triplas (com `keep_results=True` as linhas também ficam em `results`).
+
+Cada saída e o gabarito também ganham um digest do conteúdo normalizado
+(colunas `*_norm_sha`), com o qual o analisador compara resultados sem
+carregar os textos.
+
+Com `results_format='parquet'` a tabela é colunar e tipada (PARQUET_FIELDS):
+as saídas e o gabarito vão para um BlobStore em `output_dir/blobs` e a
+tabela guarda só o hash (colunas `*_sha`).
 """
 
 import csv
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 from datetime import datetime
 import logging
 
+from src.core.blob_store import BlobStore, normalized_hash
+from .checkpoint import CheckpointJournal
+
 logger = logging.getLogger(__name__)
 
+# Ferramentas executadas pelo ToolExecutor (prefixos com underscore no CSV)
+TOOLS = ['csdiff_web', 'mergiraf', 'slow_diff3']
+TOOL_FIELDS = ['success', 'has_conflict', 'num_conflicts', 'output', 'output_norm_sha', 'time', 'cached', 'error']
+BASE_FIELDS = ['triplet_id', 'filepath', 'extension', 'commit_sha', 'repo_merged_content', 'repo_merged_content_norm_sha']
+
+# Texto -> coluna com o digest normalizado (ver blob_store.normalized_hash)
+NORM_DIGEST_FIELDS = {'repo_merged_content': 'repo_merged_content_norm_sha'}
+NORM_DIGEST_FIELDS.update({f'{tool}_output': f'{tool}_output_norm_sha' for tool in TOOLS})
+
+# Só o CSDiff-Web tem memo de blocos (acertos parciais de cache por tripla)
+EXTRA_FIELDS = ['csdiff_web_block_hits']
+
+# Colunas ordenadas, como na versão que montava o esquema a partir das linhas
+CSV_FIELDNAMES = sorted(
+    BASE_FIELDS + EXTRA_FIELDS + [f'{tool}_{field}' for tool in TOOLS for field in TOOL_FIELDS]
+)
+
+# Tabela colunar: textos grandes substituídos pelo hash no BlobStore
+TEXT_FIELDS = {'repo_merged_content': 'repo_merged_content_sha'}
+TEXT_FIELDS.update({f'{tool}_output': f'{tool}_output_sha' for tool in TOOLS})
+PARQUET_FIELDS = sorted(TEXT_FIELDS.get(field, field) for field in CSV_FIELDNAMES)
+PARQUET_ROW_GROUP = 1000
+BLOBS_DIR = 'blobs'
+
+RESULT_FORMATS = ('csv', 'parquet')
+
+
+def _parquet_schema():
+    import pyarrow as pa
+
+    types = {
+        'success': pa.bool_(), 'has_conflict': pa.bool_(), 'cached': pa.bool_(),
+        'num_conflicts': pa.int32(), 'block_hits': pa.int32(), 'time': pa.float64(),
+    }
+    fields = []
+    for name in PARQUET_FIELDS:
+        suffix = next((s for s in types if name.endswith('_' + s)), None)
+        fields.append(pa.field(name, types[suffix] if suffix else pa.string()))
+    return pa.schema(fields)
+
+
+def _is_true(value) -> bool:
+    """Booleano de uma célula (bool, ou texto 'True' de checkpoints/CSV)."""
+    return value is True or str(value).lower() == 'true'
+
+
+def _count(value) -> int:
+    """Inteiro de uma célula opcional (None/vazio = 0)."""
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+class _ToolAggregate:
+    """Agregados de uma ferramenta, atualizados linha a linha."""
+
+    def __init__(self):
+        self.total = 0
+        self.successful = 0
+        self.conflicts = []   # [soma, quantidade, mínimo, máximo]
+        self.times = []
+        self.errors = 0
+        self.unique_errors = set()
+
+    @staticmethod
+    def _update(acc: List, value):
+        if not acc:
+            acc.extend([value, 1, value, value])
+        else:
+            acc[0] += value
+            acc[1] += 1
+            acc[2] = min(acc[2], value)
+            acc[3] = max(acc[3], value)
+
+    def add(self, success, num_conflicts, time_taken, error, cached=False, block_hits=None):
+        if success is not None:
+            self.total += 1
+            self.successful += bool(success)
+        if num_conflicts is not None:
+            self._update(self.conflicts, num_conflicts)
+        # Resultado (ou algum bloco) lido do cache: o tempo não mede a ferramenta
+        if time_taken is not None and not _is_true(cached) and not _count(block_hits):
+            self._update(self.times, time_taken)
+        if error:
+            self.errors += 1
+            self.unique_errors.add(error)
+
 
 class ResultCollector:
     """
     Coletor de resultados de experimentos.
 
-    Armazena resultados de execuções e gera relatórios.
+    Escreve cada resultado no CSV assim que chega e gera relatórios.
     """
 
-    def __init__(self, output_dir: Path):
+    def __init__(
+        self,
+        output_dir: Path,
+        keep_results: bool = False,
+        results_format: str = 'csv'
+    ):
         """
         Inicializa coletor.
 
         Args:
             output_dir: Diretório para salvar resultados
+            keep_results: Mantém também as linhas em memória (`results`)
+            results_format: 'csv' (textos nas células) ou 'parquet'
+                            (colunar, textos no BlobStore)
         """
+        if results_format not in RESULT_FORMATS:
+            raise ValueError(f"Formato de resultados desconhecido: {results_format}")
+
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.results_format = results_format
+
+        self.keep_results = keep_results
+        self.results = []  # Linhas do CSV (só com keep_results)
+        self._aggregates = {tool: _ToolAggregate() for tool in TOOLS}
 
-        self.results = []  # Lista de resultados de cada tripla
+        # CSV aberto na primeira linha (results_TIMESTAMP.csv)
+        self.csv_path: Optional[Path] = None
+        self._csv_file = None
+        self._csv_writer: Optional[csv.DictWriter] = None
+
+        # Tabela colunar (results_TIMESTAMP.parquet), gravada por row group
+        self.parquet_path: Optional[Path] = None
+        self.blobs: Optional[BlobStore] = None
+        self._parquet_writer = None
+        self._parquet_rows: List[Dict] = []
+
+        # Diário de checkpoint: cada resultado é gravado assim que chega
+        self.journal: Optional[CheckpointJournal] = None
         self.stats = {
             'total_triplets': 0,
             'successful_triplets': 0,
@@ -63,19 +195,6 @@ class ResultCollector:
                 }
             merged_content: Conteúdo do merge real (GABARITO)
         """
-        self.stats['total_triplets'] += 1
-
-        # Verificar se pelo menos uma ferramenta teve sucesso
-        any_success = any(
-            result.get('success', False)
-            for result in tool_results.values()
-        )
-
-        if any_success:
-            self.stats['successful_triplets'] += 1
-        else:
-            self.stats['failed_triplets'] += 1
-
         # Armazenar resultado
         result_entry = {
             'triplet_id': triplet_id,
@@ -86,10 +205,101 @@ class ResultCollector:
             **self._flatten_tool_results(tool_results)
         }
 
-        self.results.append(result_entry)
+        self._store(result_entry)
+        if self.journal is not None:
+            self.journal.record(triplet_id, result_entry)
 
         logger.debug(f"Resultado adicionado: {triplet_id}")
 
+    def restore_result(self, result_entry: Dict):
+        """
+        Readiciona um resultado já achatado (lido do checkpoint).
+
+        Args:
+            result_entry: Linha do CSV gravada por add_result
+        """
+        self._store(result_entry)
+
+    def _store(self, result_entry: Dict):
+        """Escreve a linha no CSV e atualiza contadores e agregados."""
+        self.stats['total_triplets'] += 1
+
+        # Digests calculados uma vez aqui (checkpoints antigos não os têm)
+        for text_field, digest_field in NORM_DIGEST_FIELDS.items():
+            if result_entry.get(digest_field) is None:
+                result_entry[digest_field] = normalized_hash(result_entry.get(text_field))
+
+        # Verificar se pelo menos uma ferramenta teve sucesso
+        any_success = any(
+            value for key, value in result_entry.items()
+            if key.endswith('_success')
+        )
+        if any_success:
+            self.stats['successful_triplets'] += 1
+        else:
+            self.stats['failed_triplets'] += 1
+
+        for tool, aggregate in self._aggregates.items():
+            aggregate.add(
+                result_entry.get(f'{tool}_success'),
+                result_entry.get(f'{tool}_num_conflicts'),
+                result_entry.get(f'{tool}_time'),
+                result_entry.get(f'{tool}_error'),
+                result_entry.get(f'{tool}_cached'),
+                result_entry.get(f'{tool}_block_hits')
+            )
+
+        if self.results_format == 'parquet':
+            self._write_parquet_row(result_entry)
+        else:
+            self._write_csv_row(result_entry)
+
+        if self.keep_results:
+            self.results.append(result_entry)
+
+    def _write_csv_row(self, result_entry: Dict):
+        if self._csv_writer is None:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            self.csv_path = self.output_dir / f'results_{timestamp}.csv'
+            self._csv_file = open(self.csv_path, 'w', newline='', encoding='utf-8')
+            self._csv_writer = csv.DictWriter(
+                self._csv_file, fieldnames=CSV_FIELDNAMES, extrasaction='ignore'
+            )
+            self._csv_writer.writeheader()
+        self._csv_writer.writerow(result_entry)
+        self._csv_file.flush()
+
+    def _write_parquet_row(self, result_entry: Dict):
+        if self._parquet_writer is None:
+            import pyarrow.parquet as pq
+
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            self.parquet_path = self.output_dir / f'results_{timestamp}.parquet'
+            self.blobs = BlobStore(self.output_dir / BLOBS_DIR)
+            self._parquet_writer = pq.ParquetWriter(str(self.parquet_path), _parquet_schema())
+
+        row = {}
+        for field in CSV_FIELDNAMES:
+            value = result_entry.get(field)
+            if field in TEXT_FIELDS:
+                row[TEXT_FIELDS[field]] = self.blobs.put(value)
+            elif field.endswith('_error') and value is not None:
+                row[field] = str(value)
+            else:
+                row[field] = value
+        self._parquet_rows.append(row)
+
+        if len(self._parquet_rows) >= PARQUET_ROW_GROUP:
+            self._flush_parquet()
+
+    def _flush_parquet(self):
+        import pyarrow as pa
+
+        if self._parquet_rows:
+            table = pa.Table.from_pylist(self._parquet_rows, schema=self._parquet_writer.schema)
+            self._parquet_writer.write_table(table)
+            self._parquet_rows = []
+
     def _flatten_tool_results(self, tool_results: Dict[str, Dict]) -> Dict:
         """
         Achata resultados de ferramentas para formato CSV.
@@ -117,46 +327,82 @@ class ResultCollector:
             flattened[f'{prefix}_num_conflicts'] = result.get('num_conflicts', None)
             flattened[f'{prefix}_output'] = result.get('result', '')  # Resultado do merge
             flattened[f'{prefix}_time'] = result.get('execution_time', None)
+            flattened[f'{prefix}_cached'] = result.get('cached', False)
+            if 'block_hits' in result:
+                flattened[f'{prefix}_block_hits'] = result['block_hits']
             flattened[f'{prefix}_error'] = result.get('error', None)
 
         return flattened
 
-    def generate_csv(self, filename: str = None) -> Path:
+    def generate_results(self, filename: str = None) -> Path:
         """
-        Gera relatório CSV com todos os resultados.
+        Finaliza a tabela de resultados no formato configurado.
 
         Args:
-            filename: Nome do arquivo CSV (padrão: results_TIMESTAMP.csv)
+            filename: Nome do arquivo (padrão: results_TIMESTAMP.<formato>)
 
         Returns:
-            Path do arquivo CSV gerado
+            Path da tabela gerada
         """
-        if filename is None:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f'results_{timestamp}.csv'
+        if self.results_format == 'parquet':
+            return self.generate_parquet(filename)
+        return self.generate_csv(filename)
 
-        csv_path = self.output_dir / filename
+    def generate_parquet(self, filename: str = None) -> Path:
+        """
+        Finaliza a tabela Parquet (as linhas já foram gravadas em add_result).
 
-        if not self.results:
-            logger.warning("Nenhum resultado para gerar CSV")
-            return csv_path
+        Args:
+            filename: Nome do arquivo (padrão: results_TIMESTAMP.parquet do
+                      início da execução)
+
+        Returns:
+            Path do arquivo Parquet gerado
+        """
+        if self._parquet_writer is None:
+            if filename is None:
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                filename = f'results_{timestamp}.parquet'
+            logger.warning("Nenhum resultado para gerar Parquet")
+            return self.output_dir / filename
+
+        self._flush_parquet()
+        self._parquet_writer.close()
+        self._parquet_writer = None
+
+        if filename is not None:
+            self.parquet_path = self.parquet_path.rename(self.output_dir / filename)
+
+        logger.info(f"Parquet gerado: {self.parquet_path} ({self.stats['total_triplets']} linhas)")
+        return self.parquet_path
+
+    def generate_csv(self, filename: str = None) -> Path:
+        """
+        Finaliza o relatório CSV (as linhas já foram escritas em add_result).
+
+        Args:
+            filename: Nome do arquivo CSV (padrão: results_TIMESTAMP.csv do
+                      início da execução)
 
-        # Coletar todos os campos (keys) presentes nos resultados
-        fieldnames = set()
-        for result in self.results:
-            fieldnames.update(result.keys())
+        Returns:
+            Path do arquivo CSV gerado
+        """
+        if self._csv_writer is None:
+            if filename is None:
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                filename = f'results_{timestamp}.csv'
+            logger.warning("Nenhum resultado para gerar CSV")
+            return self.output_dir / filename
 
-        # Ordenar colunas para consistência
-        fieldnames = sorted(fieldnames)
+        self._csv_file.close()
+        self._csv_file = None
+        self._csv_writer = None
 
-        # Escrever CSV
-        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(self.results)
+        if filename is not None:
+            self.csv_path = self.csv_path.rename(self.output_dir / filename)
 
-        logger.info(f"CSV gerado: {csv_path} ({len(self.results)} linhas)")
-        return csv_path
+        logger.info(f"CSV gerado: {self.csv_path} ({self.stats['total_triplets']} linhas)")
+        return self.csv_path
 
     def calculate_metrics(self) -> Dict:
         """
@@ -165,7 +411,7 @@ class ResultCollector:
         Returns:
             Dict com métricas por ferramenta
         """
-        if not self.results:
+        if not self.stats['total_triplets']:
             return {}
 
         metrics = {}
@@ -193,47 +439,26 @@ class ResultCollector:
         Returns:
             Dict com métricas agregadas
         """
-        successes = []
-        conflicts = []
-        times = []
-        errors = []
-
-        for result in self.results:
-            success = result.get(f'{tool_prefix}_success')
-            num_conflicts = result.get(f'{tool_prefix}_num_conflicts')
-            time_taken = result.get(f'{tool_prefix}_time')
-            error = result.get(f'{tool_prefix}_error')
-
-            if success is not None:
-                successes.append(success)
-
-            if num_conflicts is not None:
-                conflicts.append(num_conflicts)
-
-            if time_taken is not None:
-                times.append(time_taken)
-
-            if error:
-                errors.append(error)
-
-        # Calcular agregados
-        total = len(successes)
-        successful = sum(successes) if successes else 0
+        aggregate = self._aggregates[tool_prefix]
+        total = aggregate.total
+        successful = aggregate.successful
+        conflicts_sum, conflicts_n, conflicts_min, conflicts_max = aggregate.conflicts or [0, 0, 0, 0]
+        time_sum, time_n, time_min, time_max = aggregate.times or [0, 0, 0, 0]
 
         return {
             'total_executions': total,
             'successful_executions': successful,
             'failed_executions': total - successful,
             'success_rate': (successful / total * 100) if total > 0 else 0,
-            'total_conflicts': sum(conflicts) if conflicts else 0,
-            'avg_conflicts': (sum(conflicts) / len(conflicts)) if conflicts else 0,
-            'min_conflicts': min(conflicts) if conflicts else 0,
-            'max_conflicts': max(conflicts) if conflicts else 0,
-            'avg_time': (sum(times) / len(times)) if times else 0,
-            'min_time': min(times) if times else 0,
-            'max_time': max(times) if times else 0,
-            'total_errors': len(errors),
-            'unique_errors': len(set(errors)) if errors else 0
+            'total_conflicts': conflicts_sum,
+            'avg_conflicts': (conflicts_sum / conflicts_n) if conflicts_n else 0,
+            'min_conflicts': conflicts_min,
+            'max_conflicts': conflicts_max,
+            'avg_time': (time_sum / time_n) if time_n else 0,
+            'min_time': time_min,
+            'max_time': time_max,
+            'total_errors': aggregate.errors,
+            'unique_errors': len(aggregate.unique_errors)
         }
 
     def generate_summary(self, filename: str = None) -> Path:
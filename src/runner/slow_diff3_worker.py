@@ -0,0 +1,204 @@
+"""
+Worker persistente do slow-diff3.
+
+Em vez de um `node slow-diff3/src/index.js ... -m` por tripla, mantém um
+processo Node vivo (slow-diff3/src/worker.js) e troca pedidos e respostas
+pelo stdin/stdout em quadros: 4 bytes big-endian com o tamanho, seguidos
+do JSON em UTF-8.
+
+- health check: `ping` ao iniciar (e após reinício)
+- reinício: se o processo morrer, é recriado no próximo pedido
+- timeout por pedido: o processo é morto e recriado no pedido seguinte
+
+O texto retornado por `merge` é idêntico à saída do CLI com `-m`.
+"""
+
+import json
+import os
+import selectors
+import subprocess
+import threading
+import time
+from itertools import count
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+HEADER_SIZE = 4
+
+
+class SlowDiff3WorkerError(RuntimeError):
+    """Falha do worker (processo morto, resposta inválida ou erro no merge)."""
+
+
+class SlowDiff3Worker:
+    """
+    Processo Node de longa duração executando merges do slow-diff3.
+
+    Thread-safe: pedidos concorrentes são serializados.
+    """
+
+    def __init__(
+        self,
+        script_path: Path = Path("./slow-diff3/src/worker.js"),
+        stack_size: int = 8192,
+        startup_timeout: float = 30.0
+    ):
+        """
+        Inicializa worker (o processo só sobe no primeiro pedido).
+
+        Args:
+            script_path: Caminho do worker.js
+            stack_size: Valor de --stack-size do Node (mesmo do CLI)
+            startup_timeout: Tempo máximo para o ping inicial (segundos)
+        """
+        self.script_path = Path(script_path)
+        self.stack_size = stack_size
+        self.startup_timeout = startup_timeout
+
+        self._process: Optional[subprocess.Popen] = None
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._ids = count(1)
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'starts': 0,
+            'restarts': 0,
+            'requests': 0,
+            'timeouts': 0,
+            'crashes': 0,
+        }
+
+    def merge(self, left_file: Path, base_file: Path, right_file: Path, timeout: float) -> str:
+        """
+        Executa o merge de três arquivos.
+
+        Args:
+            left_file, base_file, right_file: Caminhos das versões
+            timeout: Tempo máximo do pedido (segundos)
+
+        Returns:
+            Saída do merge, como impressa por `index.js -m`
+
+        Raises:
+            subprocess.TimeoutExpired: Pedido excedeu o timeout
+            SlowDiff3WorkerError: Processo morreu ou o merge falhou
+        """
+        with self._lock:
+            self._ensure_running()
+            self.stats['requests'] += 1
+            response = self._request({
+                'type': 'merge',
+                'left': str(Path(left_file).resolve()),
+                'base': str(Path(base_file).resolve()),
+                'right': str(Path(right_file).resolve()),
+            }, timeout)
+
+        if not response.get('ok'):
+            raise SlowDiff3WorkerError(response.get('error', 'erro desconhecido'))
+        return response['result']
+
+    def ping(self, timeout: float = 5.0) -> bool:
+        """Health check: True se o processo responde ao ping."""
+        with self._lock:
+            if not self._alive():
+                return False
+            try:
+                return self._request({'type': 'ping'}, timeout).get('type') == 'pong'
+            except (subprocess.TimeoutExpired, SlowDiff3WorkerError):
+                return False
+
+    def close(self):
+        """Encerra o processo Node."""
+        with self._lock:
+            self._stop()
+
+    def get_statistics(self) -> Dict:
+        return self.stats.copy()
+
+    def _alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def _ensure_running(self):
+        if self._alive():
+            return
+
+        if self._process is not None:
+            logger.warning(f"slow-diff3 worker encerrado (código {self._process.returncode}), reiniciando")
+            self._stop()
+        if self.stats['starts']:
+            self.stats['restarts'] += 1
+
+        self._process = subprocess.Popen(
+            ["node", f"--stack-size={self.stack_size}", str(self.script_path)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._process.stdout, selectors.EVENT_READ)
+        self.stats['starts'] += 1
+
+        response = self._request({'type': 'ping'}, self.startup_timeout)
+        if response.get('type') != 'pong':
+            self._stop()
+            raise SlowDiff3WorkerError(f"Resposta inesperada ao ping: {response}")
+
+    def _stop(self):
+        if self._process is None:
+            return
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+        for stream in (self._process.stdin, self._process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.wait()
+        self._process = None
+
+    def _request(self, message: Dict, timeout: float) -> Dict:
+        request_id = next(self._ids)
+        body = json.dumps({'id': request_id, **message}).encode('utf-8')
+        deadline = time.monotonic() + timeout
+
+        try:
+            self._process.stdin.write(len(body).to_bytes(HEADER_SIZE, 'big') + body)
+            self._process.stdin.flush()
+
+            size = int.from_bytes(self._read_exactly(HEADER_SIZE, deadline, timeout), 'big')
+            response = json.loads(self._read_exactly(size, deadline, timeout).decode('utf-8'))
+        except subprocess.TimeoutExpired:
+            # O Node pode estar preso no merge: descarta o processo
+            self.stats['timeouts'] += 1
+            self._stop()
+            raise
+        except (OSError, EOFError, ValueError) as e:
+            self.stats['crashes'] += 1
+            self._stop()
+            raise SlowDiff3WorkerError(f"Falha na comunicação com o worker: {e}") from e
+
+        if response.get('id') != request_id:
+            self._stop()
+            raise SlowDiff3WorkerError(f"Resposta fora de ordem: {response.get('id')} != {request_id}")
+        return response
+
+    def _read_exactly(self, size: int, deadline: float, timeout: float) -> bytes:
+        fd = self._process.stdout.fileno()
+        chunks = []
+        remaining = size
+        while remaining > 0:
+            left = deadline - time.monotonic()
+            if left <= 0 or not self._selector.select(left):
+                raise subprocess.TimeoutExpired(self._process.args, timeout)
+            chunk = os.read(fd, remaining)
+            if not chunk:
+                raise EOFError("worker encerrou a saída")
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
@@ -1,10 +1,18 @@
 """
 Executor de ferramentas de merge.
 Executa CSDiff-Web, slow-diff3 e MERGIRAF.
+
+Em `execute_all`, mergiraf e slow-diff3 (subprocessos) rodam em threads
+enquanto o CSDiff-Web roda na thread chamadora; cada ferramenta mede o
+próprio tempo, então `execution_time` continua sendo o tempo da ferramenta.
 """
 
+import hashlib
+import json
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import tempfile
 from pathlib import Path
 from typing import Dict, Optional
@@ -15,12 +23,49 @@ import sys
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
 from src.core.csdiff_web import CSDiffWeb
+from src.core.merge_cache import CACHE_VERSION, MergeCache
+from .slow_diff3_worker import SlowDiff3Worker
 
 logger = logging.getLogger(__name__)
 
+CORE_DIR = Path(__file__).resolve().parent.parent / "core"
+
+
+@lru_cache(maxsize=None)
+def csdiff_web_version() -> str:
+    """
+    Versão do CSDiff-Web: versão do cache + digest dos fontes de src/core.
+
+    O algoritmo não tem número de versão próprio; o digest muda com qualquer
+    alteração nos fontes (inclusive não commitada), invalidando checkpoints.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(CORE_DIR.glob("*.py")):
+        digest.update(path.name.encode('utf-8') + b"\0")
+        digest.update(path.read_bytes())
+    return f"{CACHE_VERSION}+{digest.hexdigest()[:12]}"
+
+
 class ToolExecutor:
-    def __init__(self, timeout: int = 60):
+    def __init__(
+        self,
+        timeout: int = 60,
+        merge_cache: Optional[MergeCache] = None,
+        block_cache: Optional[MergeCache] = None,
+        concurrent: bool = True,
+        slow_diff3_worker: bool = True
+    ):
         self.timeout = timeout
+        # Ferramentas externas em paralelo com o CSDiff-Web (ver execute_all)
+        self.concurrent = concurrent
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # Processo Node persistente para o slow-diff3 (um por script)
+        self.slow_diff3_worker = slow_diff3_worker
+        self._slow_diff3_workers: Dict[str, SlowDiff3Worker] = {}
+        # Cache de resultados do CSDiff-Web compartilhado entre execuções
+        self.merge_cache = merge_cache
+        # Memo por bloco de conflito (None = cache de blocos do processo)
+        self.block_cache = block_cache
         self.stats = {
             'csdiff_executions': 0, 'slow_diff3_executions': 0, 'mergiraf_executions': 0,
             'csdiff_errors': 0, 'slow_diff3_errors': 0, 'mergiraf_errors': 0,
@@ -29,8 +74,9 @@ class ToolExecutor:
     def execute_csdiff_web(self, base, left, right, extension, filename="") -> Dict:
         self.stats['csdiff_executions'] += 1
         start_time = time.time()
+        hits_before = self._cache_hits()
         try:
-            csdiff = CSDiffWeb(extension)
+            csdiff = CSDiffWeb(extension, cache=self.merge_cache, block_cache=self.block_cache)
             # Correção para unpacking: aceita 2 ou 3 valores de retorno
             ret = csdiff.merge(base, left, right, filename)
             
@@ -47,7 +93,11 @@ class ToolExecutor:
             return {
                 'tool': 'csdiff-web', 'success': True, 'has_conflict': has_conflict,
                 'num_conflicts': num_conflicts, 'result': result,
-                'execution_time': time.time() - start_time
+                'execution_time': time.time() - start_time,
+                # Resultado lido do cache: o tempo não mede o algoritmo
+                'cached': self._cache_hits() > hits_before,
+                # Blocos lidos do memo: o tempo mede só parte do algoritmo
+                'block_hits': csdiff.block_hits
             }
         except Exception as e:
             self.stats['csdiff_errors'] += 1
@@ -56,6 +106,11 @@ class ToolExecutor:
                 'execution_time': time.time() - start_time, 'error': str(e)
             }
 
+    def _cache_hits(self) -> int:
+        if self.merge_cache is None:
+            return 0
+        return self.merge_cache.stats['memory_hits'] + self.merge_cache.stats['disk_hits']
+
     def execute_mergiraf(self, base, left, right) -> Dict:
         self.stats['mergiraf_executions'] += 1
         start_time = time.time()
@@ -88,14 +143,18 @@ class ToolExecutor:
         self.stats['slow_diff3_executions'] += 1
         start_time = time.time()
         try:
-            # Aumentar stack size para evitar estouro de pilha
-            cmd = ["node", "--stack-size=8192", script_path, str(left_file), str(base_file), str(right_file), "-m"]
-            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=self.timeout, encoding='utf-8')
-            
-            if proc.returncode != 0 and not proc.stdout:
-                raise RuntimeError(f"Stderr: {proc.stderr}")
+            if self.slow_diff3_worker:
+                worker = self._get_slow_diff3_worker(script_path)
+                result = worker.merge(left_file, base_file, right_file, timeout=self.timeout)
+            else:
+                # Aumentar stack size para evitar estouro de pilha
+                cmd = ["node", "--stack-size=8192", script_path, str(left_file), str(base_file), str(right_file), "-m"]
+                proc = subprocess.run(cmd, capture_output=True, text=True, timeout=self.timeout, encoding='utf-8')
 
-            result = proc.stdout
+                if proc.returncode != 0 and not proc.stdout:
+                    raise RuntimeError(f"Stderr: {proc.stderr}")
+
+                result = proc.stdout
             return {
                 'tool': 'slow-diff3', 'success': True,
                 'has_conflict': "<<<<<<<" in result,
@@ -109,12 +168,77 @@ class ToolExecutor:
                 'execution_time': time.time() - start_time, 'error': str(e)
             }
 
+    def _get_slow_diff3_worker(self, script_path: str) -> SlowDiff3Worker:
+        # O worker.js fica ao lado do index.js
+        if script_path not in self._slow_diff3_workers:
+            self._slow_diff3_workers[script_path] = SlowDiff3Worker(
+                script_path=Path(script_path).with_name("worker.js")
+            )
+        return self._slow_diff3_workers[script_path]
+
+    def get_tool_versions(self, script_path="./slow-diff3/src/index.js") -> Dict[str, str]:
+        """
+        Versões das ferramentas, para invalidar checkpoints de outra configuração.
+
+        Ferramentas ausentes aparecem como "indisponível".
+        """
+        versions = {'csdiff-web': csdiff_web_version()}
+
+        for tool, cmd in (('mergiraf', ["mergiraf", "--version"]), ('node', ["node", "--version"])):
+            try:
+                proc = subprocess.run(cmd, capture_output=True, text=True, timeout=self.timeout)
+                versions[tool] = proc.stdout.strip() or proc.stderr.strip()
+            except Exception:
+                versions[tool] = "indisponível"
+
+        try:
+            package = Path(script_path).resolve().parent.parent / "package.json"
+            versions['slow-diff3'] = json.loads(package.read_text(encoding='utf-8'))['version']
+        except Exception:
+            versions['slow-diff3'] = "indisponível"
+
+        return versions
+
     def execute_all(self, base, left, right, extension, filename="", base_file=None, left_file=None, right_file=None):
+        if not self.concurrent:
+            return {
+                'csdiff-web': self.execute_csdiff_web(base, left, right, extension, filename),
+                'mergiraf': self.execute_mergiraf(base, left, right),
+                'slow-diff3': self.execute_slow_diff3(base_file, left_file, right_file) if base_file else {'success': False, 'error': 'No files'}
+            }
+
+        # Subprocessos disparados antes do CSDiff, que roda nesta thread
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tool")
+        mergiraf = self._pool.submit(self.execute_mergiraf, base, left, right)
+        slow_diff3 = self._pool.submit(self.execute_slow_diff3, base_file, left_file, right_file) if base_file else None
+
+        csdiff = self.execute_csdiff_web(base, left, right, extension, filename)
         return {
-            'csdiff-web': self.execute_csdiff_web(base, left, right, extension, filename),
-            'mergiraf': self.execute_mergiraf(base, left, right),
-            'slow-diff3': self.execute_slow_diff3(base_file, left_file, right_file) if base_file else {'success': False, 'error': 'No files'}
+            'csdiff-web': csdiff,
+            'mergiraf': mergiraf.result(),
+            'slow-diff3': slow_diff3.result() if slow_diff3 else {'success': False, 'error': 'No files'}
         }
 
-    def get_statistics(self): return self.stats.copy()
+    def close(self):
+        """Encerra as threads e os workers das ferramentas externas."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        for worker in self._slow_diff3_workers.values():
+            worker.close()
+
+    def get_statistics(self):
+        stats = self.stats.copy()
+        if self.merge_cache is not None:
+            stats['merge_cache'] = self.merge_cache.get_statistics()
+        if self.block_cache is not None:
+            stats['block_cache'] = self.block_cache.get_statistics()
+        if self._slow_diff3_workers:
+            stats['slow_diff3_worker'] = {
+                key: sum(w.stats[key] for w in self._slow_diff3_workers.values())
+                for key in ('starts', 'restarts', 'requests', 'timeouts', 'crashes')
+            }
+        return stats
+
     def print_statistics(self): pass
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""
+Testes do diário de checkpoint do runner.
+"""
+
+from src.runner import tool_executor
+from src.runner.checkpoint import CheckpointJournal
+from src.runner.result_collector import ResultCollector
+
+CONFIG = {'tools': {'mergiraf': '0.1'}, 'timeout': 60}
+
+
+def _collector_with_journal(tmp_path, resume=False):
+    journal = CheckpointJournal(tmp_path, CONFIG)
+    journal.open(resume=resume)
+    collector = ResultCollector(output_dir=tmp_path, keep_results=True)
+    collector.journal = journal
+    return collector, journal
+
+
+class TestCheckpointJournal:
+    def test_results_recorded_as_they_arrive(self, tmp_path):
+        collector, journal = _collector_with_journal(tmp_path)
+        collector.add_result("triplet_001", {}, {'mergiraf': {'success': True, 'result': 'x'}})
+
+        # Lido sem fechar o diário: a linha já está no arquivo
+        reader = CheckpointJournal(tmp_path, CONFIG)
+        loaded = reader.load()
+        assert list(loaded) == ["triplet_001"]
+        assert reader.read(loaded["triplet_001"]) == collector.results[0]
+        reader.close()
+        journal.close()
+
+    def test_other_config_is_ignored(self, tmp_path):
+        collector, journal = _collector_with_journal(tmp_path)
+        collector.add_result("triplet_001", {}, {'mergiraf': {'success': True}})
+        journal.close()
+
+        other = {**CONFIG, 'timeout': 120}
+        assert CheckpointJournal(tmp_path, other).load() == {}
+
+    def test_truncated_line_is_ignored(self, tmp_path):
+        collector, journal = _collector_with_journal(tmp_path)
+        collector.add_result("triplet_001", {}, {'mergiraf': {'success': True}})
+        journal.close()
+        with open(journal.path, 'a', encoding='utf-8') as f:
+            f.write('{"triplet_id": "triplet_002", "con')
+
+        assert list(CheckpointJournal(tmp_path, CONFIG).load()) == ["triplet_001"]
+
+    def test_resume_after_truncated_line(self, tmp_path):
+        collector, journal = _collector_with_journal(tmp_path)
+        collector.add_result("triplet_001", {}, {'mergiraf': {'success': True}})
+        journal.close()
+        with open(journal.path, 'a', encoding='utf-8') as f:
+            f.write('{"triplet_id": "triplet_002", "con')
+
+        collector, journal = _collector_with_journal(tmp_path, resume=True)
+        collector.add_result("triplet_002", {}, {'mergiraf': {'success': True}})
+        collector.add_result("triplet_003", {}, {'mergiraf': {'success': True}})
+        journal.close()
+
+        loaded = CheckpointJournal(tmp_path, CONFIG).load()
+        assert list(loaded) == ["triplet_001", "triplet_002", "triplet_003"]
+
+    def test_resume_after_line_truncated_at_start(self, tmp_path):
+        journal = CheckpointJournal(tmp_path, CONFIG)
+        journal.path.write_text('{"triplet_id": "trip', encoding='utf-8')
+
+        collector, journal = _collector_with_journal(tmp_path, resume=True)
+        collector.add_result("triplet_001", {}, {'mergiraf': {'success': True}})
+        journal.close()
+
+        assert list(CheckpointJournal(tmp_path, CONFIG).load()) == ["triplet_001"]
+
+    def test_open_without_resume_starts_over(self, tmp_path):
+        collector, journal = _collector_with_journal(tmp_path)
+        collector.add_result("triplet_001", {}, {'mergiraf': {'success': True}})
+        journal.close()
+
+        fresh = CheckpointJournal(tmp_path, CONFIG)
+        fresh.open(resume=False)
+        fresh.close()
+        assert CheckpointJournal(tmp_path, CONFIG).load() == {}
+
+    def test_restore_result_updates_stats(self, tmp_path):
+        collector, journal = _collector_with_journal(tmp_path)
+        collector.add_result("triplet_001", {}, {'mergiraf': {'success': True}})
+        collector.add_result("triplet_002", {}, {'mergiraf': {'success': False}})
+        journal.close()
+
+        restored = ResultCollector(output_dir=tmp_path / 'restored', keep_results=True)
+        reader = CheckpointJournal(tmp_path, CONFIG)
+        for offset in reader.load().values():
+            restored.restore_result(reader.read(offset))
+        reader.close()
+
+        assert restored.stats == collector.stats
+        assert restored.results == collector.results
+
+    def test_load_keeps_only_offsets(self, tmp_path):
+        collector, journal = _collector_with_journal(tmp_path)
+        collector.add_result("triplet_001", {}, {'mergiraf': {'success': True, 'result': 'ã'}})
+        collector.add_result("triplet_002", {}, {'mergiraf': {'success': False}})
+        journal.close()
+
+        reader = CheckpointJournal(tmp_path, CONFIG)
+        offsets = reader.load()
+        assert all(isinstance(offset, int) for offset in offsets.values())
+        # Leitura fora de ordem, após um registro com caracteres multibyte
+        assert reader.read(offsets["triplet_002"]) == collector.results[1]
+        assert reader.read(offsets["triplet_001"]) == collector.results[0]
+        reader.close()
+
+
+class TestToolVersions:
+    def test_csdiff_web_version_follows_sources(self, tmp_path, monkeypatch):
+        (tmp_path / "csdiff_web.py").write_text("x = 1\n")
+        monkeypatch.setattr(tool_executor, 'CORE_DIR', tmp_path)
+        tool_executor.csdiff_web_version.cache_clear()
+        first = tool_executor.csdiff_web_version()
+
+        (tmp_path / "csdiff_web.py").write_text("x = 2\n")
+        tool_executor.csdiff_web_version.cache_clear()
+        try:
+            assert tool_executor.csdiff_web_version() != first
+        finally:
+            tool_executor.csdiff_web_version.cache_clear()
@@ -0,0 +1,203 @@
+"""
+Testes da carga sob demanda de triplas no ExperimentRunner.
+"""
+
+import csv
+import os
+import sys
+import time
+from pathlib import Path
+
+# Adicionar src/ ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.merge_cache import MergeCache
+from src.miner.triplet_extractor import TripletExtractor
+from src.runner import experiment_runner
+from src.runner.checkpoint import CheckpointJournal
+from src.runner.experiment_runner import ExperimentRunner
+
+from tests.test_triplet_store import make_triplet
+
+
+def _fake_results(base):
+    return {
+        tool: {'success': True, 'result': base, 'conflicts': 0}
+        for tool in ('csdiff-web', 'mergiraf', 'slow-diff3')
+    }
+
+
+def _fake_init_worker(timeout, cache_dir, block_cache_dir=None):
+    pass
+
+
+def _fake_execute_in_worker(triplet):
+    return _fake_results(triplet['base']), {}, None
+
+
+class _MarkerExecutor:
+    """ToolExecutor falso que registra o close() num arquivo por processo."""
+
+    def __init__(self, marker_dir: Path):
+        self.marker_dir = marker_dir
+        self.merge_cache = MergeCache()
+        self.block_cache = MergeCache()
+        self.stats = {}
+
+    def close(self):
+        self.marker_dir.mkdir(exist_ok=True)
+        (self.marker_dir / str(os.getpid())).touch()
+
+
+def _result_ids(results):
+    with open(results['results_path'], newline='', encoding='utf-8') as f:
+        return [row['triplet_id'] for row in csv.DictReader(f)]
+
+
+def make_triplets_dir(path: Path, count: int) -> Path:
+    extractor = TripletExtractor(path)
+    for n in range(1, count + 1):
+        extractor.save_triplet(make_triplet(n, base=f"base {n}\n"), n)
+    return path
+
+
+def make_runner(tmp_path, count=10, **kwargs) -> ExperimentRunner:
+    triplets_dir = make_triplets_dir(tmp_path / "triplets", count)
+    runner = ExperimentRunner(triplets_dir, tmp_path / "results", **kwargs)
+    runner.get_run_config = lambda: {'tools': {}, 'timeout': runner.timeout}
+    return runner
+
+
+class TestIterTriplets:
+
+    def test_loads_on_demand(self, tmp_path):
+        runner = make_runner(tmp_path, read_ahead=0)
+        triplets = runner.iter_triplets()
+
+        first = next(triplets)
+        assert first['id'] == "triplet_001"
+        assert runner.stats['triplets_loaded'] == 1
+        triplets.close()
+
+    def test_read_ahead_is_bounded(self, tmp_path):
+        runner = make_runner(tmp_path, count=20, read_ahead=2)
+        triplets = runner.iter_triplets()
+
+        next(triplets)
+        time.sleep(0.3)
+        # 1 entregue + 2 na fila + 1 aguardando vaga
+        assert runner.stats['triplets_loaded'] <= 4
+        ids = [t['id'] for t in triplets]
+        assert ids == [f"triplet_{n:03d}" for n in range(2, 21)]
+
+    def test_skips_and_max_triplets(self, tmp_path):
+        runner = make_runner(tmp_path, count=5)
+        # Tripla incompleta: sem left
+        (tmp_path / "triplets" / "triplet_002" / "left.ts").unlink()
+
+        ids = [t['id'] for t in runner.iter_triplets(max_triplets=3)]
+        assert ids == ["triplet_001", "triplet_003"]
+        assert runner.stats['triplets_loaded'] == 2
+        assert runner.stats['triplets_skipped'] == 1
+
+
+class TestRunExperimentsStreaming:
+
+    def test_sequential_run(self, tmp_path):
+        runner = make_runner(tmp_path, count=4)
+        runner.executor.execute_all = lambda base, **kwargs: _fake_results(base)
+
+        results = runner.run_experiments()
+        assert results['triplets_processed'] == 4
+        assert _result_ids(results) == \
+            [f"triplet_{n:03d}" for n in range(1, 5)]
+
+    def test_resumed_triplets_are_not_loaded(self, tmp_path):
+        runner = make_runner(tmp_path, count=4)
+        journal = CheckpointJournal(runner.results_dir, runner.get_run_config())
+        journal.open()
+        journal.record("triplet_002", {'triplet_id': "triplet_002"})
+        journal.close()
+        runner.executor.execute_all = lambda base, **kwargs: _fake_results(base)
+
+        results = runner.run_experiments(resume=True)
+        assert results['triplets_processed'] == 3
+        assert results['triplets_resumed'] == 1
+        assert runner.stats['triplets_loaded'] == 3
+        assert _result_ids(results) == \
+            [f"triplet_{n:03d}" for n in range(1, 5)]
+
+    def test_parallel_run_keeps_order(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(experiment_runner, '_init_worker', _fake_init_worker)
+        monkeypatch.setattr(experiment_runner, '_execute_in_worker', _fake_execute_in_worker)
+        runner = make_runner(tmp_path, count=12, workers=2, read_ahead=3)
+
+        results = runner.run_experiments()
+        assert results['triplets_processed'] == 12
+        assert _result_ids(results) == \
+            [f"triplet_{n:03d}" for n in range(1, 13)]
+
+    def test_worker_executors_are_closed(self, tmp_path, monkeypatch):
+        markers = tmp_path / "closed"
+        monkeypatch.setattr(experiment_runner, '_build_executor',
+                            lambda *args: _MarkerExecutor(markers))
+        monkeypatch.setattr(experiment_runner, '_execute_in_worker', _fake_execute_in_worker)
+        runner = ExperimentRunner(make_triplets_dir(tmp_path / "triplets", 6),
+                                  tmp_path / "results", workers=2)
+        runner.get_run_config = lambda: {'tools': {}, 'timeout': runner.timeout}
+
+        runner.run_experiments()
+        closed = {int(path.name) for path in markers.iterdir()}
+        # Os dois workers do pool e o executor do processo principal
+        assert len(closed) == 3 and os.getpid() in closed
+
+    def test_executor_closed_on_interrupt(self, tmp_path):
+        runner = make_runner(tmp_path, count=3)
+        closed = []
+        runner.executor.close = lambda: closed.append(True)
+
+        def interrupt(**kwargs):
+            raise KeyboardInterrupt
+
+        runner.executor.execute_all = interrupt
+        try:
+            runner.run_experiments()
+        except KeyboardInterrupt:
+            pass
+        assert closed == [True]
+        assert runner.collector.journal is None
+
+    def test_pack_inputs_are_released(self, tmp_path):
+        triplets_dir = tmp_path / "triplets"
+        extractor = TripletExtractor(triplets_dir)
+        for n in (1, 2, 3):
+            extractor.save_triplet_packed(make_triplet(n), n)
+        extractor.close()
+
+        runner = ExperimentRunner(triplets_dir, tmp_path / "results")
+        runner.get_run_config = lambda: {'tools': {}, 'timeout': runner.timeout}
+        seen = []
+
+        def execute_all(base, base_file=None, **kwargs):
+            assert base_file.read_text() == base
+            seen.append(base_file)
+            return _fake_results(base)
+
+        runner.executor.execute_all = execute_all
+        results = runner.run_experiments()
+
+        assert results['triplets_processed'] == 3
+        assert len(seen) == 3
+        assert not any(path.exists() for path in seen)
+
+
+class TestCaches:
+
+    def test_block_cache_in_memory_by_default(self, tmp_path):
+        runner = make_runner(tmp_path, count=1, cache_dir=tmp_path / "cache")
+        assert runner.merge_cache.cache_dir == tmp_path / "cache"
+        assert runner.block_cache.cache_dir is None
+
+        persisted = ExperimentRunner(tmp_path / "triplets", tmp_path / "results2",
+                                     cache_dir=tmp_path / "cache", persist_block_cache=True)
+        assert persisted.block_cache.cache_dir == tmp_path / "cache"
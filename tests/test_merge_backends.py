@@ -0,0 +1,191 @@
+"""
+Testes do motor diff3 em processo.
+Compara byte a byte com `git merge-file -p --diff3` nas triplas armazenadas.
+"""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src.core.csdiff_web import CSDiffWeb
+from src.core.diff3_engine import merge_file
+from src.core.merge_backends import (
+    AutoMergeBackend,
+    GitMergeFileBackend,
+    PythonMergeBackend,
+    get_backend,
+)
+from src.core.preprocessor import Preprocessor
+
+TRIPLETS_DIR = Path(__file__).parent.parent / "data" / "triplets"
+
+# Versões explodidas muito grandes deixam o teste lento sem cobrir casos novos
+MAX_EXPLODED_LINES = 5000
+
+requires_git = pytest.mark.skipif(shutil.which("git") is None, reason="git não instalado")
+
+
+def _stored_triplets():
+    """Lista (diretório, extensão) de todas as triplas armazenadas."""
+    cases = []
+    for triplet_dir in sorted(TRIPLETS_DIR.glob("triplet_*")):
+        for base_file in sorted(triplet_dir.glob("base.*")):
+            cases.append(pytest.param(triplet_dir, base_file.suffix,
+                                      id=f"{triplet_dir.name}{base_file.suffix}"))
+    return cases
+
+
+def _assert_same_as_git(base, left, right):
+    expected, git_code = GitMergeFileBackend().merge(base, left, right)
+    merged, num_conflicts = merge_file(base, left, right)
+
+    assert merged == expected
+    assert min(num_conflicts, 127) == git_code
+
+
+@requires_git
+class TestGitEquivalence:
+    """O motor em processo deve reproduzir exatamente a saída do git."""
+
+    @pytest.mark.parametrize("triplet_dir,extension", _stored_triplets())
+    def test_stored_triplet(self, triplet_dir, extension):
+        base, left, right = (
+            (triplet_dir / f"{name}{extension}").read_text(encoding="utf-8")
+            for name in ("base", "left", "right")
+        )
+        _assert_same_as_git(base, left, right)
+
+        # Segundo passo do CSDiff: merge das versões explodidas
+        preprocessor = Preprocessor(extension)
+        exploded = [preprocessor.explode(text) for text in (base, left, right)]
+        if sum(text.count("\n") for text in exploded) <= MAX_EXPLODED_LINES:
+            _assert_same_as_git(*exploded)
+
+    @pytest.mark.parametrize("base,left,right", [
+        ("", "", ""),
+        ("a\n", "", "a\n"),
+        ("a\nb\nc\n", "a\nB\nc\n", "a\nb\nC\n"),
+        ("a\nb\nc\n", "a\nX\nc\n", "a\nY\nc\n"),
+        ("a\nb\nc\n", "a\nX\nc\n", "a\nX\nc\n"),
+        ("a\nb", "a\nc", "a\nd"),
+        ("a\r\nb\r\nc\r\n", "a\r\nX\r\nc\r\n", "a\r\nY\r\nc\r\n"),
+        ("x\n" * 50, "x\n" * 49 + "y\n", "y\n" + "x\n" * 49),
+        ("{\n}\n" * 30, "{\n}\n" * 29 + "{\nz\n}\n", "{\nw\n}\n" + "{\n}\n" * 29),
+    ])
+    def test_edge_cases(self, base, left, right):
+        _assert_same_as_git(base, left, right)
+
+
+class TestBackends:
+    """Seleção de backend e fallbacks."""
+
+    def test_get_backend_by_name(self):
+        assert isinstance(get_backend(), AutoMergeBackend)
+        assert isinstance(get_backend("python"), PythonMergeBackend)
+        assert isinstance(get_backend("git"), GitMergeFileBackend)
+
+    def test_get_backend_instance(self):
+        backend = PythonMergeBackend()
+        assert get_backend(backend) is backend
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            get_backend("diff3")
+
+    def test_conflict_markers(self):
+        merged, num_conflicts = PythonMergeBackend().merge("a\nb\nc\n", "a\nX\nc\n", "a\nY\nc\n")
+
+        assert num_conflicts == 1
+        assert merged == (
+            "a\n<<<<<<< left\nX\n||||||| base\nb\n=======\nY\n>>>>>>> right\nc\n"
+        )
+
+    @requires_git
+    def test_auto_uses_git_for_large_input(self):
+        calls = []
+
+        class RecordingBackend(GitMergeFileBackend):
+            def merge(self, *args, **kwargs):
+                calls.append(args)
+                return super().merge(*args, **kwargs)
+
+        backend = AutoMergeBackend(fallback=RecordingBackend(), max_records=10)
+        backend.merge("a\nb\n", "a\nc\n", "a\nb\n")
+        assert calls == []
+
+        big = "line\n" * 20
+        backend.merge(big, big + "left\n", big)
+        assert len(calls) == 1
+
+    @requires_git
+    def test_csdiff_backends_agree(self):
+        base = "function foo() { return 1; }\nconst a = [1, 2];\n"
+        left = "function foo() { return 2; }\nconst a = [1, 2, 3];\n"
+        right = "function foo() { return 3; }\nconst a = [0, 1, 2];\n"
+
+        results = {
+            name: CSDiffWeb(".ts", skip_filter=True, backend=name).merge(base, left, right)
+            for name in ("python", "git")
+        }
+        assert results["python"] == results["git"]
+
+
+class TestBatchSecondPass:
+    """O segundo passo em lote deve ser idêntico ao caminho bloco a bloco."""
+
+    @pytest.mark.parametrize("triplet_dir,extension", _stored_triplets())
+    def test_batched_matches_per_block(self, triplet_dir, extension):
+        base, left, right = (
+            (triplet_dir / f"{name}{extension}").read_text(encoding="utf-8")
+            for name in ("base", "left", "right")
+        )
+        filename = f"merged{extension}"
+
+        batched = CSDiffWeb(extension, batch_blocks=True).merge(base, left, right, filename)
+        per_block = CSDiffWeb(extension, batch_blocks=False).merge(base, left, right, filename)
+
+        assert batched == per_block
+
+    @requires_git
+    def test_git_concatenated_batch(self):
+        merges = [
+            ("a\nb\nc\n", "a\nX\nc\n", "a\nY\nc\n"),
+            ("x\ny\n", "x\ny\nz\n", "x\ny\n"),
+            ("", "", ""),
+            ("1\n2\n3\n", "1\n2\n", "0\n1\n2\n3\n"),
+        ]
+        backend = GitMergeFileBackend(concatenate=True)
+        expected = [GitMergeFileBackend().merge(*m) for m in merges]
+
+        assert backend.merge_batch(merges) == expected
+
+    @requires_git
+    def test_git_batch_falls_back_without_trailing_newline(self):
+        merges = [("a\nb", "a\nc", "a\nd"), ("a\n", "b\n", "a\n")]
+        backend = GitMergeFileBackend(concatenate=True)
+        expected = [backend.merge(*m) for m in merges]
+
+        assert backend.merge_batch(merges) == expected
+
+    def test_auto_batch_delegates_large_merges(self):
+        calls = []
+
+        class RecordingBackend(GitMergeFileBackend):
+            def merge_batch(self, merges, labels=("left", "base", "right")):
+                calls.append(len(merges))
+                return [("", 0)] * len(merges)
+
+        backend = AutoMergeBackend(fallback=RecordingBackend(), max_records=10)
+        small = ("a\n", "b\n", "a\n")
+        large = ("x\n" * 10, "y\n" * 10, "x\n" * 10)
+
+        results = backend.merge_batch([small, large, small, large])
+
+        assert calls == [2]
+        assert results[0] == ("b\n", 0)
+        assert results[1] == ("", 0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
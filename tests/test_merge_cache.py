@@ -0,0 +1,193 @@
+"""
+Testes do cache de resultados de merge (memória LRU + SQLite).
+"""
+
+import pytest
+
+from src.core.csdiff_web import CSDiffWeb
+from src.core.merge_cache import MergeCache, get_block_cache, make_key
+
+BASE = "function foo() {\n  return 1;\n}\n\nconst a = [1, 2];\n"
+LEFT = "function foo() {\n  return 2;\n}\n\nconst a = [1, 2];\n"
+RIGHT = "function foo() {\n  return 3;\n}\n\nconst a = [1, 2, 3];\n"
+
+
+class TestMakeKey:
+    def test_deterministic(self):
+        assert make_key("b", "l", "r", ".ts") == make_key("b", "l", "r", ".ts")
+
+    @pytest.mark.parametrize("other", [
+        ("l", "b", "r", ".ts"),
+        ("b", "l", "r", ".tsx"),
+        ("b", "l", "r", ".ts", "raw"),
+        ("bl", "", "r", ".ts"),
+    ])
+    def test_sensitive_to_every_part(self, other):
+        assert make_key("b", "l", "r", ".ts") != make_key(*other)
+
+
+class TestMemoryTier:
+    def test_hit_and_miss_counters(self):
+        cache = MergeCache()
+        assert cache.get("k") is None
+        cache.put("k", ("x", False, 0))
+
+        assert cache.get("k") == ("x", False, 0)
+        stats = cache.get_statistics()
+        assert (stats['misses'], stats['memory_hits'], stats['stores']) == (1, 1, 1)
+        assert stats['hit_rate'] == 50.0
+
+    def test_lru_eviction(self):
+        cache = MergeCache(max_entries=2)
+        cache.put("a", ("a",))
+        cache.put("b", ("b",))
+        cache.get("a")
+        cache.put("c", ("c",))
+
+        assert cache.get("b") is None
+        assert cache.get("a") == ("a",)
+        assert cache.stats['memory_evictions'] == 1
+
+
+class TestDiskTier:
+    def test_persists_across_instances(self, tmp_path):
+        first = MergeCache(cache_dir=tmp_path)
+        first.put("k", ("merged\n", True, 2))
+        first.close()
+
+        second = MergeCache(cache_dir=tmp_path)
+        assert second.get("k") == ("merged\n", True, 2)
+        assert second.stats['disk_hits'] == 1
+        # Segunda leitura já vem da memória
+        assert second.get("k") == ("merged\n", True, 2)
+        assert second.stats['memory_hits'] == 1
+
+    def test_size_based_eviction(self, tmp_path):
+        cache = MergeCache(max_entries=1, cache_dir=tmp_path, max_disk_bytes=100)
+        for key in ("a", "b", "c"):
+            cache.put(key, ("x" * 30,))
+
+        assert len(cache) == 2
+        assert cache.stats['disk_evictions'] == 1
+        assert cache.get("a") is None
+        assert cache.get("c") == ("x" * 30,)
+
+    def test_disk_size_counted_without_summing_each_put(self, tmp_path):
+        cache = MergeCache(cache_dir=tmp_path, max_disk_bytes=1000)
+        sums = []
+        cache._db.set_trace_callback(lambda sql: sums.append(sql) if "SUM(size)" in sql else None)
+        for key in ("a", "b", "a"):
+            cache.put(key, ("x" * 30,))
+
+        assert sums == []
+        assert cache._disk_bytes == cache._disk_size() == 2 * len('["' + "x" * 30 + '"]')
+
+
+class TestCSDiffWebCache:
+    def test_cached_result_matches_uncached(self, tmp_path):
+        expected = CSDiffWeb(".ts").merge(BASE, LEFT, RIGHT, "foo.ts")
+        cache = MergeCache(cache_dir=tmp_path)
+
+        first = CSDiffWeb(".ts", cache=cache).merge(BASE, LEFT, RIGHT, "foo.ts")
+        second = CSDiffWeb(".ts", cache=cache).merge(BASE, LEFT, RIGHT, "bar.ts")
+
+        assert first == second == expected
+        assert cache.stats['misses'] == 1
+        assert cache.stats['memory_hits'] == 1
+
+    def test_filter_decision_is_part_of_key(self):
+        cache = MergeCache()
+        CSDiffWeb(".js", cache=cache).merge(BASE, LEFT, RIGHT, "app.js")
+        CSDiffWeb(".js", cache=cache).merge(BASE, LEFT, RIGHT, "app.min.js")
+
+        assert cache.stats['misses'] == 2
+
+    def test_explode_mode_is_part_of_key(self):
+        cache = MergeCache()
+        CSDiffWeb(".tsx", cache=cache).merge(BASE, LEFT, RIGHT)
+        CSDiffWeb(".tsx", cache=cache, explode_mode="single").merge(BASE, LEFT, RIGHT)
+
+        assert cache.stats['misses'] == 2
+
+    def test_backend_and_batch_mode_are_part_of_key(self):
+        cache = MergeCache()
+        CSDiffWeb(".ts", cache=cache, backend="python").merge(BASE, LEFT, RIGHT)
+        CSDiffWeb(".ts", cache=cache, backend="git").merge(BASE, LEFT, RIGHT)
+        CSDiffWeb(".ts", cache=cache, backend="python", batch_blocks=False).merge(BASE, LEFT, RIGHT)
+        CSDiffWeb(".ts", cache=cache, backend="python").merge(BASE, LEFT, RIGHT)
+
+        assert cache.stats['misses'] == 3
+        assert cache.stats['memory_hits'] == 1
+
+
+# Dois conflitos idênticos no mesmo arquivo (mesma lista de imports)
+IMPORTS_BASE = "import { a } from 'x';\n"
+IMPORTS_LEFT = "import { a, b } from 'x';\n"
+IMPORTS_RIGHT = "import { a, c } from 'x';\n"
+BLOCK_BASE = IMPORTS_BASE + "\nconst k = 1;\n\n" + IMPORTS_BASE
+BLOCK_LEFT = IMPORTS_LEFT + "\nconst k = 1;\n\n" + IMPORTS_LEFT
+BLOCK_RIGHT = IMPORTS_RIGHT + "\nconst k = 1;\n\n" + IMPORTS_RIGHT
+
+
+class TestBlockCache:
+    @pytest.mark.parametrize("batch_blocks", [True, False])
+    def test_memoized_result_matches_unmemoized(self, batch_blocks):
+        expected = CSDiffWeb(".ts", memoize_blocks=False, batch_blocks=batch_blocks).merge(
+            BLOCK_BASE, BLOCK_LEFT, BLOCK_RIGHT
+        )
+        cache = MergeCache()
+        csdiff = CSDiffWeb(".ts", block_cache=cache, batch_blocks=batch_blocks)
+
+        assert csdiff.merge(BLOCK_BASE, BLOCK_LEFT, BLOCK_RIGHT) == expected
+        assert csdiff.merge(BLOCK_BASE, BLOCK_LEFT, BLOCK_RIGHT) == expected
+
+    def test_repeated_blocks_computed_once(self):
+        cache = MergeCache()
+        CSDiffWeb(".ts", block_cache=cache).merge(BLOCK_BASE, BLOCK_LEFT, BLOCK_RIGHT)
+        assert cache.stats['stores'] == 1
+
+        # Outro arquivo, outra instância: o bloco vem do memo
+        CSDiffWeb(".ts", skip_filter=True, block_cache=cache).merge(
+            IMPORTS_BASE, IMPORTS_LEFT, IMPORTS_RIGHT
+        )
+        assert cache.stats['stores'] == 1
+        assert cache.stats['memory_hits'] == 1
+
+    @pytest.mark.parametrize("batch_blocks", [True, False])
+    def test_block_hits_counted_per_instance(self, batch_blocks):
+        cache = MergeCache()
+        first = CSDiffWeb(".ts", skip_filter=True, block_cache=cache, batch_blocks=batch_blocks)
+        first.merge(IMPORTS_BASE, IMPORTS_LEFT, IMPORTS_RIGHT)
+        assert first.block_hits == 0
+
+        # Os dois blocos do arquivo já estão no memo
+        second = CSDiffWeb(".ts", block_cache=cache, batch_blocks=batch_blocks)
+        second.merge(BLOCK_BASE, BLOCK_LEFT, BLOCK_RIGHT)
+        assert second.block_hits == 2
+
+    def test_executor_reports_block_hits(self):
+        from src.runner.tool_executor import ToolExecutor
+
+        executor = ToolExecutor(merge_cache=MergeCache(), block_cache=MergeCache())
+        first = executor.execute_csdiff_web(BLOCK_BASE, BLOCK_LEFT, BLOCK_RIGHT, ".ts")
+        again = executor.execute_csdiff_web(BLOCK_BASE, BLOCK_LEFT, BLOCK_RIGHT, ".ts")
+        other = executor.execute_csdiff_web(
+            BLOCK_BASE + "\n", BLOCK_LEFT + "\n", BLOCK_RIGHT + "\n", ".ts"
+        )
+
+        assert (first['cached'], again['cached'], other['cached']) == (False, True, False)
+        # Merge inteiro do cache: nenhum bloco consultado
+        assert again['block_hits'] == 0
+        assert other['block_hits'] == 2
+
+    def test_shared_process_cache_by_default(self):
+        assert CSDiffWeb(".ts").block_cache is get_block_cache()
+        assert CSDiffWeb(".ts", memoize_blocks=False).block_cache is None
+
+    def test_statistics_exposed(self):
+        cache = MergeCache()
+        csdiff = CSDiffWeb(".ts", block_cache=cache)
+        csdiff.merge(BLOCK_BASE, BLOCK_LEFT, BLOCK_RIGHT)
+
+        stats = csdiff.get_statistics(BLOCK_BASE, BLOCK_LEFT, BLOCK_RIGHT)
+        assert stats['block_cache']['stores'] == 1
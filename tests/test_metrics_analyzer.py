@@ -0,0 +1,119 @@
+"""
+Testes da classificação vetorizada do MetricsAnalyzer.
+
+Os resultados devem ser idênticos aos do ComparisonClassifier aplicado
+linha a linha (implementação original com iterrows).
+"""
+
+import random
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from src.analyzer.comparison_classifier import ComparisonClassifier
+from src.analyzer.metrics_analyzer import MetricsAnalyzer
+from src.runner.result_collector import ResultCollector
+
+TOOLS = ['csdiff-web', 'mergiraf', 'slow-diff3']
+
+
+def _random_tool_result(rng, expected):
+    kind = rng.choice(['correct', 'padded', 'wrong', 'conflict', 'error', 'failed', 'empty'])
+    if kind == 'error':
+        return {'success': False, 'execution_time': 0.1, 'error': 'boom'}
+    if kind == 'failed':
+        return {'success': False, 'execution_time': 0.1}
+    if kind == 'empty':
+        return {'success': True, 'has_conflict': False, 'num_conflicts': 0, 'result': ''}
+    output = {
+        'correct': expected,
+        'padded': "\n  " + expected + "  \n",
+        'wrong': expected + "x",
+        'conflict': "<<<<<<< left\n" + expected,
+    }[kind]
+    return {
+        'success': True,
+        'has_conflict': kind == 'conflict',
+        'num_conflicts': int(kind == 'conflict'),
+        'result': output,
+        'execution_time': 0.2
+    }
+
+
+@pytest.fixture(scope='module')
+def analyzer(tmp_path_factory):
+    rng = random.Random(7)
+    collector = ResultCollector(output_dir=tmp_path_factory.mktemp('results'))
+    for i in range(300):
+        expected = rng.choice(["a\n", "b\nc\n", ""])
+        tool_results = {tool: _random_tool_result(rng, expected) for tool in TOOLS}
+        merged = rng.choice([expected, None])
+        collector.add_result(f"triplet_{i:03d}", {}, tool_results, merged)
+    return MetricsAnalyzer(collector.generate_csv())
+
+
+def _rowwise_individual(df, tools):
+    classifier = ComparisonClassifier()
+    for tool in tools:
+        output_col, conflict_col, error_col = f'{tool}_output', f'{tool}_has_conflict', f'{tool}_error'
+        for _, row in df.iterrows():
+            error_msg = str(row[error_col]) if pd.notna(row[error_col]) else None
+            if row.get(f'{tool}_success') is False:
+                error_msg = error_msg or "Execution Failed"
+            classifier.classify_tool_result(
+                tool_name=tool.replace('_', '-'),
+                output=str(row[output_col]) if pd.notna(row[output_col]) else "",
+                has_conflict=bool(row[conflict_col]) if pd.notna(row[conflict_col]) else False,
+                repo_expected=str(row['repo_merged_content']) if pd.notna(row['repo_merged_content']) else "",
+                error=error_msg
+            )
+    return classifier.get_tool_statistics()
+
+
+def _rowwise_pairs(df, tools):
+    results = {}
+    classifier = ComparisonClassifier()
+    for f1 in tools:
+        for f2 in tools:
+            if f1 == f2:
+                continue
+            classifier.reset_statistics()
+            for _, row in df.iterrows():
+                classifier.classify_pair_result(
+                    f1_output=str(row[f'{f1}_output']) if pd.notna(row[f'{f1}_output']) else "",
+                    f2_output=str(row[f'{f2}_output']) if pd.notna(row[f'{f2}_output']) else "",
+                    repo_expected=str(row['repo_merged_content']) if pd.notna(row['repo_merged_content']) else "",
+                    f1_has_conflict=bool(row[f'{f1}_has_conflict']),
+                    f2_has_conflict=bool(row[f'{f2}_has_conflict'])
+                )
+            results[f"{f1.replace('_', '-')}_vs_{f2.replace('_', '-')}"] = classifier.pair_stats.copy()
+    return results
+
+
+class TestVectorizedClassification:
+    def test_individual_matches_classifier(self, analyzer):
+        full = pd.read_csv(analyzer.csv_path)
+        assert analyzer.analyze_individual_performance() == _rowwise_individual(full, analyzer.tools)
+
+    def test_pairs_match_classifier(self, analyzer):
+        full = pd.read_csv(analyzer.csv_path)
+        assert analyzer.compare_all_pairs() == _rowwise_pairs(full, analyzer.tools)
+
+    def test_digests_avoid_loading_texts(self, analyzer):
+        analyzer.compare_all_pairs()
+        assert 'repo_merged_content' not in analyzer.df.columns
+        assert 'csdiff_web_output' not in analyzer.df.columns
+
+    def test_text_fallback_without_digests(self, analyzer, tmp_path):
+        full = pd.read_csv(analyzer.csv_path)
+        legacy_csv = tmp_path / "legacy.csv"
+        full.drop(columns=[c for c in full.columns if c.endswith('_norm_sha')]).to_csv(legacy_csv, index=False)
+
+        legacy = MetricsAnalyzer(legacy_csv)
+        assert legacy.analyze_individual_performance() == analyzer.analyze_individual_performance()
+        assert legacy.compare_all_pairs() == analyzer.compare_all_pairs()
+
+    def test_all_categories_present(self, analyzer):
+        stats = analyzer.analyze_individual_performance()['csdiff-web']
+        assert all(stats[key] > 0 for key in ('clean_correct', 'clean_incorrect', 'conflict', 'failure'))
@@ -0,0 +1,575 @@
+"""
+Testes de mineração sobre repositórios Git locais (sem rede).
+
+Cada repositório de teste tem merges reais em que os dois lados alteram o
+mesmo arquivo .ts, de modo que cada merge gera uma tripla.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Adicionar src/ ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from git import Repo
+
+from src.miner.blob_reader import GitBlobReader
+from src.miner.commit_filter import CommitFilter, MergeRecord, iter_merge_records
+from src.miner.github_miner import GitHubMiner
+from src.miner.merge_base import MergeBaseCache, MergeBaseError, MergeBaseService
+from src.miner.mining_ledger import MiningLedger
+from src.miner.triplet_index import TripletIndex
+from src.miner.triplet_metadata import read_metadata
+from src.miner.triplet_pack import TripletPackReader
+from src.miner.triplet_store import TripletStore
+from src.miner.triplet_extractor import TripletExtractor
+
+
+def _git(repo: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", "-C", str(repo), *args],
+        check=True, capture_output=True, text=True
+    )
+    return result.stdout.strip()
+
+
+def make_merge_repo(path: Path, n_merges: int) -> Path:
+    """Cria repositório com `n_merges` merges que alteram app.ts nos dois lados."""
+    path.mkdir(parents=True)
+    _git(path, "init", "-q", "-b", "main")
+    _git(path, "config", "user.email", "test@example.com")
+    _git(path, "config", "user.name", "Test")
+
+    lines = [f"const v{i} = {i};" for i in range(10)]
+    (path / "app.ts").write_text("\n".join(lines) + "\n")
+    (path / "README.md").write_text("readme\n")
+    _git(path, "add", ".")
+    _git(path, "commit", "-q", "-m", "base")
+
+    return add_merges(path, 0, n_merges)
+
+
+def add_merges(path: Path, start: int, n_merges: int) -> Path:
+    """Acrescenta merges `start`..`start + n_merges - 1` ao branch main."""
+    for n in range(start, start + n_merges):
+        lines = (path / "app.ts").read_text().splitlines()
+
+        _git(path, "checkout", "-q", "-b", f"feature{n}")
+        lines[0] = f"const v0 = 'feature{n}';"
+        (path / "app.ts").write_text("\n".join(lines) + "\n")
+        _git(path, "commit", "-q", "-am", f"feature {n}")
+
+        _git(path, "checkout", "-q", "main")
+        lines = (path / "app.ts").read_text().splitlines()
+        lines[9] = f"const v9 = 'main{n}';"
+        (path / "app.ts").write_text("\n".join(lines) + "\n")
+        _git(path, "commit", "-q", "-am", f"main {n}")
+
+        # Resultado do merge: versão de main (-s ours)
+        _git(path, "merge", "-q", "--no-ff", "-s", "ours", f"feature{n}", "-m", f"merge {n}")
+
+    return path
+
+
+@pytest.fixture
+def repo_list(tmp_path):
+    """Quatro repositórios locais com 3 merges cada."""
+    repos = []
+    for i in range(4):
+        origin = make_merge_repo(tmp_path / "origins" / f"repo{i}", n_merges=3)
+        repos.append({'url': str(origin), 'name': f"repo{i}"})
+    return repos
+
+
+def _saved_ids(triplets_dir: Path):
+    return sorted(int(d.name.split('_')[1]) for d in triplets_dir.glob("triplet_*"))
+
+
+class TestParallelMining:
+    """Mineração concorrente de vários repositórios."""
+
+    def test_serial_mining(self, tmp_path, repo_list):
+        miner = GitHubMiner(tmp_path / "repos", tmp_path / "triplets", target_triplets=100)
+        triplets = miner.mine_repositories(repo_list)
+
+        assert len(triplets) == 12
+        assert _saved_ids(tmp_path / "triplets") == list(range(1, 13))
+        stats = miner.get_statistics()
+        assert stats['repos_processed'] == 4
+        assert stats['valid_merges'] == 12
+        assert stats['total_triplets'] == 12
+        # Metadados estruturados com o repositório de origem
+        repos = {read_metadata(path)['repo'] for path in (tmp_path / "triplets").glob("triplet_*")}
+        assert repos == {info['name'] for info in repo_list}
+        # Índice de características preenchido na extração
+        index = TripletIndex(tmp_path / "triplets" / "index.sqlite3")
+        rows = index.query()
+        assert [row['name'] for row in rows] == [f"triplet_{n:03d}" for n in range(1, 13)]
+        assert {row['repo'] for row in rows} == repos
+        assert all(row['diff3_conflicts'] is not None for row in rows)
+        index.close()
+        # Índice do minerador fechado ao fim da mineração
+        assert miner.triplet_index is None
+
+    def test_parallel_matches_serial(self, tmp_path, repo_list):
+        miner = GitHubMiner(tmp_path / "repos", tmp_path / "triplets",
+                            target_triplets=100, workers=4)
+        triplets = miner.mine_repositories(repo_list)
+
+        assert len(triplets) == 12
+        # IDs contíguos e sem colisão entre workers
+        assert _saved_ids(tmp_path / "triplets") == list(range(1, 13))
+        stats = miner.get_statistics()
+        assert stats['repos_processed'] == 4
+        assert stats['repos_failed'] == 0
+        assert stats['total_merges'] == 12
+        assert stats['valid_merges'] == 12
+        assert stats['total_triplets'] == 12
+
+    def test_parallel_respects_global_budget(self, tmp_path, repo_list):
+        miner = GitHubMiner(tmp_path / "repos", tmp_path / "triplets",
+                            target_triplets=100, workers=3)
+        triplets = miner.mine_repositories(repo_list, max_triplets=5)
+
+        assert len(triplets) == 5
+        assert _saved_ids(tmp_path / "triplets") == [1, 2, 3, 4, 5]
+        assert miner.get_statistics()['total_triplets'] == 5
+
+    def test_budget_reserved_per_merge(self, tmp_path, repo_list, monkeypatch):
+        calls = []
+        extract = TripletExtractor.extract_triplet
+
+        def counting_extract(self, *args, **kwargs):
+            calls.append(1)
+            return extract(self, *args, **kwargs)
+
+        monkeypatch.setattr(TripletExtractor, 'extract_triplet', counting_extract)
+        miner = GitHubMiner(tmp_path / "repos", tmp_path / "triplets",
+                            target_triplets=100, workers=3)
+        miner.mine_repositories(repo_list, max_triplets=4)
+
+        # Cada merge gera uma tripla: além das 4 da meta, no máximo um
+        # merge em andamento por worker é extraído e descartado
+        assert len(calls) <= 4 + 3
+        assert miner.get_statistics()['total_triplets'] == 4
+
+    def test_failed_repo_is_counted(self, tmp_path, repo_list):
+        repo_list.append({'url': str(tmp_path / "missing"), 'name': "missing"})
+        miner = GitHubMiner(tmp_path / "repos", tmp_path / "triplets",
+                            target_triplets=100, workers=2)
+        triplets = miner.mine_repositories(repo_list)
+
+        assert len(triplets) == 12
+        stats = miner.get_statistics()
+        assert stats['repos_failed'] == 1
+        assert stats['repos_processed'] == 4
+
+
+class TestBlobReader:
+    """Leitura de blobs pelo `git cat-file` persistente."""
+
+    def test_read_matches_gitpython(self, tmp_path):
+        repo = Repo(make_merge_repo(tmp_path / "repo", n_merges=2))
+        extractor = TripletExtractor(tmp_path / "triplets")
+
+        for commit in repo.iter_commits('--all'):
+            for filepath in ("app.ts", "README.md", "missing.ts"):
+                batched = extractor.extract_file_contents(repo, [commit], filepath)[0]
+                assert batched == extractor.extract_file_content(commit, filepath)
+
+        extractor.close()
+
+    def test_identical_blobs_are_read_once(self, tmp_path):
+        repo = Repo(make_merge_repo(tmp_path / "repo", n_merges=1))
+        head = repo.head.commit
+        left = head.parents[0]
+
+        with GitBlobReader(tmp_path / "repo") as reader:
+            # merged == left (-s ours) e o README é igual em todos os commits
+            contents = reader.read([
+                f"{left.hexsha}:app.ts", f"{head.hexsha}:app.ts",
+                f"{left.hexsha}:README.md", f"{head.hexsha}:README.md",
+                f"{head.hexsha}:missing.ts",
+            ])
+            stats = reader.get_statistics()
+
+        assert contents[0] == contents[1]
+        assert contents[2] == contents[3] == b"readme\n"
+        assert contents[4] is None
+        assert stats['blobs_read'] == 2
+        assert stats['blob_reuses'] == 2
+        assert stats['missing'] == 1
+
+    def test_extract_triplet_contents(self, tmp_path):
+        repo = Repo(make_merge_repo(tmp_path / "repo", n_merges=1))
+        merges = CommitFilter().filter_merge_commits(repo, list(repo.iter_commits(merges=True)))
+        extractor = TripletExtractor(tmp_path / "triplets")
+
+        triplets = extractor.extract_triplet(repo, merges[0])
+        extractor.close()
+
+        assert [t['filepath'] for t in triplets] == ["app.ts"]
+        triplet = triplets[0]
+        assert "'feature0'" in triplet['right_content']
+        assert "'main0'" in triplet['left_content']
+        assert triplet['merged_content'] == triplet['left_content']
+        assert triplet['base_content'].startswith("const v0 = 0;")
+
+
+class TestModifiedEntries:
+    """Detecção de arquivos modificados por `git diff-tree --raw`."""
+
+    def test_matches_gitpython_diff(self, tmp_path):
+        repo = Repo(make_merge_repo(tmp_path / "repo", n_merges=2))
+        extractor = TripletExtractor(tmp_path / "triplets")
+
+        commits = list(repo.iter_commits('--all'))
+        for a in commits:
+            for b in commits:
+                expected = set()
+                for diff in a.diff(b):
+                    expected.update(p for p in (diff.a_path, diff.b_path) if p)
+                assert extractor.get_modified_files(repo, a, b) == expected
+
+    def test_blob_shas_and_rejections(self, tmp_path):
+        path = make_merge_repo(tmp_path / "repo", n_merges=0)
+        (path / "gone.ts").write_text("let a = 1;\n")
+        _git(path, "add", ".")
+        _git(path, "commit", "-q", "-m", "more files")
+
+        _git(path, "checkout", "-q", "-b", "feature")
+        (path / "app.ts").write_text("feature\n")
+        (path / "README.md").write_text("feature\n")
+        (path / "gone.ts").write_text("let a = 2;\n")
+        _git(path, "commit", "-q", "-am", "feature")
+
+        _git(path, "checkout", "-q", "main")
+        (path / "app.ts").write_text("main\n")
+        (path / "README.md").write_text("main\n")
+        _git(path, "rm", "-q", "gone.ts")
+        _git(path, "commit", "-q", "-am", "main")
+        _git(path, "merge", "-q", "--no-ff", "-s", "ours", "feature", "-m", "merge")
+
+        repo = Repo(path)
+        merges = CommitFilter().filter_merge_commits(repo, list(repo.iter_commits(merges=True)))
+        extractor = TripletExtractor(tmp_path / "triplets")
+        triplets = extractor.extract_triplet(repo, merges[0])
+        extractor.close()
+
+        assert [t['filepath'] for t in triplets] == ["app.ts"]
+        stats = extractor.get_statistics()
+        assert stats['total_files'] == 3
+        assert stats['unsupported_extension'] == 1
+        assert stats['file_not_in_all_versions'] == 1
+
+        triplet = triplets[0]
+        head = repo.head.commit
+        assert triplet['blob_shas']['merged'] == (head.tree / "app.ts").hexsha
+        assert triplet['blob_shas']['right'] == (head.parents[1].tree / "app.ts").hexsha
+        assert triplet['right_content'] == "feature\n"
+        assert triplet['merged_content'] == triplet['left_content'] == "main\n"
+
+
+class TestMergeRecords:
+    """Enumeração de merges por um único `git rev-list --merges --parents`."""
+
+    def test_matches_iter_commits(self, tmp_path):
+        repo = Repo(make_merge_repo(tmp_path / "repo", n_merges=3))
+
+        records = list(iter_merge_records(repo, max_count=2))
+        expected = [
+            MergeRecord(c.hexsha, tuple(p.hexsha for p in c.parents))
+            for c in repo.iter_commits('--all', merges=True, max_count=2)
+        ]
+        assert records == expected
+
+    def test_filter_records_matches_filter_commits(self, tmp_path):
+        repo = Repo(make_merge_repo(tmp_path / "repo", n_merges=3))
+
+        by_records = CommitFilter()
+        lazy = list(by_records.filter_merge_records(repo, iter_merge_records(repo)))
+        by_commits = CommitFilter()
+        eager = by_commits.filter_merge_commits(repo, list(repo.iter_commits('--all', merges=True)))
+
+        def shas(merges):
+            return [{k: c.hexsha for k, c in m.items()} for m in merges]
+
+        assert shas(lazy) == shas(eager)
+        assert by_records.get_statistics() == by_commits.get_statistics()
+        assert by_records.get_statistics()['valid_merges'] == 3
+
+    def test_fast_forward_and_octopus_are_rejected(self):
+        class FakeGit:
+            def merge_base(self, left, right, with_exceptions=False):
+                return {"l1": "l1", "l2": "b2"}[left]
+
+        class FakeRepo:
+            git = FakeGit()
+
+        commit_filter = CommitFilter()
+        merges = list(commit_filter.filter_merge_records(FakeRepo(), [
+            MergeRecord("m1", ("l1", "r1")),        # base == left
+            MergeRecord("m2", ("l2", "r2", "x")),   # octopus
+        ]))
+
+        assert merges == []
+        stats = commit_filter.get_statistics()
+        assert stats['fast_forwards'] == 1
+        assert stats['invalid_parent_count'] == 1
+
+    def test_merge_base_error_is_not_a_rejection(self, tmp_path):
+        repo = Repo(make_merge_repo(tmp_path / "repo", n_merges=1))
+        merge = next(iter_merge_records(repo))
+        rejected = []
+
+        for merge_bases in (None, MergeBaseService(repo)):
+            commit_filter = CommitFilter(merge_bases=merge_bases, on_reject=lambda *args: rejected.append(args))
+            merges = list(commit_filter.filter_merge_records(repo, [
+                MergeRecord("m1", ("f" * 40, merge.parents[1])),   # objeto ausente
+                merge,
+            ]))
+
+            assert [m['commit'].hexsha for m in merges] == [merge.sha]
+            stats = commit_filter.get_statistics()
+            assert stats['merge_base_errors'] == 1
+            assert stats['no_merge_base'] == 0
+        assert rejected == []
+
+    def test_stops_rev_list_when_consumer_stops(self, tmp_path):
+        repo = Repo(make_merge_repo(tmp_path / "repo", n_merges=3))
+
+        records = iter_merge_records(repo)
+        first = next(records)
+        records.close()
+
+        assert len(first.parents) == 2
+
+
+def make_criss_cross_repo(path: Path) -> Path:
+    """Repositório com merges cruzados (duas bases candidatas) e uma raiz órfã."""
+    path.mkdir(parents=True)
+    _git(path, "init", "-q", "-b", "main")
+    _git(path, "config", "user.email", "test@example.com")
+    _git(path, "config", "user.name", "Test")
+
+    def commit(name):
+        (path / f"{name}.ts").write_text(f"// {name}\n")
+        _git(path, "add", ".")
+        _git(path, "commit", "-q", "-m", name)
+
+    commit("base")
+    _git(path, "checkout", "-q", "-b", "other")
+    commit("b1")
+    _git(path, "checkout", "-q", "main")
+    commit("a1")
+    # Cruzamento: cada lado incorpora o outro
+    _git(path, "merge", "-q", "--no-ff", "other", "-m", "m1")
+    _git(path, "checkout", "-q", "other")
+    _git(path, "merge", "-q", "--no-ff", "main~1", "-m", "m2")
+    commit("b2")
+    _git(path, "checkout", "-q", "main")
+    commit("a2")
+    _git(path, "merge", "-q", "--no-ff", "other", "-m", "m3")
+
+    _git(path, "checkout", "-q", "--orphan", "orphan")
+    commit("orphan")
+    _git(path, "checkout", "-q", "main")
+    return path
+
+
+class TestMergeBaseService:
+    """Merge bases pelo grafo local, em lote e com cache persistente."""
+
+    def test_graph_matches_git(self, tmp_path):
+        for repo_path in (make_merge_repo(tmp_path / "simple", n_merges=3),
+                          make_criss_cross_repo(tmp_path / "criss")):
+            repo = Repo(repo_path)
+            shas = [c.hexsha for c in repo.iter_commits('--all')]
+            pairs = [(a, b) for a in shas for b in shas]
+
+            service = MergeBaseService(repo, graph_threshold=0)
+            bases = service.merge_bases(pairs)
+
+            for left, right in pairs:
+                output = repo.git.merge_base(left, right, with_exceptions=False)
+                expected = output.split()[0] if output else None
+                assert bases[(left, right)] == expected
+
+            stats = service.get_statistics()
+            assert stats['graph_computed'] > 0
+            # Só pares criss-cross (base ambígua) vão para o git
+            assert stats['git_computed'] < len(pairs) // 4
+
+    def test_cache_persists_between_sessions(self, tmp_path):
+        repo = Repo(make_merge_repo(tmp_path / "repo", n_merges=3))
+        records = list(iter_merge_records(repo))
+        pairs = [r.parents for r in records]
+        db_path = tmp_path / "cache" / MergeBaseCache.DB_NAME
+
+        first = MergeBaseService(repo, cache=MergeBaseCache(db_path))
+        expected = first.merge_bases(pairs)
+        assert first.get_statistics()['cache_hits'] == 0
+
+        cache = MergeBaseCache(db_path)
+        second = MergeBaseService(repo, cache=cache)
+        assert second.merge_bases(pairs) == expected
+        stats = second.get_statistics()
+        assert stats['cache_hits'] == 3
+        assert stats['graph_computed'] + stats['git_computed'] == 0
+        assert len(cache) == 3
+
+    def test_errors_are_not_cached(self, tmp_path):
+        repo = Repo(make_criss_cross_repo(tmp_path / "repo"))
+        orphan, main = repo.git.rev_parse('orphan'), repo.git.rev_parse('main')
+        missing = "f" * 40
+        cache = MergeBaseCache(tmp_path / MergeBaseCache.DB_NAME)
+        service = MergeBaseService(repo, cache=cache)
+
+        bases = service.merge_bases([(orphan, main), (missing, main)])
+        # Sem ancestral comum é resultado (e vai para o cache); erro não
+        assert bases == {(orphan, main): None}
+        assert len(cache) == 1
+        assert service.get_statistics()['git_errors'] == 1
+        assert service.merge_base(orphan, main) is None
+        with pytest.raises(MergeBaseError):
+            service.merge_base(missing, main)
+
+    def test_remining_only_computes_new_merges(self, tmp_path, repo_list):
+        miner = GitHubMiner(tmp_path / "repos", tmp_path / "triplets", target_triplets=100)
+        miner.mine_repositories(repo_list[:1])
+        assert miner.get_statistics()['merge_bases_computed'] == 3
+
+        again = GitHubMiner(tmp_path / "repos", tmp_path / "triplets", target_triplets=100)
+        again.mine_repositories(repo_list[:1])
+        stats = again.get_statistics()
+        assert stats['merge_bases_cached'] == 3
+        assert stats['merge_bases_computed'] == 0
+
+
+class TestIncrementalMining:
+    """Mineração incremental com o diário por repositório."""
+
+    def _miner(self, tmp_path, **kwargs):
+        return GitHubMiner(tmp_path / "repos", tmp_path / "triplets",
+                           target_triplets=100, incremental=True, **kwargs)
+
+    def test_rerun_only_visits_new_merges(self, tmp_path):
+        origin = make_merge_repo(tmp_path / "origin", n_merges=3)
+        repos = [{'url': str(origin), 'name': "repo"}]
+
+        first = self._miner(tmp_path)
+        assert len(first.mine_repositories(repos)) == 3
+
+        # Nada novo: nenhum merge é listado
+        second = self._miner(tmp_path)
+        assert second.mine_repositories(repos) == []
+        assert second.get_statistics()['total_merges'] == 0
+
+        add_merges(origin, 3, 2)
+        third = self._miner(tmp_path)
+        triplets = third.mine_repositories(repos)
+
+        assert len(triplets) == 2
+        assert third.get_statistics()['total_merges'] == 2
+        # Numeração continua após as triplas existentes
+        assert _saved_ids(tmp_path / "triplets") == [1, 2, 3, 4, 5]
+
+        ledger = MiningLedger(tmp_path / "triplets", "repo")
+        assert len(ledger.processed) == 5
+        assert sorted(i for ids in ledger.triplet_ids.values() for i in ids) == [1, 2, 3, 4, 5]
+
+    def test_truncated_run_resumes_remaining_merges(self, tmp_path):
+        origin = make_merge_repo(tmp_path / "origin", n_merges=3)
+        repos = [{'url': str(origin), 'name': "repo"}]
+
+        first = self._miner(tmp_path)
+        assert len(first.mine_repositories(repos, max_triplets=2)) == 2
+
+        # Meta atingida: a marca d'água não avança, mas merges extraídos são pulados
+        ledger = MiningLedger(tmp_path / "triplets", "repo")
+        assert ledger.high_water == []
+        assert len(ledger.processed) == 2
+
+        second = self._miner(tmp_path)
+        triplets = second.mine_repositories(repos)
+        stats = second.get_statistics()
+
+        assert len(triplets) == 1
+        assert stats['merges_already_mined'] == 2
+        assert _saved_ids(tmp_path / "triplets") == [1, 2, 3]
+        assert MiningLedger(tmp_path / "triplets", "repo").high_water != []
+
+    def test_records_rejection_reasons(self, tmp_path):
+        path = make_merge_repo(tmp_path / "origin", n_merges=1)
+        # Merge sem alterações de um dos lados: fast-forward forçado com --no-ff
+        _git(path, "checkout", "-q", "-b", "ff")
+        (path / "other.ts").write_text("x\n")
+        _git(path, "add", ".")
+        _git(path, "commit", "-q", "-m", "ff")
+        _git(path, "checkout", "-q", "main")
+        _git(path, "merge", "-q", "--no-ff", "ff", "-m", "merge ff")
+
+        miner = self._miner(tmp_path)
+        miner.mine_repositories([{'url': str(path), 'name': "repo"}])
+
+        ledger = MiningLedger(tmp_path / "triplets", "repo")
+        assert list(ledger.rejections.values()) == ['fast_forwards']
+        assert len(ledger.triplet_ids) == 1
+
+        records = [json.loads(line) for line in ledger.path.read_text().splitlines()]
+        extracted = [r for r in records if r['type'] == 'extracted']
+        assert extracted[0]['files'] == {}
+        assert extracted[0]['triplets'] == [1]
+
+
+class TestStoreStorage:
+    """Mineração gravando no TripletStore."""
+
+    def test_mine_into_store(self, tmp_path, repo_list):
+        miner = GitHubMiner(tmp_path / "repos", tmp_path / "triplets",
+                            target_triplets=100, workers=2, storage='store')
+        triplets = miner.mine_repositories(repo_list[:2])
+
+        assert len(triplets) == 6
+        assert _saved_ids(tmp_path / "triplets") == []
+        # Os dois repositórios têm conteúdos idênticos: as triplas do
+        # segundo são duplicatas das do primeiro
+        store = TripletStore(tmp_path / "triplets" / "store")
+        assert len(store) == 3
+        assert miner.triplet_store.get_statistics()['duplicates'] == 3
+
+    def test_rerun_without_incremental_continues_ids(self, tmp_path, repo_list):
+        GitHubMiner(tmp_path / "repos", tmp_path / "triplets",
+                    target_triplets=100, storage='store').mine_repositories(repo_list[:1])
+        store = TripletStore(tmp_path / "triplets" / "store")
+        first = {i: store.get(i)['commit_sha'] for i in store.ids()}
+        assert sorted(first) == [1, 2, 3]
+
+        add_merges(Path(repo_list[0]['url']), 3, 2)
+        miner = GitHubMiner(tmp_path / "repos", tmp_path / "triplets",
+                            target_triplets=100, storage='store')
+        miner.mine_repositories(repo_list[:1])
+
+        store = TripletStore(tmp_path / "triplets" / "store")
+        # Duplicatas ficam com o ID existente: os novos IDs vêm depois de 3
+        ids = store.ids()
+        assert len(ids) == 5 and ids[:3] == [1, 2, 3] and min(ids[3:]) > 3
+        # Triplas antigas mantêm ID e conteúdo
+        assert {i: store.get(i)['commit_sha'] for i in first} == first
+        assert miner.triplet_store.get_statistics()['duplicates'] == 3
+
+    def test_mine_into_pack(self, tmp_path, repo_list):
+        miner = GitHubMiner(tmp_path / "repos", tmp_path / "triplets",
+                            target_triplets=100, workers=2, storage='pack')
+        triplets = miner.mine_repositories(repo_list[:2])
+
+        assert len(triplets) == 6
+        assert _saved_ids(tmp_path / "triplets") == []
+        with TripletPackReader(tmp_path / "triplets") as pack:
+            assert pack.ids() == [1, 2, 3, 4, 5, 6]
+            assert {pack.get(i)['commit_sha'] for i in pack.ids()} == \
+                {t['commit_sha'] for t in triplets}
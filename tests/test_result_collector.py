@@ -0,0 +1,152 @@
+"""
+Testes do coletor de resultados em streaming.
+"""
+
+import csv
+
+import pytest
+
+from src.core.blob_store import BlobStore, content_hash
+from src.runner.result_collector import CSV_FIELDNAMES, PARQUET_FIELDS, ResultCollector
+
+TOOL_RESULTS = [
+    {
+        'csdiff-web': {'success': True, 'num_conflicts': 2, 'execution_time': 0.5, 'result': 'a'},
+        'mergiraf': {'success': False, 'execution_time': 1.0, 'error': 'boom'},
+        'slow-diff3': {'success': True, 'num_conflicts': 0, 'execution_time': 2.0, 'result': 'b'},
+    },
+    {
+        'csdiff-web': {'success': True, 'num_conflicts': 4, 'execution_time': 1.5, 'result': 'c'},
+        'mergiraf': {'success': False, 'execution_time': 3.0, 'error': 'boom'},
+        'slow-diff3': {'success': False, 'error': 'No files'},
+    },
+]
+
+
+def _collect(tmp_path):
+    collector = ResultCollector(output_dir=tmp_path)
+    for i, tool_results in enumerate(TOOL_RESULTS):
+        collector.add_result(f"triplet_{i:03d}", {'extension': '.ts'}, tool_results, "merged")
+    return collector
+
+
+class TestStreamingCollector:
+    def test_rows_written_as_they_arrive(self, tmp_path):
+        collector = _collect(tmp_path)
+
+        # Antes de generate_csv as linhas já estão no disco
+        with open(collector.csv_path, encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        assert [row['triplet_id'] for row in rows] == ["triplet_000", "triplet_001"]
+        assert collector.results == []
+
+    def test_fixed_schema(self, tmp_path):
+        csv_path = _collect(tmp_path).generate_csv("out.csv")
+
+        assert csv_path == tmp_path / "out.csv"
+        with open(csv_path, encoding='utf-8') as f:
+            assert csv.DictReader(f).fieldnames == CSV_FIELDNAMES
+
+    def test_incremental_metrics(self, tmp_path):
+        metrics = _collect(tmp_path).calculate_metrics()
+
+        csdiff = metrics['csdiff-web']
+        assert (csdiff['total_executions'], csdiff['successful_executions']) == (2, 2)
+        assert (csdiff['total_conflicts'], csdiff['avg_conflicts']) == (6, 3.0)
+        assert (csdiff['min_conflicts'], csdiff['max_conflicts']) == (2, 4)
+        assert (csdiff['avg_time'], csdiff['min_time'], csdiff['max_time']) == (1.0, 0.5, 1.5)
+
+        mergiraf = metrics['mergiraf']
+        assert mergiraf['success_rate'] == 0
+        assert (mergiraf['total_errors'], mergiraf['unique_errors']) == (2, 1)
+
+        slow = metrics['slow-diff3']
+        assert (slow['failed_executions'], slow['max_time']) == (1, 2.0)
+
+    def test_cached_results_excluded_from_timing(self, tmp_path):
+        collector = _collect(tmp_path)
+        cached = {'success': True, 'num_conflicts': 0, 'execution_time': 0.001,
+                  'result': 'd', 'cached': True}
+        collector.add_result("triplet_002", {}, {'csdiff-web': cached}, "merged")
+
+        csdiff = collector.calculate_metrics()['csdiff-web']
+        # A tripla conta nas execuções, mas não nos tempos
+        assert csdiff['total_executions'] == 3
+        assert (csdiff['avg_time'], csdiff['min_time'], csdiff['max_time']) == (1.0, 0.5, 1.5)
+
+    def test_block_cache_hits_excluded_from_timing(self, tmp_path):
+        collector = _collect(tmp_path)
+        partial = {'success': True, 'num_conflicts': 0, 'execution_time': 0.01,
+                   'result': 'd', 'cached': False, 'block_hits': 2}
+        collector.add_result("triplet_002", {}, {'csdiff-web': partial}, "merged")
+
+        csdiff = collector.calculate_metrics()['csdiff-web']
+        assert csdiff['total_executions'] == 3
+        assert (csdiff['avg_time'], csdiff['min_time']) == (1.0, 0.5)
+        with open(collector.csv_path, encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        assert [row['csdiff_web_block_hits'] for row in rows] == ['', '', '2']
+
+    def test_no_results(self, tmp_path):
+        collector = ResultCollector(output_dir=tmp_path)
+
+        assert collector.calculate_metrics() == {}
+        assert not collector.generate_csv("empty.csv").exists()
+
+
+class TestBlobStore:
+    def test_put_is_content_addressed(self, tmp_path):
+        store = BlobStore(tmp_path)
+        digest = store.put("conteúdo\n")
+
+        assert digest == content_hash("conteúdo\n")
+        assert store.put("conteúdo\n") == digest
+        assert store.get(digest) == "conteúdo\n"
+        assert store.put(None) is None
+
+
+class TestParquetResults:
+    def test_compact_table_with_out_of_line_outputs(self, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        collector = ResultCollector(output_dir=tmp_path, results_format='parquet')
+        for i, tool_results in enumerate(TOOL_RESULTS):
+            collector.add_result(f"triplet_{i:03d}", {}, tool_results, "merged")
+        path = collector.generate_results("out.parquet")
+
+        table = pq.read_table(path)
+        assert table.column_names == PARQUET_FIELDS
+        assert str(table.schema.field('csdiff_web_num_conflicts').type) == 'int32'
+        assert not any(name.endswith('_output') for name in table.column_names)
+
+        shas = table.column('csdiff_web_output_sha').to_pylist()
+        assert [collector.blobs.get(sha) for sha in shas] == ['a', 'c']
+        assert collector.calculate_metrics() == _collect(tmp_path / 'csv').calculate_metrics()
+
+    def test_analyzer_reads_both_formats_alike(self, tmp_path):
+        pytest.importorskip("pyarrow")
+        from src.analyzer.metrics_analyzer import MetricsAnalyzer
+
+        paths = []
+        for fmt in ('csv', 'parquet'):
+            collector = ResultCollector(output_dir=tmp_path / fmt, results_format=fmt)
+            for i, tool_results in enumerate(TOOL_RESULTS):
+                collector.add_result(f"triplet_{i:03d}", {}, tool_results, "c")
+            paths.append(collector.generate_results())
+
+        csv_summary, parquet_summary = (MetricsAnalyzer(p).generate_summary_report() for p in paths)
+        assert parquet_summary == csv_summary
+
+    def test_analyzer_excludes_cached_times(self, tmp_path):
+        from src.analyzer.metrics_analyzer import MetricsAnalyzer
+
+        collector = ResultCollector(output_dir=tmp_path)
+        for i, tool_results in enumerate(TOOL_RESULTS):
+            collector.add_result(f"triplet_{i:03d}", {}, tool_results, "c")
+        cached = {'success': True, 'num_conflicts': 0, 'execution_time': 0.001,
+                  'result': 'd', 'cached': True}
+        collector.add_result("triplet_002", {}, {'csdiff-web': cached}, "c")
+        partial = dict(cached, cached=False, block_hits=1)
+        collector.add_result("triplet_003", {}, {'csdiff-web': partial}, "c")
+
+        times = MetricsAnalyzer(collector.generate_csv()).analyze_execution_time()
+        assert times['csdiff-web'] == {'mean': 1.0, 'min': 0.5, 'max': 1.5}
@@ -0,0 +1,73 @@
+"""
+Testes do worker persistente do slow-diff3 (requer Node).
+"""
+
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from src.runner.slow_diff3_worker import SlowDiff3Worker, SlowDiff3WorkerError
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="node não instalado")
+
+WORKER_JS = Path(__file__).resolve().parent.parent / "slow-diff3" / "src" / "worker.js"
+
+
+@pytest.fixture
+def worker():
+    w = SlowDiff3Worker(script_path=WORKER_JS)
+    yield w
+    w.close()
+
+
+@pytest.fixture
+def files(tmp_path):
+    contents = {
+        'base': "a\nb\nc\n",
+        'left': "a\nB\nc\n",
+        'right': "a\nb\nc\nd\n",
+    }
+    for name, text in contents.items():
+        (tmp_path / name).write_text(text)
+    return tmp_path / 'left', tmp_path / 'base', tmp_path / 'right'
+
+
+class TestSlowDiff3Worker:
+    def test_merge_matches_cli_output(self, worker, files):
+        # Saída de `index.js -m`: o console.log acrescenta '\n'
+        assert worker.merge(*files, timeout=30) == "a\nB\nc\nd\n\n\n"
+
+    def test_reuses_process(self, worker, files):
+        worker.merge(*files, timeout=30)
+        worker.merge(*files, timeout=30)
+
+        assert worker.stats['starts'] == 1
+        assert worker.stats['requests'] == 2
+        assert worker.ping()
+
+    def test_restarts_after_crash(self, worker, files):
+        worker.merge(*files, timeout=30)
+        worker._process.kill()
+        worker._process.wait()
+
+        assert not worker.ping()
+        assert worker.merge(*files, timeout=30) == "a\nB\nc\nd\n\n\n"
+        assert worker.stats['restarts'] == 1
+
+    def test_merge_error_is_reported(self, worker, files, tmp_path):
+        left, base, right = files
+        with pytest.raises(SlowDiff3WorkerError, match="ENOENT"):
+            worker.merge(tmp_path / "missing", base, right, timeout=30)
+        # O processo continua vivo após um erro no merge
+        assert worker.ping()
+
+    def test_timeout_kills_process(self, worker, tmp_path):
+        for name, text in (('base', "a\n" * 400), ('left', "b\n" * 400), ('right', "a\nc\n" * 200)):
+            (tmp_path / name).write_text(text)
+
+        with pytest.raises(subprocess.TimeoutExpired):
+            worker.merge(tmp_path / 'left', tmp_path / 'base', tmp_path / 'right', timeout=0.001)
+        assert worker.stats['timeouts'] == 1
+        assert worker._process is None
@@ -0,0 +1,211 @@
+"""
+Testes do índice de características das triplas.
+"""
+
+import sqlite3
+import sys
+
+import pytest
+from pathlib import Path
+
+# Adicionar src/ ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.miner.triplet_extractor import TripletExtractor
+from src.miner.triplet_index import COLUMNS, INDEX_DB_NAME, TripletIndex, compile_where
+from src.miner.triplet_metadata import build_metadata
+from src.runner.experiment_runner import ExperimentRunner
+
+from tests.test_triplet_store import make_triplet
+
+BASE = "function f() {\n  return 1;\n}\n\nconst a = 1;\n"
+
+
+def conflicting_triplet(n: int, extension: str = '.tsx', conflicts: int = 1):
+    """Tripla em que left e right alteram as mesmas linhas `conflicts` vezes."""
+    blocks = [f"const v{i} = 0;\n\n\n\n" for i in range(conflicts)]
+    base = "function f() {\n  return 1;\n}\n" + "".join(blocks)
+    left = base.replace("= 0;", "= 1;")
+    right = base.replace("= 0;", "= 2;")
+    return make_triplet(
+        n, base=base, extension=extension, filepath=f"src/c{n}{extension}",
+        left_content=left, right_content=right, merged_content=left
+    )
+
+
+def _add(index, triplet, n):
+    contents = {v: triplet[f'{v}_content'] for v in ('base', 'left', 'right', 'merged')}
+    index.add(f"triplet_{n:03d}", contents, build_metadata(triplet, n))
+
+
+class TestTripletIndex:
+
+    def test_features(self, tmp_path):
+        index = TripletIndex(tmp_path / INDEX_DB_NAME)
+        _add(index, conflicting_triplet(1, conflicts=3), 1)
+        _add(index, make_triplet(2, repo="vscode"), 2)
+
+        first, second = index.query()
+        assert first['name'] == "triplet_001"
+        assert first['extension'] == ".tsx"
+        assert first['diff3_conflicts'] == 3
+        assert first['filter_skipped'] == 0
+        assert first['base_lines'] == 15
+
+        assert second['repo'] == "vscode"
+        assert second['diff3_conflicts'] == 0
+        assert second['base_bytes'] == len("const a = 1;\n")
+        # Base de uma linha: rejeitada pelo FileFilter
+        assert second['filter_skipped'] == 1
+        assert "muito pequeno" in second['filter_reason']
+
+        assert index.names("extension = ? AND diff3_conflicts >= ?", ('.tsx', 3)) == ["triplet_001"]
+        assert len(index) == 2
+        index.close()
+
+    def test_reopen_and_replace(self, tmp_path):
+        index = TripletIndex(tmp_path / INDEX_DB_NAME)
+        _add(index, make_triplet(1), 1)
+        index.close()
+
+        index = TripletIndex(tmp_path / INDEX_DB_NAME)
+        assert "triplet_001" in index
+        _add(index, conflicting_triplet(1), 1)
+        assert index.names("diff3_conflicts = 1") == ["triplet_001"]
+        assert len(index) == 1
+        index.close()
+
+    def test_old_index_gains_blob_columns(self, tmp_path):
+        db = sqlite3.connect(str(tmp_path / INDEX_DB_NAME))
+        # Esquema anterior às colunas *_blob
+        old_columns = [column for column in COLUMNS if not column.endswith('_blob')]
+        db.execute(f"CREATE TABLE triplets (name TEXT PRIMARY KEY, {', '.join(old_columns)})")
+        db.execute("INSERT INTO triplets (name, id) VALUES ('triplet_001', 1)")
+        db.commit()
+        db.close()
+
+        index = TripletIndex(tmp_path / INDEX_DB_NAME)
+        assert index.blobs() == {"triplet_001": {}}
+        triplet = make_triplet(2)
+        _add(index, triplet, 2)
+        files = build_metadata(triplet, 2)['files']
+        assert index.blobs()["triplet_002"] == {v: f['blob_sha'] for v, f in files.items()}
+        index.close()
+
+
+class TestCompileWhere:
+
+    def test_values_become_parameters(self):
+        assert compile_where("repo = 'vscode' AND base_lines > 1000 AND filter_skipped = 0") == (
+            "repo = ? AND base_lines > ? AND filter_skipped = ?", ['vscode', 1000, 0]
+        )
+        assert compile_where("(repo == 'it''s' or not id < ?) and filter_reason is null", (2,)) == (
+            "( repo = ? OR NOT id < ? ) AND filter_reason IS NULL", ["it's", 2]
+        )
+
+    @pytest.mark.parametrize("where", [
+        "1 = 1; DROP TABLE triplets",
+        "repo = 'a' UNION SELECT name FROM sqlite_master",
+        "repo = 'a' -- comentário",
+        "size = 1",
+        "repo = repo",
+        "(repo = 'a'",
+        "repo IN ('a')",
+        "id = ?",
+    ])
+    def test_rejects_other_syntax(self, where):
+        with pytest.raises(ValueError):
+            compile_where(where)
+
+    def test_index_does_not_run_injected_sql(self, tmp_path):
+        index = TripletIndex(tmp_path / INDEX_DB_NAME)
+        _add(index, make_triplet(1), 1)
+        with pytest.raises(ValueError):
+            index.names("id = 1; DELETE FROM triplets")
+        assert index.names("repo = 'x'' OR ''1''=''1'") == []
+        assert len(index) == 1
+        index.close()
+
+
+class TestRunnerFilter:
+
+    def _make_runner(self, tmp_path, where=None):
+        runner = ExperimentRunner(tmp_path / "triplets", tmp_path / "results", where=where)
+        runner.get_run_config = lambda: {'tools': {}, 'timeout': runner.timeout}
+        runner.executor.execute_all = lambda base, **kwargs: {
+            'mergiraf': {'success': True, 'result': base}
+        }
+        return runner
+
+    def test_where_selects_without_loading_others(self, tmp_path):
+        extractor = TripletExtractor(tmp_path / "triplets")
+        extractor.save_triplet(conflicting_triplet(1, conflicts=3), 1)
+        extractor.save_triplet(conflicting_triplet(2, extension='.ts', conflicts=3), 2)
+        extractor.save_triplet(conflicting_triplet(3, conflicts=1), 3)
+        extractor.save_triplet(conflicting_triplet(4, conflicts=4), 4)
+
+        assert self._make_runner(tmp_path).update_index() == 4
+
+        # Triplas fora do filtro não são lidas
+        for n in (2, 3):
+            (tmp_path / "triplets" / f"triplet_{n:03d}" / "base.ts").unlink(missing_ok=True)
+            (tmp_path / "triplets" / f"triplet_{n:03d}" / "base.tsx").unlink(missing_ok=True)
+
+        runner = self._make_runner(tmp_path, where="extension = '.tsx' AND diff3_conflicts >= 3")
+        results = runner.run_experiments()
+
+        assert results['triplets_processed'] == 2
+        assert runner.stats['triplets_loaded'] == 2
+        assert runner.stats['triplets_skipped'] == 0
+
+    def test_unindexed_triplets_are_indexed_on_demand(self, tmp_path):
+        extractor = TripletExtractor(tmp_path / "triplets")
+        extractor.save_triplet(conflicting_triplet(1, conflicts=2), 1)
+        runner = self._make_runner(tmp_path)
+        assert runner.update_index() == 1
+
+        extractor.save_triplet(conflicting_triplet(2, conflicts=2), 2)
+        runner = self._make_runner(tmp_path, where="diff3_conflicts = 2")
+        assert [t['id'] for t in runner.iter_triplets()] == ["triplet_001", "triplet_002"]
+
+        # Tripla removida sai do índice
+        for path in (tmp_path / "triplets" / "triplet_001").iterdir():
+            path.unlink()
+        (tmp_path / "triplets" / "triplet_001").rmdir()
+        assert runner.update_index() == 0
+        index = TripletIndex(tmp_path / "triplets" / INDEX_DB_NAME)
+        assert index.names() == ["triplet_002"]
+        index.close()
+
+    def test_rewritten_triplet_is_reindexed(self, tmp_path):
+        extractor = TripletExtractor(tmp_path / "triplets")
+        extractor.save_triplet(conflicting_triplet(1, conflicts=1), 1)
+        extractor.save_triplet(conflicting_triplet(2, conflicts=1), 2)
+        runner = self._make_runner(tmp_path)
+        assert runner.update_index() == 2
+        assert runner.update_index() == 0
+
+        # Mesmo nome, outro conteúdo: a linha do índice fica desatualizada
+        extractor.save_triplet(conflicting_triplet(1, conflicts=3), 1)
+        runner = self._make_runner(tmp_path, where="diff3_conflicts = 3")
+        assert list(runner.iter_triplets()) == []
+        assert runner.update_index() == 1
+        assert [t['id'] for t in runner.iter_triplets()] == ["triplet_001"]
+        assert runner.update_index() == 0
+
+    def test_invalid_where_fails_early(self, tmp_path):
+        with pytest.raises(ValueError):
+            self._make_runner(tmp_path, where="repo = 'a'; DROP TABLE triplets")
+
+    def test_where_does_not_recheck_indexed_triplets(self, tmp_path):
+        extractor = TripletExtractor(tmp_path / "triplets")
+        for triplet_id in (1, 2):
+            extractor.save_triplet(conflicting_triplet(triplet_id, conflicts=1), triplet_id)
+        self._make_runner(tmp_path).update_index()
+
+        runner = self._make_runner(tmp_path, where="diff3_conflicts = 1")
+        checked = []
+        runner._is_stale = lambda *args: checked.append(args)
+        assert runner.count_triplets() == 2
+        assert len(list(runner.iter_triplets())) == 2
+        assert checked == []
@@ -0,0 +1,137 @@
+"""
+Testes dos metadados estruturados de triplas (metadata.json).
+"""
+
+import csv
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# Adicionar src/ ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.miner.triplet_extractor import TripletExtractor
+from src.miner.triplet_metadata import (
+    METADATA_NAME, METADATA_VERSION, count_lines, file_features, migrate_triplet_dir,
+    read_metadata
+)
+from src.runner.experiment_runner import ExperimentRunner
+
+from tests.test_triplet_store import make_triplet
+
+LEGACY_METADATA = """Triplet ID: 7
+Original File: src/math.ts
+Extension: .ts
+Commit SHA: abc123def4567890
+Base SHA: base123
+Left SHA: left123
+Right SHA: right123
+
+File Sizes:
+  Base:   10 bytes
+"""
+
+
+def make_legacy_triplet(triplets_dir: Path) -> Path:
+    """Tripla no formato antigo (só metadata.txt), como nos exemplos."""
+    triplet_dir = triplets_dir / "triplet_007"
+    triplet_dir.mkdir(parents=True)
+    (triplet_dir / "base.ts").write_text("const a = 1;\n")
+    (triplet_dir / "left.ts").write_text("const a = 2;\n")
+    (triplet_dir / "right.ts").write_text("const a = 1;\nconst b = 1;")
+    (triplet_dir / "merged.ts").write_text("const a = 2;\nconst b = 1;")
+    (triplet_dir / "metadata.txt").write_text(LEGACY_METADATA)
+    return triplet_dir
+
+
+class TestMetadataRecord:
+
+    def test_count_lines(self):
+        assert count_lines("") == 0
+        assert count_lines("a\n") == 1
+        assert count_lines("a\nb") == 2
+
+    def test_save_triplet_writes_json(self, tmp_path):
+        triplet = make_triplet(1, base="ação\n", repo="vscode")
+        triplet_dir = TripletExtractor(tmp_path).save_triplet(triplet, 1)
+
+        assert not (triplet_dir / "metadata.txt").exists()
+        metadata = json.loads((triplet_dir / METADATA_NAME).read_text())
+        assert metadata['version'] == METADATA_VERSION
+        assert metadata['id'] == 1
+        assert metadata['repo'] == "vscode"
+        assert metadata['commit_sha'] == triplet['commit_sha']
+
+        base = metadata['files']['base']
+        assert base['size'] == len("ação\n".encode('utf-8'))
+        assert base['lines'] == 1
+        expected_sha = subprocess.run(
+            ["git", "hash-object", str(triplet_dir / "base.ts")],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        assert base['blob_sha'] == expected_sha
+
+    def test_legacy_metadata_is_converted(self, tmp_path):
+        metadata = read_metadata(make_legacy_triplet(tmp_path))
+        assert metadata['id'] == 7
+        assert metadata['filepath'] == "src/math.ts"
+        assert metadata['commit_sha'] == "abc123def4567890"
+        assert metadata['files'] == {}
+
+    def test_migration(self, tmp_path):
+        triplet_dir = make_legacy_triplet(tmp_path)
+        assert migrate_triplet_dir(triplet_dir)
+        assert not migrate_triplet_dir(triplet_dir)
+
+        metadata = json.loads((triplet_dir / METADATA_NAME).read_text())
+        assert metadata['filepath'] == "src/math.ts"
+        assert metadata['files']['right']['lines'] == 2
+        assert set(metadata['files']) == {'base', 'left', 'right', 'merged'}
+        # A tripla migrada volta intacta
+        loaded = TripletExtractor.load_saved_triplet(triplet_dir)
+        assert loaded['commit_sha'] == "abc123def4567890"
+        assert loaded['right_content'] == "const a = 1;\nconst b = 1;"
+
+    def test_migration_uses_recorded_extension(self, tmp_path):
+        # Diretório antigo com base.ts e base.tsx diferentes; vale a extensão do metadata.txt
+        triplet_dir = make_legacy_triplet(tmp_path)
+        (triplet_dir / "metadata.txt").write_text(LEGACY_METADATA.replace("Extension: .ts", "Extension: .tsx"))
+        for version in ('base', 'left', 'right', 'merged'):
+            stale = triplet_dir / f"{version}.ts"
+            (triplet_dir / f"{version}.tsx").write_text(stale.read_text() + "// tsx\n")
+            stale.write_text("// ts\n" * 50)
+
+        assert migrate_triplet_dir(triplet_dir)
+        metadata = read_metadata(triplet_dir)
+        base = (triplet_dir / "base.tsx").read_text()
+        assert metadata['files']['base'] == file_features(base)
+
+        loaded = TripletExtractor.load_saved_triplet(triplet_dir)
+        assert loaded['base_content'] == base
+        runner = ExperimentRunner(tmp_path, tmp_path / "results")
+        assert runner.load_triplets()[0]['base'] == base
+
+
+class TestRunnerMetadata:
+
+    def _run(self, tmp_path, triplets_dir):
+        runner = ExperimentRunner(triplets_dir, tmp_path / "results")
+        runner.get_run_config = lambda: {'tools': {}, 'timeout': runner.timeout}
+        runner.executor.execute_all = lambda base, **kwargs: {
+            'mergiraf': {'success': True, 'result': base}
+        }
+        results = runner.run_experiments()
+        with open(results['results_path'], newline='', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+
+    def test_commit_sha_reaches_results(self, tmp_path):
+        triplets_dir = tmp_path / "triplets"
+        TripletExtractor(triplets_dir).save_triplet(make_triplet(1), 1)
+        make_legacy_triplet(triplets_dir)
+
+        rows = self._run(tmp_path, triplets_dir)
+        assert [(row['filepath'], row['commit_sha']) for row in rows] == [
+            ("src/file1.ts", f"{1:040x}"[:8]),
+            ("src/math.ts", "abc123de"),
+        ]
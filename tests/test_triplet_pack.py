@@ -0,0 +1,154 @@
+"""
+Testes do pacote de triplas (triplets.pack + triplets.idx).
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Adicionar src/ ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.miner.triplet_extractor import TripletExtractor
+from src.miner.triplet_pack import (
+    INDEX_NAME, PACK_NAME, TripletPackError, TripletPackReader, TripletPackWriter
+)
+from src.runner.experiment_runner import ExperimentRunner
+
+from tests.test_triplet_store import make_triplet
+
+REPO_ROOT = Path(__file__).parent.parent
+
+
+class TestTripletPack:
+
+    @pytest.mark.parametrize("compress", [True, False])
+    def test_roundtrip(self, tmp_path, compress):
+        triplets = {n: make_triplet(n, base=f"não-ascii {n}: ç\n") for n in (3, 1, 2)}
+        with TripletPackWriter(tmp_path, compress=compress) as writer:
+            for n, triplet in triplets.items():
+                writer.append(triplet, n)
+
+        with TripletPackReader(tmp_path) as pack:
+            assert pack.ids() == [1, 2, 3]
+            assert len(pack) == 3
+            # Iteração na ordem do arquivo
+            assert [n for n, _ in pack] == [3, 1, 2]
+            for n, triplet in triplets.items():
+                assert pack.get(n) == dict(triplet, id=n)
+
+    def test_append_after_reopen(self, tmp_path):
+        with TripletPackWriter(tmp_path) as writer:
+            writer.append(make_triplet(1), 1)
+        with TripletPackWriter(tmp_path) as writer:
+            writer.append(make_triplet(2), 2)
+            # ID existente (de outra sessão ou desta) não é regravado
+            with pytest.raises(ValueError):
+                writer.append(make_triplet(1, filepath="novo.ts"), 1)
+            with pytest.raises(ValueError):
+                writer.append(make_triplet(2, filepath="novo.ts"), 2)
+
+        with TripletPackReader(tmp_path) as pack:
+            assert pack.ids() == [1, 2]
+            assert pack.get(1)['filepath'] == "src/file1.ts"
+            assert pack.get(2)['filepath'] == "src/file2.ts"
+
+    @pytest.mark.parametrize("missing", [INDEX_NAME, PACK_NAME])
+    def test_incomplete_pack_is_not_overwritten(self, tmp_path, missing):
+        with TripletPackWriter(tmp_path) as writer:
+            writer.append(make_triplet(1), 1)
+        kept = tmp_path / (PACK_NAME if missing == INDEX_NAME else INDEX_NAME)
+        contents = kept.read_bytes()
+        (tmp_path / missing).unlink()
+
+        with pytest.raises(TripletPackError):
+            TripletPackWriter(tmp_path)
+        assert kept.read_bytes() == contents
+
+    def test_truncated_index_entry_is_dropped(self, tmp_path):
+        with TripletPackWriter(tmp_path) as writer:
+            writer.append(make_triplet(1), 1)
+            writer.append(make_triplet(2), 2)
+        index = tmp_path / INDEX_NAME
+        index.write_bytes(index.read_bytes()[:-3])
+
+        with TripletPackReader(tmp_path) as pack:
+            assert pack.ids() == [1]
+        with TripletPackWriter(tmp_path) as writer:
+            writer.append(make_triplet(3), 3)
+        with TripletPackReader(tmp_path) as pack:
+            assert pack.ids() == [1, 3]
+            assert pack.get(3)['filepath'] == "src/file3.ts"
+
+    def test_rejects_foreign_file(self, tmp_path):
+        (tmp_path / PACK_NAME).write_bytes(b"not a pack")
+        (tmp_path / INDEX_NAME).write_bytes(b"")
+        with pytest.raises(TripletPackError):
+            TripletPackReader(tmp_path)
+
+
+class TestExtractorPackSupport:
+
+    def test_load_saved_triplet_inverts_save_triplet(self, tmp_path):
+        triplet = make_triplet(5)
+        extractor = TripletExtractor(tmp_path)
+        triplet_dir = extractor.save_triplet(triplet, 5)
+        assert TripletExtractor.load_saved_triplet(triplet_dir) == triplet
+
+    def test_convert_directory_tree_to_pack(self, tmp_path):
+        source = tmp_path / "triplets"
+        extractor = TripletExtractor(source)
+        for n in (1, 2):
+            extractor.save_triplet(make_triplet(n), n)
+
+        result = subprocess.run(
+            [sys.executable, "scripts/convert_triplets.py", "--to", "pack",
+             "--triplets-dir", str(source), "--output", str(tmp_path / "packed")],
+            cwd=REPO_ROOT, capture_output=True, text=True
+        )
+        assert result.returncode == 0, result.stderr
+
+        with TripletPackReader(tmp_path / "packed") as pack:
+            assert pack.ids() == [1, 2]
+            stored = pack.get(2)
+            metadata = stored.pop('metadata')
+            assert stored == dict(make_triplet(2), id=2)
+            assert metadata['filepath'] == "src/file2.ts"
+            assert metadata['files']['merged']['lines'] == 3
+
+
+class TestRunnerReadsPack:
+
+    def test_load_triplets_from_pack(self, tmp_path):
+        triplets_dir = tmp_path / "triplets"
+        extractor = TripletExtractor(triplets_dir)
+        for n in (1, 2, 3):
+            extractor.save_triplet_packed(make_triplet(n), n)
+        extractor.close()
+        # Diretório com o mesmo ID tem precedência sobre o pacote
+        extractor.save_triplet(make_triplet(2, base="dir\n"), 2)
+
+        runner = ExperimentRunner(triplets_dir, tmp_path / "results")
+        triplets = runner.load_triplets(max_triplets=2)
+
+        assert [t['id'] for t in triplets] == ["triplet_001", "triplet_002"]
+        from_pack, from_dir = triplets
+        assert from_pack['filepath'] == "src/file1.ts"
+        assert from_pack['metadata']['commit_sha'] == f"{1:040x}"
+        # Entradas do slow-diff3 gravadas em arquivos
+        assert from_pack['base_file'].read_text() == from_pack['base']
+        assert from_pack['right_file'].suffix == ".ts"
+        assert from_dir['base'] == "dir\n"
+
+    def test_count_triplets_from_pack(self, tmp_path):
+        triplets_dir = tmp_path / "triplets"
+        extractor = TripletExtractor(triplets_dir)
+        for n in (1, 2, 3):
+            extractor.save_triplet_packed(make_triplet(n), n)
+        extractor.close()
+
+        runner = ExperimentRunner(triplets_dir, tmp_path / "results")
+        assert runner.count_triplets() == 3
+        assert runner.count_triplets(max_triplets=2) == 2
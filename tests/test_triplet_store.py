@@ -0,0 +1,148 @@
+"""
+Testes do TripletStore (triplas endereçadas por conteúdo).
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Adicionar src/ ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.miner.triplet_extractor import TripletExtractor
+from src.miner.triplet_store import STORE_DIR, TripletStore, git_blob_sha
+from src.runner.experiment_runner import ExperimentRunner
+
+
+def make_triplet(n: int, base: str = "const a = 1;\n", **overrides):
+    triplet = {
+        'filepath': f"src/file{n}.ts",
+        'extension': '.ts',
+        'base_content': base,
+        'left_content': f"const a = 1;\nconst left{n} = 2;\n",
+        'right_content': f"const right{n} = 0;\nconst a = 1;\n",
+        'merged_content': f"const right{n} = 0;\nconst a = 1;\nconst left{n} = 2;\n",
+        'commit_sha': f"{n:040x}",
+        'base_sha': "b" * 40,
+        'left_sha': "c" * 40,
+        'right_sha': "d" * 40,
+    }
+    triplet.update(overrides)
+    return triplet
+
+
+class TestTripletStore:
+
+    def test_git_blob_sha_matches_git(self):
+        text = "const x = 'ação';\n"
+        expected = subprocess.run(
+            ["git", "hash-object", "--stdin"],
+            input=text.encode('utf-8'), capture_output=True, check=True
+        ).stdout.decode().strip()
+        assert git_blob_sha(text) == expected
+
+    def test_shared_blobs_are_written_once(self, tmp_path):
+        store = TripletStore(tmp_path / "store")
+        store.add(make_triplet(1), 1)
+        store.add(make_triplet(2), 2)
+
+        stats = store.get_statistics()
+        assert stats['triplets_added'] == 2
+        # A base é compartilhada pelas duas triplas
+        assert stats['objects_written'] == 7
+        assert stats['objects_reused'] == 1
+        objects = [p for p in (tmp_path / "store" / "objects").rglob("*") if p.is_file()]
+        assert len(objects) == 7
+
+    def test_identical_inputs_are_deduplicated(self, tmp_path):
+        store = TripletStore(tmp_path / "store")
+        assert store.add(make_triplet(1), 1) == 1
+        duplicate = make_triplet(1, commit_sha="e" * 40, merged_content="outro\n")
+        assert store.add(duplicate, 2) == 1
+
+        assert store.ids() == [1]
+        assert store.get_statistics()['duplicates'] == 1
+
+    def test_reused_id_is_rejected(self, tmp_path):
+        store = TripletStore(tmp_path / "store")
+        store.add(make_triplet(1), 1)
+        with pytest.raises(ValueError):
+            store.add(make_triplet(2), 1)
+
+        # O manifesto e a deduplicação continuam apontando para a tripla 1
+        reopened = TripletStore(tmp_path / "store")
+        assert reopened.ids() == [1]
+        assert reopened.add(make_triplet(1), 5) == 1
+        assert reopened.get(1)['filepath'] == "src/file1.ts"
+
+    def test_reopen_and_roundtrip(self, tmp_path):
+        original = make_triplet(7, base="não-ascii: ç\n")
+        TripletStore(tmp_path / "store").add(original, 7)
+
+        store = TripletStore(tmp_path / "store")
+        loaded = store.get(7)
+        for key, value in original.items():
+            assert loaded[key] == value
+        assert loaded['blob_shas']['base'] == git_blob_sha(original['base_content'])
+        assert store.max_id() == 7
+
+    def test_extractor_blob_shas_are_reused(self, tmp_path, monkeypatch):
+        triplet = make_triplet(1)
+        triplet['blob_shas'] = {v: git_blob_sha(triplet[f'{v}_content']) for v in ('base', 'left', 'right', 'merged')}
+        hashed = []
+        monkeypatch.setattr("src.miner.triplet_metadata.git_blob_sha", lambda text: hashed.append(text))
+        store = TripletStore(tmp_path / "store")
+        monkeypatch.setattr(store.objects, 'digest', lambda text: hashed.append(text))
+        store.add(triplet, 1)
+
+        assert hashed == []
+        manifest = store.manifest(1)
+        assert manifest['blobs'] == triplet['blob_shas']
+        assert {v: f['blob_sha'] for v, f in manifest['files'].items()} == triplet['blob_shas']
+        assert store.get(1)['base_content'] == triplet['base_content']
+
+    def test_export_matches_directory_layout(self, tmp_path):
+        triplet = make_triplet(3)
+        store = TripletStore(tmp_path / "store")
+        store.add(triplet, 3)
+
+        TripletExtractor(tmp_path / "direct").save_triplet(triplet, 3)
+        assert store.export_directory(tmp_path / "exported") == 1
+
+        direct = tmp_path / "direct" / "triplet_003"
+        exported = tmp_path / "exported" / "triplet_003"
+        assert sorted(p.name for p in exported.iterdir()) == sorted(p.name for p in direct.iterdir())
+        for path in direct.iterdir():
+            assert (exported / path.name).read_text() == path.read_text()
+
+
+class TestRunnerReadsStore:
+
+    def test_load_triplets_from_store(self, tmp_path):
+        triplets_dir = tmp_path / "triplets"
+        store = TripletStore(triplets_dir / STORE_DIR)
+        for n in (1, 2):
+            store.add(make_triplet(n), n)
+        # Diretório com o mesmo ID tem precedência sobre o store
+        TripletExtractor(triplets_dir).save_triplet(make_triplet(2, base="dir\n"), 2)
+
+        runner = ExperimentRunner(triplets_dir, tmp_path / "results")
+        triplets = runner.load_triplets()
+
+        assert [t['id'] for t in triplets] == ["triplet_001", "triplet_002"]
+        from_store, from_dir = triplets
+        assert from_store['base'] == "const a = 1;\n"
+        assert from_store['filepath'] == "src/file1.ts"
+        assert from_store['base_file'].read_text() == from_store['base']
+        assert from_dir['base'] == "dir\n"
+
+    def test_count_triplets_from_store(self, tmp_path):
+        triplets_dir = tmp_path / "triplets"
+        store = TripletStore(triplets_dir / STORE_DIR)
+        for n in (1, 2):
+            store.add(make_triplet(n), n)
+
+        runner = ExperimentRunner(triplets_dir, tmp_path / "results")
+        assert runner.count_triplets() == 2